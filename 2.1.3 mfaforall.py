@@ -1,4 +1,5 @@
 from colorama import init, Fore, Back, Style
+import records
 
 init(autoreset=True)
 
@@ -19,6 +20,7 @@ def manual_check_message():
     print(border)
     print(padded_link)
     print(border)
+    records.verdict("MANUAL")
 
 if __name__ == "__main__":
     manual_check_message()
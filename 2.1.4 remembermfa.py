@@ -1,4 +1,5 @@
 from colorama import init, Fore, Back, Style
+import records
 
 init(autoreset=True)
 
@@ -23,6 +24,7 @@ def manual_check_message():
     for line in content:
         print(f"| {line.ljust(box_width - 4)} |")
     print(border)
+    records.verdict("MANUAL")
 
 if __name__ == "__main__":
     manual_check_message()
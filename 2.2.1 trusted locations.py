@@ -1,7 +1,5 @@
-import subprocess
-import tempfile
-import time
-import os
+import powershell
+import records
 
 
 GREEN = "\033[92m"
@@ -12,66 +10,6 @@ CYAN = "\033[96m"
 MAGENTA = "\033[95m"
 RESET = "\033[0m"
 
-tmux_session_name = "persistent_powershell"
-
-def send_command_to_tmux(command):
-    """Send a command to the persistent PowerShell tmux session."""
-    try:
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_session_name, command, "C-m"],
-            check=True
-        )
-    except subprocess.CalledProcessError as e:
-        print(f"{RED}Failed to send command to tmux session: {e}{RESET}")
-        return False
-    return True
-
-def run_powershell_tmux(commands):
-    """Runs PowerShell commands in the tmux PowerShell session and captures output via a temp file."""
-    try:
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as temp_file:
-            temp_file_path = temp_file.name
-
-        
-        for command in commands[:-1]:  
-            if not send_command_to_tmux(command):
-                return None
-
-        
-        final_command = f"{commands[-1]} | Out-File -FilePath {temp_file_path} -Append"
-        if not send_command_to_tmux(final_command):
-            return None
-
-        
-        max_retries = 15
-        retries = 0
-        output_ready = False
-
-        while retries < max_retries:
-            time.sleep(1)  
-            if os.path.exists(temp_file_path) and os.path.getsize(temp_file_path) > 0:
-                output_ready = True
-                break
-            retries += 1
-
-        if not output_ready:
-            print(f"{RED}Error: Output file was not created or remains empty after multiple retries.{RESET}")
-            return None
-
-        
-        with open(temp_file_path, "r") as file:
-            output = file.read().strip()
-
-        
-        os.remove(temp_file_path)
-
-        return output
-
-    except Exception as e:
-        print(f"{RED}Error: {e}{RESET}")
-        return None
-
 def check_trusted_named_locations(output):
     """Checks if any named location has the IsTrusted parameter set to True and displays the full output."""
     print(f"{YELLOW}Checking IP ranges location settings for trusted configurations...{RESET}")
@@ -84,6 +22,7 @@ def check_trusted_named_locations(output):
     if not output:
         print(f"{RED}No output retrieved from PowerShell. Cannot determine compliance.{RESET}")
         print(f"\n{CYAN}Final Status: {RED}Fail{RESET}")
+        records.verdict("FAIL", reason="no PowerShell output")
         return
 
     is_trusted_found = False
@@ -102,6 +41,7 @@ def check_trusted_named_locations(output):
     else:
         print(f"{RED}No Named Location is marked as Trusted.{RESET}")
         print(f"\n{CYAN}Final Status: {RED}Fail{RESET}")
+    records.verdict("PASS" if is_trusted_found else "FAIL")
 
 def main():
     """Main function to check compliance for IP ranges location settings."""
@@ -112,7 +52,7 @@ def main():
     ]
 
     
-    output = run_powershell_tmux(commands)
+    output = powershell.run_powershell(commands)
 
     
     check_trusted_named_locations(output)
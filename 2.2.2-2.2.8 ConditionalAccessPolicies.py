@@ -1,11 +1,21 @@
+import re
 import subprocess
+import armclient
 import requests
 import json
 import colorama
 from colorama import Fore, Style
+import records
 
 colorama.init(autoreset=True)
 
+GET_BY_IDS_URL = "https://graph.microsoft.com/v1.0/directoryObjects/getByIds"
+GET_BY_IDS_LIMIT = 1000
+OBJECT_ID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
+# Object ID -> (type, name), shared by every policy in the report.
+directory_objects = {}
+
 
 def get_access_token():
     command = "az account get-access-token --resource https://graph.microsoft.com --query accessToken -o tsv"
@@ -23,43 +33,72 @@ def get_access_token():
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip(), None
     except subprocess.CalledProcessError as e:
         return None, str(e)
 
 
-def get_user_or_spn_email(user_id, token):
-    headers = {
-        'Authorization': 'Bearer ' + token,
-        'Content-Type': 'application/json'
-    }
-    
-    user_response = requests.get(f"https://graph.microsoft.com/v1.0/users/{user_id}", headers=headers)
-    if user_response.status_code == 200:
-        user_data = user_response.json()
-        return user_data.get('mail', "Email Not Available")
-    
-    
-    spn_response = requests.get(f"https://graph.microsoft.com/v1.0/servicePrincipals/{user_id}", headers=headers)
-    if spn_response.status_code == 200:
-        spn_data = spn_response.json()
-        return spn_data.get('displayName', "SPN Name Not Available")
-    
+def resolve_directory_objects(object_ids):
+    """Resolves users, service principals and groups in bulk via directoryObjects/getByIds and caches them."""
+    pending = sorted({oid for oid in object_ids if oid not in directory_objects})
+    lookups = [oid for oid in pending if OBJECT_ID_PATTERN.match(oid)]
+    failed = set()
+
+    for start in range(0, len(lookups), GET_BY_IDS_LIMIT):
+        batch = lookups[start:start + GET_BY_IDS_LIMIT]
+        body = {"ids": batch, "types": ["user", "servicePrincipal", "group"]}
+        response = armclient.send("post", GET_BY_IDS_URL, body)
+        if response is None or response.status_code != 200:
+            status = "no response" if response is None else response.status_code
+            print(f"{Fore.RED}Failed to resolve directory objects: {status}{Style.RESET_ALL}")
+            failed.update(batch)
+            continue
+        for obj in response.json().get('value', []):
+            object_type = obj.get('@odata.type', '').split('.')[-1]
+            if object_type == "user":
+                name = obj.get('mail') or "Email Not Available"
+            elif object_type == "servicePrincipal":
+                name = obj.get('displayName') or "SPN Name Not Available"
+            else:
+                name = obj.get('displayName') or "Group Name Not Available"
+            directory_objects[obj['id']] = (object_type, name)
+
+    # Anything Graph did not return (deleted objects, keywords such as 'GuestsOrExternalUsers') is cached as missing.
+    # IDs from a failed batch stay uncached and are reported as lookup failures, not as missing objects.
+    for oid in pending:
+        if oid not in failed:
+            directory_objects.setdefault(oid, (None, None))
+
+
+def get_user_or_spn_email(user_id):
+    resolve_directory_objects([user_id])
+    if user_id not in directory_objects:
+        return "Lookup Failed"
+    object_type, name = directory_objects[user_id]
+    if object_type in ("user", "servicePrincipal"):
+        return name
     return "ID Not Found"
 
 
-def get_group_name(group_id, token):
-    headers = {
-        'Authorization': 'Bearer ' + token,
-        'Content-Type': 'application/json'
-    }
-    group_response = requests.get(f"https://graph.microsoft.com/v1.0/groups/{group_id}", headers=headers)
-    if group_response.status_code == 200:
-        group_data = group_response.json()
-        return group_data.get('displayName', "Group Name Not Available")
-    else:
-        return "Group Name Not Available"
+def get_group_name(group_id):
+    resolve_directory_objects([group_id])
+    if group_id not in directory_objects:
+        return "Lookup Failed"
+    object_type, name = directory_objects[group_id]
+    if object_type == "group":
+        return name
+    return "Group Name Not Available"
+
+
+def policy_object_ids(policies):
+    """Collects every user, service principal and group ID referenced by the policies."""
+    object_ids = set()
+    for policy in policies:
+        users = (policy.get("conditions") or {}).get('users') or {}
+        for key in ('includeUsers', 'excludeUsers', 'includeGroups', 'excludeGroups'):
+            object_ids.update(users.get(key) or [])
+    return object_ids
 
 
 def fetch_directory_roles(token):
@@ -95,7 +134,7 @@ def handle_session_controls(session_controls):
         print(f"  Sign-In Frequency: {color_text(f'{freq_value} every {freq_type}', 'green' if freq_value else 'red')}")
 
 
-def handle_conditions(conditions, token, directory_roles):
+def handle_conditions(conditions, directory_roles):
     include_users = conditions.get('users', {}).get('includeUsers', [])
     exclude_users = conditions.get('users', {}).get('excludeUsers', [])
     include_groups = conditions.get('users', {}).get('includeGroups', [])
@@ -107,11 +146,11 @@ def handle_conditions(conditions, token, directory_roles):
     if any(user.lower() == "all" for user in include_users):
         print(f"  Include Users: {color_text('ALL', 'green')}")
     else:
-        print(f"  Include Users: {[get_user_or_spn_email(uid, token) for uid in include_users]}")
+        print(f"  Include Users: {[get_user_or_spn_email(uid) for uid in include_users]}")
 
-    print(f"  Exclude Users: {[get_user_or_spn_email(uid, token) for uid in exclude_users]}")
-    print(f"  Include Groups: {[get_group_name(gid, token) for gid in include_groups]}")
-    print(f"  Exclude Groups: {[get_group_name(gid, token) for gid in exclude_groups]}")
+    print(f"  Exclude Users: {[get_user_or_spn_email(uid) for uid in exclude_users]}")
+    print(f"  Include Groups: {[get_group_name(gid) for gid in include_groups]}")
+    print(f"  Exclude Groups: {[get_group_name(gid) for gid in exclude_groups]}")
     print(f"  Include Roles: {[directory_roles.get(role_id, 'Role Not Found') for role_id in include_roles]}")
     print(f"  Exclude Roles: {[directory_roles.get(role_id, 'Role Not Found') for role_id in exclude_roles]}")
     
@@ -137,9 +176,11 @@ def display_conditional_access_policies(token):
     response = requests.get("https://graph.microsoft.com/v1.0/identity/conditionalAccess/policies", headers=headers)
     if response.status_code != 200:
         print(f"{Fore.RED}Failed to fetch conditional access policies.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="conditional access policies could not be read")
         return
 
     policies = response.json()
+    resolve_directory_objects(policy_object_ids(policies.get('value', [])))
     for policy in policies.get('value', []):
         grant_controls = policy.get("grantControls") or {}
         conditions = policy.get("conditions", {})
@@ -152,8 +193,11 @@ def display_conditional_access_policies(token):
         print("Session Controls:")
         handle_session_controls(session_controls)
         print("Conditions:")
-        handle_conditions(conditions, token, directory_roles)
+        handle_conditions(conditions, directory_roles)
         print("\n----------------------------------------\n")
+        records.resource(policy.get('id', policy.get('displayName')), "MANUAL", state=state)
+
+    records.verdict("MANUAL")
 
 
 token = get_access_token()
@@ -161,3 +205,4 @@ if token:
     display_conditional_access_policies(token)
 else:
     print(f"{Fore.RED}Authentication failed. Could not retrieve token.{Style.RESET_ALL}")
+    records.verdict("FAIL", reason="no access token")
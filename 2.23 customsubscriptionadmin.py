@@ -1,7 +1,9 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import records
 
 colorama.init(autoreset=True)
 
@@ -17,7 +19,7 @@ def color_text(text, color):
 def run_command(command):
     """Runs a shell command and returns the output as JSON if possible, or an error message."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return json.loads(process.stdout), None
     except subprocess.CalledProcessError as e:
         return None, f"Command failed: {e.stderr}"
@@ -52,10 +54,15 @@ def check_custom_roles():
     print()
     custom_roles = list_custom_roles()
 
-    if not custom_roles:
+    if custom_roles is None:
+        print(f"{Fore.RED}Final Status: FAIL{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="custom roles could not be listed")
+    elif not custom_roles:
         print(f"{Fore.GREEN}Final Status: PASS{Style.RESET_ALL}")
+        records.verdict("PASS")
     else:
         print(f"{Fore.RED}Final Status: FAIL{Style.RESET_ALL}")
+        records.verdict("FAIL", roles=[role.get("roleName") for role in custom_roles])
 
 def main():
     
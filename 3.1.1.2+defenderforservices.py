@@ -1,14 +1,17 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
 def run_command(command):
     """Runs a shell command and returns the output or 'null' if the command fails."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         result = process.stdout.strip()
         return result if result else 'null'
     except subprocess.CalledProcessError:
@@ -17,7 +20,7 @@ def run_command(command):
 def check_authentication():
     """Check if already authenticated with Azure CLI to skip login."""
     try:
-        subprocess.run(['az', 'account', 'show'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        armclient.run(['az', 'account', 'show'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return True
     except subprocess.CalledProcessError:
         print(f"{Fore.RED}Not authenticated. Please authenticate using the main script.{Style.RESET_ALL}")
@@ -41,6 +44,9 @@ def get_pricing_tier(service_name, subscription_id):
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions available for the account."""
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --query '[].{id:id, name:name}'"
     result = run_command(command)
     if result:
@@ -94,11 +100,14 @@ def display_defender_service_status():
         print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}PASS{Style.RESET_ALL}")
     else:
         print(f"\n{Fore.CYAN}Final Status: {Fore.RED}FAIL{Style.RESET_ALL}")
+    records.verdict(overall_status)
 
 def run_defender_service_check():
     """Main function to check Defender service settings for all subscriptions."""
     if check_authentication():
         display_defender_service_status()
+    else:
+        records.verdict("FAIL", reason="not authenticated")
 
 def main():
     """Entry point for Defender service status check."""
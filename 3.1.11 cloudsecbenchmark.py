@@ -1,7 +1,9 @@
 from colorama import init, Fore, Back, Style
 import subprocess
+import armclient
 import json
 import sys
+import records
 
 # Initialize colorama
 init(autoreset=True)
@@ -9,7 +11,7 @@ init(autoreset=True)
 def get_subscription_ids():
     try:
         command = ["az", "account", "list", "--query", "[].id", "-o", "json"]
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+        result = armclient.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
         
         subscription_ids = json.loads(result.stdout)
         return subscription_ids
@@ -46,6 +48,7 @@ def main():
             "No subscriptions found. Please ensure you are logged into Azure CLI and have the necessary permissions." +
             Style.RESET_ALL
         )
+        records.verdict("FAIL", reason="no subscriptions")
         sys.exit(0)
 
     message = (
@@ -64,6 +67,7 @@ def main():
     for link in links:
         print(f"| {link.ljust(box_width - 2)} |")
     print(border)
+    records.verdict("MANUAL")
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,9 @@
 import json
 import requests
 import subprocess
+import armclient
 import colorama
+import records
 from colorama import Fore, Style
 
 colorama.init(autoreset=True)
@@ -16,7 +18,7 @@ def get_access_token():
     print()
     command = "az account get-access-token --query '{subscription:subscription,accessToken:accessToken}' -o json"
     try:
-        result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
+        result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
         data = json.loads(result.stdout)
         access_token = data.get("accessToken")
         subscription_id = data.get("subscription")
@@ -53,6 +55,7 @@ def get_security_contact(subscription_id, access_token):
     except json.JSONDecodeError:
         print(f"{Fore.RED}Failed to parse JSON response.{Style.RESET_ALL}")
 
+    records.verdict("FAIL", reason="security contacts could not be read")
     return None
 
 def print_color_coded_json(data, notifications_by_role):
@@ -94,12 +97,15 @@ def print_color_coded_json(data, notifications_by_role):
 
     
     print("\n" + ("Final Status: " + (f"{Fore.GREEN}Pass{Style.RESET_ALL}" if all_passed else f"{Fore.RED}Fail{Style.RESET_ALL}")))
+    records.verdict("PASS" if all_passed else "FAIL", state=(notifications_by_role or {}).get("state"), roles=(notifications_by_role or {}).get("roles"))
 
 def main():
     """Entry point for the script."""
     subscription_id, access_token = get_access_token()
     if subscription_id and access_token:
         get_security_contact(subscription_id, access_token)
+    else:
+        records.verdict("FAIL", reason="no access token")
 
 if __name__ == "__main__":
     main()
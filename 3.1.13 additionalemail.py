@@ -1,6 +1,8 @@
 import subprocess
+import armclient
 import json
 import colorama
+import records
 from colorama import Fore, Style
 
 colorama.init(autoreset=True)
@@ -12,7 +14,7 @@ def run_command(command):
     print(" ")
 
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"{Fore.RED}Command failed: {e.stderr}{Style.RESET_ALL}")
@@ -44,6 +46,10 @@ def get_security_contact_emails():
         print(f"{Fore.RED}Value: null{Style.RESET_ALL}")
 
     print("\n" + ("Final Status: " + (f"{Fore.GREEN}Pass{Style.RESET_ALL}" if final_status == "Pass" else f"{Fore.RED}Fail{Style.RESET_ALL}")))
+    if output is None:
+        records.verdict("FAIL", reason="security contacts could not be read")
+    else:
+        records.verdict(final_status)
 
 
 def main():
@@ -1,7 +1,9 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import records
 
 colorama.init(autoreset=True)
 
@@ -10,7 +12,7 @@ API_VERSION = "2020-01-01-preview"
 
 def run_command(command):
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         result = process.stdout.strip()
         return result if result else 'null'
     except subprocess.CalledProcessError as e:
@@ -55,7 +57,7 @@ def process_security_contacts(subscription, contacts):
     if not contacts or "value" not in contacts or not contacts["value"]:
         print(f"{Fore.RED}No security contacts found or response is empty for subscription {subscription}.{Style.RESET_ALL}")
         print(f"\nFinal Status: {Fore.RED}Fail{Style.RESET_ALL}")
-        return
+        return False
 
     for contact in contacts["value"]:
         if contact.get("name") == "default":
@@ -77,26 +79,34 @@ def process_security_contacts(subscription, contacts):
                 final_status = f"{Fore.RED}Fail{Style.RESET_ALL}"
 
             print(f"\nFinal Status: {final_status}")
-            return
+            return state == "On" and minimal_severity == "High"
 
     print(f"{Fore.RED}Default security contact not found for subscription {subscription}.{Style.RESET_ALL}")
     print(f"\nFinal Status: {Fore.RED}Fail{Style.RESET_ALL}")
+    return False
 
 def main():
     subscriptions = get_subscriptions_and_tokens()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions or tokens retrieved. Exiting.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
+    all_compliant = True
     for entry in subscriptions:
         subscription = entry["subscription"]
         token = entry["token"]
         contacts = get_security_contacts(subscription, token)
         if contacts:
-            process_security_contacts(subscription, contacts)
+            compliant = process_security_contacts(subscription, contacts)
         else:
             print(f"{Fore.RED}Skipping subscription {subscription} due to errors retrieving contacts.{Style.RESET_ALL}")
             print(f"\nFinal Status: {Fore.RED}Fail{Style.RESET_ALL}")
+            compliant = False
+        records.resource(subscription, "PASS" if compliant else "FAIL")
+        all_compliant = all_compliant and compliant
+
+    records.verdict("PASS" if all_compliant else "FAIL")
 
 if __name__ == "__main__":
     main()
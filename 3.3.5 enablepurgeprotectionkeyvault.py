@@ -1,6 +1,8 @@
 import subprocess
+import armclient
 import json
 import colorama
+import records
 from colorama import Fore, Style
 
 colorama.init(autoreset=True)
@@ -8,7 +10,7 @@ colorama.init(autoreset=True)
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"{Fore.RED}Error executing command: {e.stderr}{Style.RESET_ALL}")
@@ -34,7 +36,7 @@ def extract_vault_name(vault_id):
     return vault_id.split("/")[-1]
 
 def check_purge_protection(vault_id):
-    """Check if enablePurgeProtection is set to true for a specific Key Vault."""
+    """Check if enablePurgeProtection is set to true for a specific Key Vault; returns whether it is."""
     vault_name = extract_vault_name(vault_id)
     print(f"\n{Fore.YELLOW}Checking enablePurgeProtection for Key Vault: {vault_name}{Style.RESET_ALL}")
     print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
@@ -66,11 +68,15 @@ def check_purge_protection(vault_id):
 
             
             print(f"\nFinal Status: {final_status}")
+            records.resource(vault_id, "PASS" if enable_purge_protection is True else "FAIL", enablePurgeProtection=enable_purge_protection)
+            return enable_purge_protection is True
 
         except json.JSONDecodeError:
             print(f"{Fore.RED}Failed to parse JSON output for Key Vault: {vault_name}.{Style.RESET_ALL}")
     else:
         print(f"{Fore.RED}Failed to retrieve details for Key Vault: {vault_name}.{Style.RESET_ALL}")
+    records.resource(vault_id, "FAIL", reason="details could not be read")
+    return False
 
 def main():
     """Main function to retrieve Key Vaults and check enablePurgeProtection."""
@@ -78,12 +84,14 @@ def main():
 
     if not key_vaults:
         print(f"{Fore.RED}No Key Vault resources found or unable to retrieve Key Vaults.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no key vaults")
         return
 
-    
+    all_passed = True
     for vault in key_vaults:
         vault_id = vault["id"]
-        check_purge_protection(vault_id)
+        all_passed = check_purge_protection(vault_id) and all_passed
+    records.verdict("PASS" if all_passed else "FAIL")
 
 if __name__ == "__main__":
     main()
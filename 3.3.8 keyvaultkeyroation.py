@@ -1,7 +1,9 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import records
 
 colorama.init(autoreset=True)
 
@@ -10,7 +12,7 @@ FORBIDDEN_ERROR_MESSAGE = "ERROR: (Forbidden) Caller is not authorized to perfor
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
         if FORBIDDEN_ERROR_MESSAGE in e.stderr:
@@ -78,6 +80,7 @@ def main():
 
     if not key_vaults:
         print(f"{Fore.RED}No Key Vaults found or unable to retrieve Key Vaults.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no key vaults")
         return
 
     
@@ -98,5 +101,7 @@ def main():
         for key in keys:
             display_key_info(vault_name, key)
 
+    records.verdict("MANUAL")
+
 if __name__ == "__main__":
     main()
@@ -1,37 +1,27 @@
 from colorama import init, Fore, Back, Style
 import subprocess
+import armclient
 import json
 import sys
+import storagerules
+import records
 
 # Initialize colorama
 init(autoreset=True)
 
-def get_storage_account_ids():
-    try:
-        command = ["az", "storage", "account", "list", "--query", "[].id", "-o", "json"]
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-        
-        storage_account_ids = json.loads(result.stdout)
-        return storage_account_ids
-    except subprocess.CalledProcessError as e:
-        print(
-            Back.RED + Fore.WHITE +
-            f"Error fetching storage account IDs: {e.stderr.strip()}" +
-            Style.RESET_ALL
-        )
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(
-            Back.RED + Fore.WHITE +
-            f"Error decoding JSON response: {e}" +
-            Style.RESET_ALL
-        )
-        sys.exit(1)
+def get_storage_accounts():
+    """Returns (id, encryption key source) for every storage account, from the shared section 4 evaluation."""
+    accounts = []
+    for subscription, account_results in storagerules.evaluate(["4.11"]):
+        for account, outcomes in account_results or []:
+            status, color, key_source, details, proof = outcomes["4.11"]
+            accounts.append((account["id"], key_source))
+    return accounts
 
 def get_default_domain():
     try:
         command = ["az", "account", "list", "--query", "[?isDefault].tenantDefaultDomain", "-o", "json"]
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+        result = armclient.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
         
         default_domains = json.loads(result.stdout)
         if default_domains:
@@ -67,7 +57,8 @@ def generate_links(storage_account_ids, default_domain):
     return links
 
 def main():
-    storage_account_ids = get_storage_account_ids()
+    storage_accounts = get_storage_accounts()
+    storage_account_ids = [storage_id for storage_id, key_source in storage_accounts]
 
     if not storage_account_ids:
         print(
@@ -75,6 +66,7 @@ def main():
             "No storage accounts found. Please ensure you have the necessary permissions." +
             Style.RESET_ALL
         )
+        records.verdict("FAIL", reason="no storage accounts")
         sys.exit(0)
 
     default_domain = get_default_domain()
@@ -96,5 +88,12 @@ def main():
         print(f"| {link.ljust(box_width - 4)} |")
     print(border)
 
+    print("\nEncryption key source per storage account (Microsoft.Keyvault means customer-managed keys):")
+    for storage_id, key_source in storage_accounts:
+        color = Fore.GREEN if key_source == "Microsoft.Keyvault" else Fore.YELLOW
+        print(f"{storage_id} - {color}{key_source}{Style.RESET_ALL}")
+        records.resource(storage_id, "MANUAL", keySource=key_source)
+    records.verdict("MANUAL")
+
 if __name__ == "__main__":
     main()
@@ -3,6 +3,9 @@ import subprocess
 import colorama
 from colorama import Fore, Style
 from datetime import datetime, timedelta
+import inventory
+import armclient
+import records
 
 colorama.init(autoreset=True)
 
@@ -13,7 +16,7 @@ API_VERSION_STORAGE = "2021-08-01"
 def run_command(command):
     """Runs a shell command and returns the output or None if the command fails."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"{Fore.RED}Error executing command: {e}{Style.RESET_ALL}")
@@ -22,7 +25,7 @@ def run_command(command):
 def check_authentication():
     """Check if already authenticated with Azure CLI to skip login."""
     try:
-        subprocess.run(['az', 'account', 'show'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        armclient.run(['az', 'account', 'show'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return True
     except subprocess.CalledProcessError:
         print(f"{Fore.RED}Not authenticated. Please authenticate using the main script.{Style.RESET_ALL}")
@@ -30,32 +33,25 @@ def check_authentication():
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
-    command = f"az rest --method get --url {RESOURCE}subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}"
-    response = run_command(command)
-    
-    if response:
-        try:
-            subscriptions = json.loads(response).get("value", [])
-            return subscriptions
-        except json.JSONDecodeError as e:
-            print(f"{Fore.RED}Error parsing JSON output for subscriptions: {e}{Style.RESET_ALL}")
-    else:
-        print(f"{Fore.RED}Failed to retrieve subscriptions.{Style.RESET_ALL}")
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
+    subscriptions = armclient.get_all(f"{RESOURCE}subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}")
+    if subscriptions is not None:
+        return subscriptions
+    print(f"{Fore.RED}Failed to retrieve subscriptions.{Style.RESET_ALL}")
     return []
 
 def get_storage_accounts(subscription_id):
     """Retrieve storage accounts in a specific subscription."""
+    storage_accounts = inventory.get_resources("storageAccounts", subscription_id)
+    if storage_accounts is not None:
+        return storage_accounts
     url = f"{RESOURCE}subscriptions/{subscription_id}/providers/Microsoft.Storage/storageAccounts?api-version={API_VERSION_STORAGE}"
-    command = f"az rest --method get --url {url}"
-    response = run_command(command)
-    
-    if response:
-        try:
-            return json.loads(response).get("value", [])
-        except json.JSONDecodeError as e:
-            print(f"{Fore.RED}Error parsing JSON for storage accounts in subscription {subscription_id}: {e}{Style.RESET_ALL}")
-    else:
-        print(f"{Fore.RED}Failed to retrieve storage accounts for subscription {subscription_id}.{Style.RESET_ALL}")
+    storage_accounts = armclient.get_all(url)
+    if storage_accounts is not None:
+        return storage_accounts
+    print(f"{Fore.RED}Failed to retrieve storage accounts for subscription {subscription_id}.{Style.RESET_ALL}")
     return []
 
 def check_key_regeneration(resource_id):
@@ -85,11 +81,13 @@ def check_key_regeneration_for_all_accounts():
     """Check key regeneration status for storage accounts across all subscriptions."""
     if not check_authentication():
         print(f"{Fore.RED}Please authenticate using the main script first.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="not authenticated")
         return
 
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     all_keys_regenerated = True  
@@ -115,17 +113,20 @@ def check_key_regeneration_for_all_accounts():
                 print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
                 print()
                 print(f"Storage Account: {account_name} - {Fore.GREEN}Key regenerated in the last 90 days{Style.RESET_ALL}")
+                records.resource(resource_id, "PASS", keyRegenerated=True)
             else:
                 print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
                 print()
                 print(f"Storage Account: {account_name} - {Fore.RED}Key not regenerated in the last 90 days{Style.RESET_ALL}")
                 all_keys_regenerated = False
+                records.resource(resource_id, "FAIL", keyRegenerated=False)
 
                 
                 print(f"{Fore.CYAN}Authorization:{Style.RESET_ALL}")
                 print(json.dumps(minimal_json, indent=4))  
 
     print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}Pass{Style.RESET_ALL}" if all_keys_regenerated else f"\n{Fore.CYAN}Final Status: {Fore.RED}Fail{Style.RESET_ALL}")
+    records.verdict("PASS" if all_keys_regenerated else "FAIL")
 
 def main():
     """Main function to check key regeneration compliance for storage accounts."""
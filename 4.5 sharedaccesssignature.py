@@ -1,7 +1,9 @@
 from colorama import init, Fore, Back, Style
 import subprocess
+import armclient
 import json
 import sys
+import records
 
 # Initialize colorama
 init(autoreset=True)
@@ -9,7 +11,7 @@ init(autoreset=True)
 def get_storage_account_ids():
     try:
         command = ["az", "storage", "account", "list", "--query", "[].id", "-o", "json"]
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+        result = armclient.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
         
         storage_account_ids = json.loads(result.stdout)
         return storage_account_ids
@@ -31,7 +33,7 @@ def get_storage_account_ids():
 def get_default_domain():
     try:
         command = ["az", "account", "list", "--query", "[?isDefault].tenantDefaultDomain", "-o", "json"]
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+        result = armclient.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
         
         default_domains = json.loads(result.stdout)
         if default_domains:
@@ -75,6 +77,7 @@ def main():
             "No storage accounts found. Please ensure you have the necessary permissions." +
             Style.RESET_ALL
         )
+        records.verdict("FAIL", reason="no storage accounts")
         sys.exit(0)
 
     default_domain = get_default_domain()
@@ -95,6 +98,7 @@ def main():
     for link in links:
         print(f"| {link.ljust(box_width - 4)} |")
     print(border)
+    records.verdict("MANUAL")
 
 if __name__ == "__main__":
     main()
@@ -1,28 +1,34 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --query '[].{id:id, name:name}' -o json"
-    result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
+    result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
     subscriptions = json.loads(result.stdout)
     return subscriptions
 
 def get_sql_servers(subscription_id):
     """Fetches the list of SQL servers for a specific subscription."""
     command = f"az sql server list --subscription {subscription_id} --query '[].{{name:name, resourceGroup:resourceGroup}}' -o json"
-    result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
+    result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
     sql_servers = json.loads(result.stdout)
     return sql_servers
 
 def check_audit_settings(resource_group, server_name, subscription_id):
     """Checks the audit settings for a specific SQL server."""
     command = f"az sql server audit-policy show --resource-group {resource_group} --server-name {server_name} --subscription {subscription_id} -o json"
-    result = subprocess.run(command, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    result = armclient.run(command, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     
     if result.returncode != 0:
         print(f"{Fore.RED}Failed to retrieve audit settings for server {server_name}.{Style.RESET_ALL}")
@@ -77,10 +83,15 @@ def main():
             compliant = check_audit_settings(resource_group, server_name, subscription_id)
             if compliant is False:  
                 overall_compliance = False
+            if compliant is not None:
+                records.resource(server.get("id", server_name), "PASS" if compliant else "FAIL", auditTargetEnabled=compliant)
 
     
     if found_sql_servers:
         print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}Pass{Style.RESET_ALL}" if overall_compliance else f"\n{Fore.CYAN}Final Status: {Fore.RED}Fail{Style.RESET_ALL}")
+        records.verdict("PASS" if overall_compliance else "FAIL")
+    else:
+        records.verdict("FAIL", reason="no SQL servers")
 
 
 if __name__ == "__main__":
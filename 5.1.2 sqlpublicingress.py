@@ -1,7 +1,8 @@
-import subprocess
-import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import armclient
+import records
 
 colorama.init(autoreset=True)
 
@@ -10,59 +11,33 @@ RESOURCE = "https://management.azure.com"
 API_VERSION_SQL = "2021-02-01-preview"
 API_VERSION_SUBSCRIPTIONS = "2020-01-01"
 
-def run_command(command):
-    """Runs a shell command and returns the output or None if the command fails."""
-    try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return process.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print(f"{Fore.RED}Error executing command: {e.stderr.strip()}{Style.RESET_ALL}")
-        return None
-
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
-    command = f"az rest --method get --url {RESOURCE}/subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}"
-    response = run_command(command)
-
-    if response:
-        try:
-            subscriptions = json.loads(response).get("value", [])
-            return subscriptions
-        except json.JSONDecodeError as e:
-            print(f"{Fore.RED}Error parsing subscriptions JSON: {e}{Style.RESET_ALL}")
-    else:
-        print(f"{Fore.RED}Failed to retrieve subscriptions.{Style.RESET_ALL}")
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
+    subscriptions = armclient.get_all(f"{RESOURCE}/subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}")
+    if subscriptions is not None:
+        return subscriptions
+    print(f"{Fore.RED}Failed to retrieve subscriptions.{Style.RESET_ALL}")
     return []
 
 def get_sql_servers(subscription_id):
     """Fetches the list of SQL servers for a specific subscription."""
     url = f"{RESOURCE}/subscriptions/{subscription_id}/providers/Microsoft.Sql/servers?api-version={API_VERSION_SQL}"
-    command = f"az rest --method get --url {url}"
-    response = run_command(command)
-
-    if response:
-        try:
-            sql_servers = json.loads(response).get("value", [])
-            return sql_servers
-        except json.JSONDecodeError as e:
-            print(f"{Fore.RED}Error parsing SQL servers JSON: {e}{Style.RESET_ALL}")
-    else:
-        print(f"{Fore.RED}Failed to retrieve SQL servers for subscription ID {subscription_id}.{Style.RESET_ALL}")
+    sql_servers = armclient.get_all(url)
+    if sql_servers is not None:
+        return sql_servers
+    print(f"{Fore.RED}Failed to retrieve SQL servers for subscription ID {subscription_id}.{Style.RESET_ALL}")
     return []
 
 def get_firewall_rules(resource_group, sql_server, subscription_id):
     """Fetches the firewall rules for a specific SQL server."""
     url = f"{RESOURCE}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Sql/servers/{sql_server}/firewallRules?api-version={API_VERSION_SQL}"
-    command = f"az rest --method get --url {url}"
-    response = run_command(command)
-
-    if response:
-        try:
-            return json.loads(response).get("value", [])
-        except json.JSONDecodeError as e:
-            print(f"{Fore.RED}Error parsing firewall rules JSON: {e}{Style.RESET_ALL}")
-    else:
-        print(f"{Fore.RED}Failed to retrieve firewall rules for SQL server {sql_server}.{Style.RESET_ALL}")
+    firewall_rules = armclient.get_all(url)
+    if firewall_rules is not None:
+        return firewall_rules
+    print(f"{Fore.RED}Failed to retrieve firewall rules for SQL server {sql_server}.{Style.RESET_ALL}")
     return []
 
 def check_firewall_rules(firewall_rules):
@@ -109,6 +84,7 @@ def display_sql_firewall_compliance_status():
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     found_sql_servers = False
@@ -136,6 +112,9 @@ def display_sql_firewall_compliance_status():
     
     if found_sql_servers:
         print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}Pass{Style.RESET_ALL}" if overall_compliance else f"\n{Fore.CYAN}Final Status: {Fore.RED}Fail{Style.RESET_ALL}")
+        records.verdict("PASS" if overall_compliance else "FAIL")
+    else:
+        records.verdict("FAIL", reason="no SQL servers")
 
 
 def main():
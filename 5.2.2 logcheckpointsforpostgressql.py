@@ -1,33 +1,55 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
+INVENTORY_COLLECTIONS = ["postgresFlexibleServers"]
+
 def get_subscriptions():
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --query '[].{id:id, name:name}' -o json"
-    result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
+    result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
     subscriptions = json.loads(result.stdout)
     return subscriptions
 
 def get_postgres_servers(subscription_id):
-    command = f"az postgres flexible-server list --subscription {subscription_id} --query '[].{{name:name, resourceGroup:resourceGroup}}' -o json"
-    result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
+    servers = inventory.get_flexible_servers("postgresFlexibleServers", subscription_id)
+    if servers is not None:
+        return servers
+    command = f"az postgres flexible-server list --subscription {subscription_id} --query '[].{{id:id, name:name, resourceGroup:resourceGroup}}' -o json"
+    result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
     servers = json.loads(result.stdout)
     return servers
 
-def check_log_checkpoints_parameter(server_name, resource_group, subscription_id):
-    command = f"az postgres flexible-server parameter show --resource-group {resource_group} --server-name {server_name} --subscription {subscription_id} --name log_checkpoints --query value -o json"
-    result = subprocess.run(command, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    
+def get_parameter(server, subscription_id, name):
+    """Returns (value, error) for a server parameter, from the collected configuration when there is one, otherwise using Azure CLI."""
+    configurations = server.get("configurations")
+    if configurations is not None:
+        if configurations.get(name) is None:
+            return None, f"{name} is not in the server configuration"
+        return configurations[name], None
+    command = f"az postgres flexible-server parameter show --resource-group {server['resourceGroup']} --server-name {server['name']} --subscription {subscription_id} --name {name} --query value -o json"
+    result = armclient.run(command, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     if result.returncode != 0:
-        print(f"{Fore.RED}Failed to retrieve log_checkpoints setting for server {server_name}.{Style.RESET_ALL}")
-        print(f"{Fore.RED}Error: {result.stderr.strip()}{Style.RESET_ALL}")
-        return None
+        return None, result.stderr.strip()
+    return json.loads(result.stdout), None
 
+def check_log_checkpoints_parameter(server, subscription_id):
+    server_name = server["name"]
     try:
-        log_checkpoints_status = json.loads(result.stdout)
+        log_checkpoints_status, error = get_parameter(server, subscription_id, "log_checkpoints")
+        if error:
+            print(f"{Fore.RED}Failed to retrieve log_checkpoints setting for server {server_name}.{Style.RESET_ALL}")
+            print(f"{Fore.RED}Error: {error}{Style.RESET_ALL}")
+            return None
+
         color = Fore.GREEN if log_checkpoints_status == "on" else Fore.RED
         status_text = log_checkpoints_status
         print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
@@ -40,6 +62,8 @@ def check_log_checkpoints_parameter(server_name, resource_group, subscription_id
 
 def main():
     subscriptions = get_subscriptions()
+    overall_compliance = True
+    found_servers = False
 
     for subscription in subscriptions:
         subscription_id = subscription["id"]
@@ -53,12 +77,22 @@ def main():
             print(f"{Fore.RED}No PostgreSQL servers found in subscription {subscription_name}.{Style.RESET_ALL}")
             continue
 
+        found_servers = True
+
         for server in servers:
             server_name = server["name"]
-            resource_group = server["resourceGroup"]
 
             print(f"{Fore.YELLOW}Checking log checkpoint setting for PostgreSQL server '{server_name}'...{Style.RESET_ALL}")
-            check_log_checkpoints_parameter(server_name, resource_group, subscription_id)
+            log_checkpoints_status = check_log_checkpoints_parameter(server, subscription_id)
+            records.resource(server.get("id", server_name), "PASS" if log_checkpoints_status == "on" else "FAIL", logCheckpoints=log_checkpoints_status)
+            if log_checkpoints_status != "on":
+                overall_compliance = False
+
+    if found_servers:
+        print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}Pass{Style.RESET_ALL}" if overall_compliance else f"\n{Fore.CYAN}Final Status: {Fore.RED}Fail{Style.RESET_ALL}")
+        records.verdict("PASS" if overall_compliance else "FAIL")
+    else:
+        records.verdict("FAIL", reason="no PostgreSQL servers")
 
 if __name__ == "__main__":
     main()
@@ -1,40 +1,64 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
+INVENTORY_COLLECTIONS = ["postgresFlexibleServers"]
+
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --query '[].{id:id, name:name}' -o json"
-    result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
+    result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
     subscriptions = json.loads(result.stdout)
     return subscriptions
 
 def get_postgres_servers(subscription_id):
     """Fetches the list of PostgreSQL Flexible Servers for a specific subscription."""
-    command = f"az postgres flexible-server list --subscription {subscription_id} --query '[].{{name:name, resourceGroup:resourceGroup}}' -o json"
-    result = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
+    servers = inventory.get_flexible_servers("postgresFlexibleServers", subscription_id)
+    if servers is not None:
+        return servers
+    command = f"az postgres flexible-server list --subscription {subscription_id} --query '[].{{id:id, name:name, resourceGroup:resourceGroup}}' -o json"
+    result = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE)
     servers = json.loads(result.stdout)
     return servers
 
-def check_retention_days(server_name, resource_group, subscription_id, overall_compliance):
-    """Runs the az postgres flexible-server parameter show command to check the logfiles.retention_days setting."""
-    command = f"az postgres flexible-server parameter show --resource-group {resource_group} --server-name {server_name} --subscription {subscription_id} --name logfiles.retention_days --query value -o json"
-    result = subprocess.run(command, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    
+def get_parameter(server, subscription_id, name):
+    """Returns (value, error) for a server parameter, from the collected configuration when there is one, otherwise using Azure CLI."""
+    configurations = server.get("configurations")
+    if configurations is not None:
+        if configurations.get(name) is None:
+            return None, f"{name} is not in the server configuration"
+        return configurations[name], None
+    command = f"az postgres flexible-server parameter show --resource-group {server['resourceGroup']} --server-name {server['name']} --subscription {subscription_id} --name {name} --query value -o json"
+    result = armclient.run(command, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     if result.returncode != 0:
-        print(f"{Fore.RED}Failed to retrieve logfiles.retention_days setting for server {server_name}.{Style.RESET_ALL}")
-        print(f"{Fore.RED}Error: {result.stderr.strip()}{Style.RESET_ALL}")
-        return overall_compliance
+        return None, result.stderr.strip()
+    return json.loads(result.stdout), None
 
+def check_retention_days(server, subscription_id, overall_compliance):
+    """Checks the logfiles.retention_days setting of a PostgreSQL flexible server."""
+    server_name = server["name"]
     try:
-        retention_days = int(json.loads(result.stdout))
+        retention_days, error = get_parameter(server, subscription_id, "logfiles.retention_days")
+        if error:
+            print(f"{Fore.RED}Failed to retrieve logfiles.retention_days setting for server {server_name}.{Style.RESET_ALL}")
+            print(f"{Fore.RED}Error: {error}{Style.RESET_ALL}")
+            return overall_compliance
+
+        retention_days = int(retention_days)
         color = Fore.GREEN if retention_days > 3 else Fore.RED
         print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
         print()
         print(f"Server: {server_name} - logfiles.retention_days: {color}{retention_days}{Style.RESET_ALL}")
+        records.resource(server.get("id", server_name), "PASS" if retention_days > 3 else "FAIL", retentionDays=retention_days)
 
         
         if retention_days <= 3:
@@ -68,14 +92,16 @@ def main():
 
         for server in servers:
             server_name = server["name"]
-            resource_group = server["resourceGroup"]
 
             print(f"{Fore.CYAN}Checking logfiles.retention_days setting for PostgreSQL server '{server_name}'...{Style.RESET_ALL}")
-            overall_compliance = check_retention_days(server_name, resource_group, subscription_id, overall_compliance)
+            overall_compliance = check_retention_days(server, subscription_id, overall_compliance)
 
     
     if found_servers:
         print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}Pass{Style.RESET_ALL}" if overall_compliance else f"\n{Fore.CYAN}Final Status: {Fore.RED}Fail{Style.RESET_ALL}")
+        records.verdict("PASS" if overall_compliance else "FAIL")
+    else:
+        records.verdict("FAIL", reason="no PostgreSQL servers")
 
 
 if __name__ == "__main__":
@@ -1,20 +1,26 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
 def run_command(command):
     """Runs a shell command and returns the output and error."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip(), None
     except subprocess.CalledProcessError as e:
         return None, e.stderr.strip()
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --query '[].{id:id, name:name}' -o json"
     output, error = run_command(command)
     if error:
@@ -74,6 +80,7 @@ def main():
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found. Exiting.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     overall_compliance = True
@@ -102,6 +109,9 @@ def main():
     
     if found_servers:
         print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}Pass{Style.RESET_ALL}" if overall_compliance else f"\n{Fore.CYAN}Final Status: {Fore.RED}Fail{Style.RESET_ALL}")
+        records.verdict("PASS" if overall_compliance else "FAIL")
+    else:
+        records.verdict("FAIL", reason="no PostgreSQL servers")
 
 
 if __name__ == "__main__":
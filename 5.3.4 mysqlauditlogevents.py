@@ -1,14 +1,19 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
+INVENTORY_COLLECTIONS = ["mysqlFlexibleServers"]
+
 def run_command(command):
     """Runs a shell command and returns the output or None if the command fails."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"{Fore.RED}Error executing command: {e.stderr}{Style.RESET_ALL}")
@@ -16,6 +21,9 @@ def run_command(command):
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --query '[].{id:id, name:name}' -o json"
     result = run_command(command)
     if result:
@@ -30,7 +38,10 @@ def get_subscriptions():
 
 def get_mysql_flexible_servers(subscription_id):
     """Fetches the list of MySQL flexible servers for a specific subscription."""
-    command = f"az mysql flexible-server list --subscription {subscription_id} --query '[].{{name:name, resourceGroup:resourceGroup}}' -o json"
+    servers = inventory.get_flexible_servers("mysqlFlexibleServers", subscription_id)
+    if servers is not None:
+        return servers
+    command = f"az mysql flexible-server list --subscription {subscription_id} --query '[].{{id:id, name:name, resourceGroup:resourceGroup}}' -o json"
     result = run_command(command)
     if result:
         try:
@@ -40,27 +51,38 @@ def get_mysql_flexible_servers(subscription_id):
             print(f"{Fore.RED}Error parsing server JSON: {e}{Style.RESET_ALL}")
     return []
 
-def check_audit_log_events(server_name, resource_group, subscription_id):
-    """Checks if the audit_log_events parameter includes 'CONNECTION' for a specific MySQL flexible server."""
-    command = f"az mysql flexible-server parameter show --resource-group {resource_group} --server-name {server_name} --subscription {subscription_id} --name audit_log_events -o json"
+def get_parameter(server, subscription_id, name):
+    """Returns a server parameter as {name, value}, from the collected configuration when there is one, otherwise using Azure CLI."""
+    configurations = server.get("configurations")
+    if configurations is not None:
+        return {"name": name, "value": configurations[name]} if configurations.get(name) is not None else None
+    command = f"az mysql flexible-server parameter show --resource-group {server['resourceGroup']} --server-name {server['name']} --subscription {subscription_id} --name {name} -o json"
     result = run_command(command)
-    
     if result:
         try:
-            config = json.loads(result)
-            audit_log_events = config.get("value", "")
-            print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
-            print()
-            
-            
-            if "CONNECTION" in audit_log_events:
-                print(f"MySQL Flexible Server: {server_name} - audit_log_events: {Fore.GREEN}CONNECTION included{Style.RESET_ALL}")
-                return True
-            else:
-                print(f"MySQL Flexible Server: {server_name} - audit_log_events: {Fore.RED}CONNECTION not included{Style.RESET_ALL}")
-                return False
+            return json.loads(result)
         except json.JSONDecodeError:
-            print(f"{Fore.RED}Failed to parse audit_log_events setting for server {server_name}.{Style.RESET_ALL}")
+            print(f"{Fore.RED}Failed to parse {name} setting for server {server['name']}.{Style.RESET_ALL}")
+    return None
+
+def check_audit_log_events(server, subscription_id):
+    """Checks if the audit_log_events parameter includes 'CONNECTION' for a specific MySQL flexible server."""
+    server_name = server["name"]
+    config = get_parameter(server, subscription_id, "audit_log_events")
+    
+    if config:
+        audit_log_events = config.get("value", "")
+        print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
+        print()
+        
+        
+        if "CONNECTION" in audit_log_events:
+            print(f"MySQL Flexible Server: {server_name} - audit_log_events: {Fore.GREEN}CONNECTION included{Style.RESET_ALL}")
+            records.resource(server.get("id", server_name), "PASS", auditLogEvents=audit_log_events)
+            return True
+        else:
+            print(f"MySQL Flexible Server: {server_name} - audit_log_events: {Fore.RED}CONNECTION not included{Style.RESET_ALL}")
+            records.resource(server.get("id", server_name), "FAIL", auditLogEvents=audit_log_events)
             return False
     else:
         print(f"{Fore.RED}Failed to retrieve audit_log_events setting for server {server_name}.{Style.RESET_ALL}")
@@ -92,15 +114,16 @@ def main():
         
         for server in servers:
             found_servers = True
-            server_name = server["name"]
-            resource_group = server["resourceGroup"]
-            is_compliant = check_audit_log_events(server_name, resource_group, subscription_id)
+            is_compliant = check_audit_log_events(server, subscription_id)
             if not is_compliant:
                 overall_compliance = False
 
     
     if found_servers:
         print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}Pass{Style.RESET_ALL}" if overall_compliance else f"\n{Fore.CYAN}Final Status: {Fore.RED}Fail{Style.RESET_ALL}")
+        records.verdict("PASS" if overall_compliance else "FAIL")
+    else:
+        records.verdict("FAIL", reason="no MySQL servers")
 
 
 if __name__ == "__main__":
@@ -1,32 +1,28 @@
 import colorama
 import subprocess
+import armclient
 import json
-import requests
 from colorama import Fore, Style
+import inventory
+import records
+import diagnostics
 
 
 colorama.init(autoreset=True)
 
-resource = "https://management.azure.com/"
-
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip()
     except subprocess.CalledProcessError:
         return None
 
-def get_access_token():
-    """Retrieve an access token using the Azure CLI."""
-    command = 'az account get-access-token --query accessToken -o tsv'
-    access_token = run_command(command)
-    if not access_token:
-        print(f"{Fore.RED}Failed to retrieve access token. Ensure you are logged in with 'az login'.{Style.RESET_ALL}")
-    return access_token
-
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}' -o json"
     result = run_command(command)
     
@@ -40,55 +36,28 @@ def get_subscriptions():
             return []
     return []
 
-def check_diagnostic_settings_subscription(subscription_id, access_token):
+def describe_settings(status, data):
+    """Maps a diagnostics.get_settings outcome to (colour, message, full output)."""
+    if status == 'configured':
+        return 'green', "Diagnostic settings enabled", {"value": data}
+    if status == 'not_configured':
+        return 'red', "Diagnostic settings not enabled", {"value": data}
+    if status == 'unsupported':
+        return 'yellow', "Diagnostic settings not supported", {}
+    return 'red', f"Failed to retrieve diagnostic settings ({data})", {}
+
+def check_diagnostic_settings_subscription(subscription_id):
     """Checks diagnostic settings for the given subscription."""
-    url = f"{resource}subscriptions/{subscription_id}/providers/Microsoft.Insights/diagnosticSettings?api-version=2017-05-01-preview"
-    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        settings = response.json()
-        if settings.get("value", []):
-            return 'green', "Diagnostic settings enabled", settings
-        return 'red', "Diagnostic settings not enabled", settings
-    else:
-        return 'red', f"Failed to retrieve diagnostic settings ({response.status_code})", response.json()
+    return describe_settings(*diagnostics.get_settings(f"/subscriptions/{subscription_id}"))
 
-def get_resources_in_subscription(subscription_id):
-    """Fetches the list of all resources in a subscription."""
-    command = f'az resource list --subscription {subscription_id} --query "[].id" --output json'
-    result = run_command(command)
-    
-    if result:
-        try:
-            return json.loads(result)
-        except json.JSONDecodeError:
-            return []
-    return []
-
-def check_diagnostic_settings_resource(resource_id, access_token):
-    """Checks diagnostic settings for the given resource."""
-    url = f"{resource}{resource_id}/providers/Microsoft.Insights/diagnosticSettings?api-version=2017-05-01-preview"
-    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        settings = response.json()
-        if settings.get("value", []):
-            return 'green', "Diagnostic settings enabled", settings
-        return 'red', "Diagnostic settings not enabled", settings
-    else:
-        return 'red', f"Failed to retrieve diagnostic settings ({response.status_code})", response.json()
+def print_status(label, name, color, status, full_output):
+    """Prints one subscription's or resource's diagnostic settings status."""
+    color_code = {'green': Fore.GREEN, 'yellow': Fore.YELLOW}.get(color, Fore.RED)
+    print(f"{label}: {name} - {color_code}{status}{Style.RESET_ALL}")
+    print(f"Full Output:\n{json.dumps(full_output, indent=4)}\n")
 
 def display_diagnostic_settings_status():
     """Iterates through each subscription and resource to check the diagnostic settings."""
-    
-    access_token = get_access_token()
-    if not access_token:
-        print(f"{Fore.RED}Cannot proceed without access token.{Style.RESET_ALL}")
-        return
-
-    
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
@@ -96,38 +65,38 @@ def display_diagnostic_settings_status():
 
     all_compliant = True
     resources_checked = False
+    print(f"{Fore.CYAN}Listing resources in {len(subscriptions)} subscription(s)...{Style.RESET_ALL}")
+    listing = diagnostics.list_resources(subscription["subscriptionId"] for subscription in subscriptions)
 
-    for subscription in subscriptions:
-        subscription_id = subscription["subscriptionId"]
+    for subscription, (subscription_id, resources) in zip(subscriptions, listing):
         subscription_name = subscription["displayName"]
         print(f"\n{Fore.YELLOW}Checking diagnostic settings for subscription: {subscription_name}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
         print()
 
         
-        color, status, full_output = check_diagnostic_settings_subscription(subscription_id, access_token)
+        color, status, full_output = check_diagnostic_settings_subscription(subscription_id)
         if color == 'red':
             all_compliant = False
-        print(f"Subscription: {subscription_name} - {Fore.GREEN if color == 'green' else Fore.RED}{status}{Style.RESET_ALL}")
-        print(f"Full Output:\n{json.dumps(full_output, indent=4)}\n")
+        print_status("Subscription", subscription_name, color, status, full_output)
+        records.resource(f"/subscriptions/{subscription_id}", "FAIL" if color == 'red' else "PASS")
 
         
-        resources = get_resources_in_subscription(subscription_id)
         if not resources:
             print(f"{Fore.YELLOW}No resources found in subscription {subscription_name}.{Style.RESET_ALL}")
             continue
 
         
-        for resource_id in resources:
+        for resource, settings_status, data in diagnostics.scan(resources):
             resources_checked = True
-            color, status, full_output = check_diagnostic_settings_resource(resource_id, access_token)
-            resource_name = resource_id.split('/')[-1]
+            color, status, full_output = describe_settings(settings_status, data)
             if color == 'red':
                 all_compliant = False
             print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
             print()
-            print(f"Resource: {resource_name} - {Fore.GREEN if color == 'green' else Fore.RED}{status}{Style.RESET_ALL}")
-            print(f"Full Output:\n{json.dumps(full_output, indent=4)}\n")
+            print_status("Resource", resource["name"], color, status, full_output)
+            if settings_status != 'unsupported':
+                records.resource(resource["id"], "FAIL" if color == 'red' else "PASS")
 
     
     if resources_checked:
@@ -135,6 +104,7 @@ def display_diagnostic_settings_status():
             print(f"\n{Fore.GREEN}Final Status: PASS{Style.RESET_ALL}")
         else:
             print(f"\n{Fore.RED}Final Status: FAIL{Style.RESET_ALL}")
+        records.verdict("PASS" if all_compliant else "FAIL")
     else:
         print(f"\n{Fore.YELLOW}No resources checked. Final Status not applicable.{Style.RESET_ALL}")
 
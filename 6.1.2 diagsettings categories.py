@@ -3,6 +3,9 @@ import json
 import requests
 from colorama import Fore, Style
 import subprocess
+import armclient
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
@@ -12,7 +15,7 @@ API_VERSION_DIAGNOSTICS = "2017-05-01-preview"
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip()
     except subprocess.CalledProcessError:
         return None
@@ -29,6 +32,9 @@ def get_access_token():
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}' -o json"
     result = run_command(command)
     
@@ -80,12 +86,14 @@ def display_diagnostic_settings_status():
     access_token = get_access_token()
     if not access_token:
         print(f"{Fore.RED}Cannot proceed without access token.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no access token")
         return
 
     
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     all_compliant = True
@@ -128,8 +136,10 @@ def display_diagnostic_settings_status():
             print(f"\n{Fore.GREEN}Final Status: PASS - All diagnostic settings are compliant.{Style.RESET_ALL}")
         else:
             print(f"\n{Fore.RED}Final Status: FAIL - Some diagnostic settings are non-compliant.{Style.RESET_ALL}")
+        records.verdict("PASS" if all_compliant else "FAIL")
     else:
         print(f"\n{Fore.YELLOW}No diagnostic settings found. Final Status not applicable.{Style.RESET_ALL}")
+        records.verdict("MANUAL", reason="no diagnostic settings")
 
 def main():
     display_diagnostic_settings_status()
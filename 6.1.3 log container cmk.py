@@ -1,8 +1,11 @@
 import json
 import subprocess
+import armclient
 import requests
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 RESOURCE = "https://management.azure.com"
@@ -10,7 +13,7 @@ RESOURCE = "https://management.azure.com"
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"{Fore.RED}Error executing command: {e}{Style.RESET_ALL}")
@@ -28,6 +31,9 @@ def get_access_token():
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}' -o json"
     result = run_command(command)
     
@@ -93,12 +99,14 @@ def display_encryption_status():
     access_token = get_access_token()
     if not access_token:
         print(f"{Fore.RED}Cannot proceed without access token.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no access token")
         return
 
     
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     all_compliant = True
@@ -139,6 +147,9 @@ def display_encryption_status():
             print(f"\n{Fore.GREEN}Final Status: PASS - All storage accounts are encrypted with CMK.{Style.RESET_ALL}")
         else:
             print(f"\n{Fore.RED}Final Status: FAIL - Some storage accounts are not encrypted with CMK.{Style.RESET_ALL}")
+        records.verdict("PASS" if all_compliant else "FAIL")
+    else:
+        records.verdict("FAIL", reason="no log storage accounts")
 
 def main():
     display_encryption_status()
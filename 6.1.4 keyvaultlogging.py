@@ -1,8 +1,11 @@
 import json
 import subprocess
+import armclient
 import colorama
 import requests
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 RESOURCE = "https://management.azure.com"
@@ -10,7 +13,7 @@ RESOURCE = "https://management.azure.com"
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"{Fore.RED}Error executing command: {e}{Style.RESET_ALL}")
@@ -18,6 +21,9 @@ def run_command(command):
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}'"
     result = run_command(command)
     
@@ -99,6 +105,7 @@ def display_key_vault_logging_status():
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     all_compliant = True
@@ -147,8 +154,10 @@ def display_key_vault_logging_status():
             print(f"\n{Fore.GREEN}Final Status: PASS - All Key Vaults have logging enabled.{Style.RESET_ALL}")
         else:
             print(f"\n{Fore.RED}Final Status: FAIL - Some Key Vaults do not have logging enabled.{Style.RESET_ALL}")
+        records.verdict("PASS" if all_compliant else "FAIL")
     else:
         print(f"\n{Fore.YELLOW}No Key Vaults found. Final status not applicable.{Style.RESET_ALL}")
+        records.verdict("MANUAL", reason="no key vaults")
 
 def main():
     display_key_vault_logging_status()
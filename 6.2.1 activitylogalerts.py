@@ -1,7 +1,8 @@
-import subprocess
-import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import armclient
+import records
 
 colorama.init(autoreset=True)
 
@@ -9,28 +10,15 @@ RESOURCE = "https://management.azure.com"
 API_VERSION_SUBSCRIPTIONS = "2020-01-01"
 API_VERSION_ACTIVITY_LOG_ALERTS = "2017-04-01"
 
-def run_command(command):
-    """Runs a shell command and returns the output or None if the command fails."""
-    try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return process.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print(f"{Fore.RED}Error executing command: {e.stderr}{Style.RESET_ALL}")
-        return None
-
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
-    command = f"az rest --method get --url {RESOURCE}/subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}"
-    response = run_command(command)
-
-    if response:
-        try:
-            subscriptions = json.loads(response).get("value", [])
-            return subscriptions
-        except json.JSONDecodeError as e:
-            print(f"{Fore.RED}Error parsing subscription JSON: {e}{Style.RESET_ALL}")
-    else:
-        print(f"{Fore.RED}Failed to retrieve subscriptions.{Style.RESET_ALL}")
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
+    subscriptions = armclient.get_all(f"{RESOURCE}/subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}")
+    if subscriptions is not None:
+        return subscriptions
+    print(f"{Fore.RED}Failed to retrieve subscriptions.{Style.RESET_ALL}")
     return []
 
 def get_activity_log_alerts(subscription_id):
@@ -39,16 +27,10 @@ def get_activity_log_alerts(subscription_id):
     print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
     print()
     url = f"{RESOURCE}/subscriptions/{subscription_id}/providers/Microsoft.Insights/activityLogAlerts?api-version={API_VERSION_ACTIVITY_LOG_ALERTS}"
-    command = f"az rest --method get --url {url}"
-    response = run_command(command)
-
-    if response:
-        try:
-            return json.loads(response).get("value", [])
-        except json.JSONDecodeError as e:
-            print(f"{Fore.RED}Error parsing activity log alert JSON: {e}{Style.RESET_ALL}")
-    else:
-        print(f"{Fore.RED}Failed to retrieve activity log alerts for subscription {subscription_id}.{Style.RESET_ALL}")
+    activity_log_alerts = armclient.get_all(url)
+    if activity_log_alerts is not None:
+        return activity_log_alerts
+    print(f"{Fore.RED}Failed to retrieve activity log alerts for subscription {subscription_id}.{Style.RESET_ALL}")
     return []
 
 def check_activity_log_alert(alerts, action_type):
@@ -79,6 +61,7 @@ def display_activity_log_alert_status():
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     overall_compliance = True
@@ -109,6 +92,7 @@ def display_activity_log_alert_status():
         print(f"{Fore.GREEN}Final Status: PASS{Style.RESET_ALL}")
     else:
         print(f"{Fore.RED}Final Status: FAIL{Style.RESET_ALL}")
+    records.verdict("PASS" if overall_compliance else "FAIL")
 
 def main():
     """Entry point for Activity Log Alerts compliance check."""
@@ -1,7 +1,10 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 RESOURCE = "https://management.azure.com"
@@ -9,7 +12,7 @@ RESOURCE = "https://management.azure.com"
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"{Fore.RED}Error executing command: {e}{Style.RESET_ALL}")
@@ -27,6 +30,9 @@ def get_access_token():
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}'"
     result = run_command(command)
     
@@ -64,6 +70,7 @@ def display_application_insights_status():
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     overall_compliance = True  
@@ -77,6 +84,7 @@ def display_application_insights_status():
 
         
         is_configured, insights_data = check_application_insights(subscription_id)
+        records.resource(subscription_id, "PASS" if is_configured else "FAIL", subscription=subscription_name)
 
         
         if is_configured:
@@ -93,6 +101,7 @@ def display_application_insights_status():
         print(f"{Fore.GREEN}Final Status: PASS{Style.RESET_ALL}")
     else:
         print(f"{Fore.RED}Final Status: FAIL{Style.RESET_ALL}")
+    records.verdict("PASS" if overall_compliance else "FAIL")
 
 def main():
     display_application_insights_status()
@@ -1,20 +1,26 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
 def run_command(command):
     """Runs a shell command and returns the output and any error encountered."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip(), None
     except subprocess.CalledProcessError as e:
         return None, e.stderr
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, displayName:name}'"
     output, error = run_command(command)
     
@@ -79,6 +85,7 @@ def audit_all_subscriptions():
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
         print("Final Status: FAIL")  
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
     overall_status = "pass"  
@@ -113,6 +120,7 @@ def audit_all_subscriptions():
 
     
     print("Final Status: PASS" if overall_status == "pass" else "Final Status: FAIL")
+    records.verdict(overall_status)
 
 
 def main():
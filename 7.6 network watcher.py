@@ -1,20 +1,27 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
+import fanout
 
 colorama.init(autoreset=True)
 
 def run_command(command):
     """Runs a shell command and returns the output and any error encountered."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip(), None
     except subprocess.CalledProcessError as e:
         return None, str(e)
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}'"
     output, error = run_command(command)
     
@@ -29,17 +36,9 @@ def get_subscriptions():
         print(f"{Fore.RED}Failed to retrieve subscriptions. Error: {error}{Style.RESET_ALL}")
     return []
 
-def set_subscription(subscription_id):
-    """Sets the current Azure subscription."""
-    command = f'az account set --subscription {subscription_id}'
-    output, error = run_command(command)
-    if error:
-        print(f"{Fore.RED}Failed to set subscription {subscription_id}. Error: {error}{Style.RESET_ALL}")
-    return output is not None
-
-def get_network_watchers():
+def get_network_watchers(subscription_id):
     """Lists all network watchers and their provisioning state."""
-    command = 'az network watcher list --query "[].{Location:location,State:provisioningState}" -o json'
+    command = f'az network watcher list --subscription {subscription_id} --query "[].{{Location:location,State:provisioningState}}" -o json'
     output, error = run_command(command)
     
     if output:
@@ -53,9 +52,9 @@ def get_network_watchers():
         print(f"{Fore.RED}Failed to retrieve network watchers. Error: {error}{Style.RESET_ALL}")
     return []
 
-def get_physical_regions():
+def get_physical_regions(subscription_id):
     """Lists all physical regions for the subscription."""
-    command = "az account list-locations --query \"[?metadata.regionType=='Physical'].{Name:name,DisplayName:regionalDisplayName}\" -o json"
+    command = f"az account list-locations --subscription {subscription_id} --query \"[?metadata.regionType=='Physical'].{{Name:name,DisplayName:regionalDisplayName}}\" -o json"
     output, error = run_command(command)
     
     if output:
@@ -75,19 +74,13 @@ def check_network_watcher_status(subscription_id, subscription_name):
     print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
     print()
     
-    
-    if not set_subscription(subscription_id):
-        print(f"{Fore.RED}Failed to set subscription {subscription_name}{Style.RESET_ALL}")
-        return "fail"
-    
-    
-    network_watchers = get_network_watchers()
+    network_watchers = get_network_watchers(subscription_id)
     if not network_watchers:
         print(f"{Fore.RED}No network watchers found in subscription {subscription_name}.{Style.RESET_ALL}")
         return "fail"
 
     
-    regions = get_physical_regions()
+    regions = get_physical_regions(subscription_id)
     if not regions:
         print(f"{Fore.RED}No physical regions found in subscription {subscription_name}.{Style.RESET_ALL}")
         return "fail"
@@ -125,19 +118,12 @@ def main():
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
         return
 
-    overall_status = "pass"  
-
-    
-    for subscription in subscriptions:
-        subscription_id = subscription["subscriptionId"]
-        subscription_name = subscription["displayName"]
-        status = check_network_watcher_status(subscription_id, subscription_name)
-        
-        if status == "fail":
-            overall_status = "fail"
+    statuses = fanout.per_subscription(check_network_watcher_status, subscriptions)
+    overall_status = "fail" if "fail" in statuses else "pass"
 
     
     print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN if overall_status == 'pass' else Fore.RED}{overall_status.upper()}{Style.RESET_ALL}")
+    records.verdict(overall_status)
 
 if __name__ == "__main__":
     main()
@@ -1,20 +1,29 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
+import fanout
 
 colorama.init(autoreset=True)
 
+INVENTORY_COLLECTIONS = ["virtualMachines"]
+
 def run_command(command):
     """Runs a shell command and returns the output."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip(), None
     except subprocess.CalledProcessError as e:
         return None, str(e)
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}'"
     output, error = run_command(command)
     
@@ -29,16 +38,11 @@ def get_subscriptions():
         print(f"{Fore.RED}Failed to retrieve subscriptions. Error: {error}{Style.RESET_ALL}")
     return []
 
-def set_subscription(subscription_id):
-    """Sets the current Azure subscription."""
-    command = f'az account set --subscription {subscription_id}'
-    output, error = run_command(command)
-    if error:
-        print(f"{Fore.RED}Failed to set subscription {subscription_id}. Error: {error}{Style.RESET_ALL}")
-    return output is not None
-
 def list_vms(subscription_id):
-    """Lists all virtual machines in the current subscription."""
+    """Lists all virtual machines in the subscription."""
+    vms = inventory.get_virtual_machines(subscription_id)
+    if vms is not None:
+        return vms
     command = f'az vm list --subscription {subscription_id} --query "[].{{name:name, resourceGroup:resourceGroup}}" --output json'
     output, error = run_command(command)
     
@@ -53,8 +57,12 @@ def list_vms(subscription_id):
         print(f"{Fore.RED}Failed to retrieve VMs. Error: {error}{Style.RESET_ALL}")
     return []
 
-def check_vm_security_profile(resource_group, vm_name, subscription_id):
-    """Checks the security profile of a VM using Azure CLI."""
+def check_vm_security_profile(vm, subscription_id):
+    """Returns the security profile of a VM, from the VM listing when it has one, otherwise using Azure CLI."""
+    if "properties" in vm:
+        return vm["properties"].get("securityProfile")
+    resource_group = vm['resourceGroup']
+    vm_name = vm['name']
     command = f'az vm show -g {resource_group} -n {vm_name} --subscription {subscription_id} --query "securityProfile" --output json'
     output, error = run_command(command)
     
@@ -97,51 +105,37 @@ def check_vm_trusted_launch(subscription_id, subscription_name):
     print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
     print()
 
-    
-    if not set_subscription(subscription_id):
-        return True  
-
-    
     vms = list_vms(subscription_id)
     if not vms:
         print(f"{Fore.YELLOW}No virtual machines found in subscription {subscription_name}.{Style.RESET_ALL}")
         return True  
 
-    all_compliant = True
-
-    
-    for vm in vms:
+    def check_vm(vm):
         vm_name = vm['name']
-        resource_group = vm['resourceGroup']
 
-        security_profile = check_vm_security_profile(resource_group, vm_name, subscription_id)
+        security_profile = check_vm_security_profile(vm, subscription_id)
         compliant = analyze_security_profile(security_profile, vm_name)
-        if not compliant:
-            all_compliant = False
+        records.resource(vm.get("id", vm_name), "PASS" if compliant else "FAIL", securityType=(security_profile or {}).get("securityType"))
+        return compliant
 
-    return all_compliant
+    return all(fanout.map_ordered(check_vm, vms))
 
 def main():
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
         print("Final Status: FAIL")  
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
-    overall_compliant = True
-
-    for subscription in subscriptions:
-        subscription_id = subscription["subscriptionId"]
-        subscription_name = subscription["displayName"]
-        compliant = check_vm_trusted_launch(subscription_id, subscription_name)
-        if not compliant:
-            overall_compliant = False
+    overall_compliant = all(fanout.per_subscription(check_vm_trusted_launch, subscriptions))
 
     
     print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN if overall_compliant else Fore.RED}{'PASS' if overall_compliant else 'FAIL'}{Style.RESET_ALL}")
 
     
     print("Final Status: PASS" if overall_compliant else "Final Status: FAIL")
+    records.verdict("PASS" if overall_compliant else "FAIL")
 
 
 if __name__ == "__main__":
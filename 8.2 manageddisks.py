@@ -1,20 +1,29 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
+import fanout
 
 colorama.init(autoreset=True)
 
+INVENTORY_COLLECTIONS = ["virtualMachines"]
+
 def run_command(command):
     """Runs a shell command and returns the output and any error encountered."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip(), None
     except subprocess.CalledProcessError as e:
         return None, str(e)
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}'"
     output, error = run_command(command)
     
@@ -29,16 +38,11 @@ def get_subscriptions():
         print(f"{Fore.RED}Failed to retrieve subscriptions. Error: {error}{Style.RESET_ALL}")
     return []
 
-def set_subscription(subscription_id):
-    """Sets the current Azure subscription."""
-    command = f'az account set --subscription {subscription_id}'
-    output, error = run_command(command)
-    if error:
-        print(f"{Fore.RED}Failed to set subscription {subscription_id}. Error: {error}{Style.RESET_ALL}")
-    return output is not None
-
 def list_vms(subscription_id):
-    """Lists all virtual machines in the current subscription."""
+    """Lists all virtual machines in the subscription."""
+    vms = inventory.get_virtual_machines(subscription_id)
+    if vms is not None:
+        return vms
     command = f'az vm list --subscription {subscription_id} --query "[].{{name:name, resourceGroup:resourceGroup}}" --output json'
     output, error = run_command(command)
     
@@ -53,10 +57,15 @@ def list_vms(subscription_id):
         print(f"{Fore.RED}Failed to list VMs. Error: {error}{Style.RESET_ALL}")
     return []
 
-def check_vhd_status(resource_group, vm_name):
+def check_vhd_status(vm, subscription_id):
     """Checks if a VM is using managed disks or not based on the vhd field."""
-    command = f'az vm show -g {resource_group} -n {vm_name} --query "storageProfile.osDisk.vhd" --output json'
-    output, error = run_command(command)
+    vm_name = vm['name']
+    if "properties" in vm:
+        vhd_info = ((vm["properties"].get("storageProfile") or {}).get("osDisk") or {}).get("vhd")
+        output = json.dumps(vhd_info) if vhd_info else None
+    else:
+        command = f'az vm show -g {vm["resourceGroup"]} -n {vm_name} --subscription {subscription_id} --query "storageProfile.osDisk.vhd" --output json'
+        output, error = run_command(command)
     
     if output:
         print(f"{Fore.CYAN}VHD Information for VM {vm_name}:\n{output}{Style.RESET_ALL}")  
@@ -82,57 +91,44 @@ def check_vm_disks(subscription_id, subscription_name):
     print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
     print()
 
-    
-    if not set_subscription(subscription_id):
-        return False
-
-    
     vms = list_vms(subscription_id)
     if not vms:
         print(f"{Fore.YELLOW}No virtual machines found in subscription {subscription_name}.{Style.RESET_ALL}")
         return True
 
-    all_compliant = True
-
-    
-    for vm in vms:
+    def check_vm(vm):
         vm_name = vm['name']
-        resource_group = vm['resourceGroup']
 
-        vhd_info = check_vhd_status(resource_group, vm_name)
+        vhd_info = check_vhd_status(vm, subscription_id)
         print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
         print()
         if vhd_info:
             print(f"{Fore.RED}Managed disk not used in VM: {vm_name}{Style.RESET_ALL}")
             highlighted_vhd = highlight_vhd(vhd_info)
             print(f"{highlighted_vhd}")
-            all_compliant = False
         else:
             print(f"{Fore.GREEN}Managed disks used in VM: {vm_name}{Style.RESET_ALL}")
+        records.resource(vm.get("id", vm_name), "FAIL" if vhd_info else "PASS")
+        return not vhd_info
 
-    return all_compliant
+    return all(fanout.map_ordered(check_vm, vms))
 
 def main():
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
         print("Final Status: FAIL")  
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
-    overall_compliant = True
-
-    for subscription in subscriptions:
-        subscription_id = subscription["subscriptionId"]
-        subscription_name = subscription["displayName"]
-        compliant = check_vm_disks(subscription_id, subscription_name)
-        if not compliant:
-            overall_compliant = False
+    overall_compliant = all(fanout.per_subscription(check_vm_disks, subscriptions))
 
     
     print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN if overall_compliant else Fore.RED}{'PASS' if overall_compliant else 'FAIL'}{Style.RESET_ALL}")
 
     
     print("Final Status: PASS" if overall_compliant else "Final Status: FAIL")
+    records.verdict("PASS" if overall_compliant else "FAIL")
 
 
 if __name__ == "__main__":
@@ -1,20 +1,26 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
 
 colorama.init(autoreset=True)
 
 def run_command(command):
     """Runs a shell command and returns the output and any error encountered."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip(), None
     except subprocess.CalledProcessError as e:
         return None, str(e)
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}'"
     output, error = run_command(command)
     
@@ -74,20 +80,20 @@ def highlight_json(json_data):
     return f"{Fore.CYAN}{json_str}{Style.RESET_ALL}"
 
 def check_compliance(subscription_id, subscription_name):
-    """Checks compliance of each managed disk's dataAccessAuthMode setting in the subscription."""
+    """Checks compliance of each managed disk's dataAccessAuthMode setting; returns the subscription's status, or None when it has no disks."""
     print(f"\n{Fore.YELLOW}Checking managed disks for subscription: {subscription_name}{Style.RESET_ALL}")
     print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
     print()
 
     
     if not set_subscription(subscription_id):
-        return
+        return "FAIL"
 
     
     managed_disks = list_managed_disks()
     if not managed_disks:
         print(f"{Fore.YELLOW}No managed disks found in subscription {subscription_name}.{Style.RESET_ALL}")
-        return
+        return None
 
     non_compliant_disks = False
 
@@ -115,19 +121,28 @@ def check_compliance(subscription_id, subscription_name):
     
     final_status = "PASS" if not non_compliant_disks else "FAIL"
     print(f"\n{Fore.CYAN}Final Status for subscription {subscription_name}: {Fore.GREEN if final_status == 'PASS' else Fore.RED}{final_status}{Style.RESET_ALL}")
+    return final_status
 
 def main():
     
     subscriptions = get_subscriptions()
     if not subscriptions:
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
+        records.verdict("FAIL", reason="no subscriptions")
         return
 
-    
+    statuses = []
     for subscription in subscriptions:
         subscription_id = subscription["subscriptionId"]
         subscription_name = subscription["displayName"]
-        check_compliance(subscription_id, subscription_name)
+        status = check_compliance(subscription_id, subscription_name)
+        if status:
+            statuses.append(status)
+
+    if not statuses:
+        records.verdict("FAIL", reason="no managed disks")
+    else:
+        records.verdict("FAIL" if "FAIL" in statuses else "PASS")
 
 if __name__ == "__main__":
     main()
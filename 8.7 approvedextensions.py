@@ -1,23 +1,32 @@
 import subprocess
+import armclient
 import json
 import colorama
 from colorama import Fore, Style
+import inventory
+import records
+import fanout
 
 colorama.init(autoreset=True)
 
 
 approved_extensions = ["CustomScriptExtension", "DependencyAgentLinux", "OmsAgentForLinux"]
 
+INVENTORY_COLLECTIONS = ["virtualMachines"]
+
 def run_command(command):
     """Runs a shell command and returns the output and any error encountered."""
     try:
-        process = subprocess.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return process.stdout.strip(), None
     except subprocess.CalledProcessError as e:
         return None, str(e)
 
 def get_subscriptions():
     """Fetches a list of all Azure subscriptions."""
+    subscriptions = inventory.get_subscriptions()
+    if subscriptions is not None:
+        return subscriptions
     command = "az account list --all --query '[].{id:id, subscriptionId:id, displayName:name}'"
     output, error = run_command(command)
     
@@ -32,16 +41,11 @@ def get_subscriptions():
         print(f"{Fore.RED}Failed to retrieve subscriptions. Error: {error}{Style.RESET_ALL}")
     return []
 
-def set_subscription(subscription_id):
-    """Sets the current Azure subscription."""
-    command = f'az account set --subscription {subscription_id}'
-    output, error = run_command(command)
-    if error:
-        print(f"{Fore.RED}Failed to set subscription {subscription_id}. Error: {error}{Style.RESET_ALL}")
-    return output is not None
-
 def list_vms(subscription_id):
-    """Lists all VMs in the current subscription."""
+    """Lists all VMs in the subscription."""
+    vms = inventory.get_virtual_machines(subscription_id)
+    if vms is not None:
+        return vms
     command = f'az vm list --subscription {subscription_id} --query "[].{{name:name, resourceGroup:resourceGroup}}" --output json'
     output, error = run_command(command)
     
@@ -56,9 +60,13 @@ def list_vms(subscription_id):
         print(f"{Fore.RED}Failed to retrieve VMs. Error: {error}{Style.RESET_ALL}")
     return []
 
-def list_vm_extensions(resource_group, vm_name):
-    """Lists the extensions attached to a specific VM."""
-    command = f'az vm extension list --resource-group {resource_group} --vm-name {vm_name} --query "[].name" -o json'
+def list_vm_extensions(vm, subscription_id):
+    """Lists the names of the extensions attached to a specific VM."""
+    if vm.get("extensions") is not None:
+        return [extension["name"] for extension in vm["extensions"]]
+    resource_group = vm['resourceGroup']
+    vm_name = vm['name']
+    command = f'az vm extension list --resource-group {resource_group} --vm-name {vm_name} --subscription {subscription_id} --query "[].name" -o json'
     output, error = run_command(command)
     
     if output:
@@ -78,28 +86,18 @@ def check_vm_extensions(subscription_id, subscription_name):
     print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
     print()
 
-    
-    if not set_subscription(subscription_id):
-        return
-
-    
     vms = list_vms(subscription_id)
     if not vms:
         print(f"{Fore.YELLOW}No virtual machines found in subscription {subscription_name}.{Style.RESET_ALL}")
-        return
+        return True
 
-    non_compliant_found = False
-
-    
-    for vm in vms:
+    def check_vm(vm):
         vm_name = vm['name']
-        resource_group = vm['resourceGroup']
 
-        extensions = list_vm_extensions(resource_group, vm_name)
+        extensions = list_vm_extensions(vm, subscription_id)
         print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
         print()
         
-        non_compliant = [ext for ext in extensions if ext not in approved_extensions]
         compliant = all(ext in approved_extensions for ext in extensions)
 
         if compliant:
@@ -107,11 +105,10 @@ def check_vm_extensions(subscription_id, subscription_name):
         else:
             print(f"{Fore.RED}VM: {vm_name}{Style.RESET_ALL}")
             print(f"\n{json.dumps(extensions, indent=4)}{Style.RESET_ALL}")
-            non_compliant_found = True
+        records.resource(vm.get("id", vm_name), "PASS" if compliant else "FAIL", extensions=extensions)
+        return compliant
 
-    
-    final_status = "PASS" if not non_compliant_found else "FAIL"
-    print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN if final_status == 'PASS' else Fore.RED}{final_status}{Style.RESET_ALL}")
+    return all(fanout.map_ordered(check_vm, vms))
 
 def main():
     
@@ -120,11 +117,11 @@ def main():
         print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
         return
 
-    
-    for subscription in subscriptions:
-        subscription_id = subscription["subscriptionId"]
-        subscription_name = subscription["displayName"]
-        check_vm_extensions(subscription_id, subscription_name)
+    overall_compliant = all(fanout.per_subscription(check_vm_extensions, subscriptions))
+
+    final_status = "PASS" if overall_compliant else "FAIL"
+    print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN if final_status == 'PASS' else Fore.RED}{final_status}{Style.RESET_ALL}")
+    records.verdict(final_status)
 
 if __name__ == "__main__":
     main()
@@ -6,11 +6,26 @@ import json
 import pty
 import argparse
 import shutil
+import threading
+import hashlib
+import codecs
+import time
+import selectors
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from colorama import init, Fore, Style
 from bs4 import BeautifulSoup
 import asyncio
 from pyppeteer import launch
+import inventory
+import checks
+import powershell
+import incremental
+import records
+import evidence
+import ansi
+import armclient
 
 init(autoreset=True)
 
@@ -224,75 +239,76 @@ script_descriptions = {
 
 
 results = {}
+raw_outputs = {}
 timeout_seconds = 60
-tmux_session_name = "persistent_powershell"
-
-
-ANSI_HTML_MAPPING = {
-    r'\x1b\[31m': '<span style="color:red;">',    
-    r'\x1b\[32m': '<span style="color:green;">',  
-    r'\x1b\[33m': '<span style="color:orange;">', 
-    r'\x1b\[34m': '<span style="color:blue;">',   
-    r'\x1b\[36m': '<span style="color:cyan;">',   
-    r'\x1b\[37m': '<span style="color:white;">',  
-    r'\x1b\[92m': '<span style="color:green;">',  
-    r'\x1b\[91m': '<span style="color:red;">',    
-    r'\x1b\[93m': '<span style="color:yellow;">', 
-    r'\x1b\[94m': '<span style="color:blue;">',   
-    r'\x1b\[96m': '<span style="color:cyan;">',   
-    r'\x1b\[95m': '<span style="color:magenta;">',
-    r'\x1b\[42m': '<span style="background-color:green;">',
-    r'\x1b\[0m': '</span>',                       
-}
+max_runtime_seconds = 1800
+READ_SIZE = 65536
+powershell_socket = os.path.abspath("powershell.sock")
+powershell_worker = None
+powershell_server = None
+console_lock = threading.Lock()
 
-def ansi_to_html(text):
-    """Convert ANSI escape codes to HTML."""
-    for ansi_code, html_tag in ANSI_HTML_MAPPING.items():
-        text = re.sub(ansi_code, html_tag, text)
-    while '<span' in text and text.count('<span') > text.count('</span>'):
-        text += '</span>'
-    return text
 
-def start_tmux_powershell():
-    """Start a new tmux session running PowerShell."""
+def start_powershell_worker(command=None):
+    """Start the persistent PowerShell worker and share it with every check."""
+    global powershell_worker, powershell_server
     try:
-        subprocess.run(
-            ["tmux", "new-session", "-d", "-s", tmux_session_name, "pwsh"],
-            check=True
-        )
-        print(f"{Fore.GREEN}Tmux session '{tmux_session_name}' started successfully.{Style.RESET_ALL}")
-    except subprocess.CalledProcessError as e:
-        print(f"{Fore.RED}Failed to start tmux session: {e}{Style.RESET_ALL}")
+        powershell_worker = powershell.PowerShellWorker(command)
+        powershell_server = powershell.PowerShellServer(powershell_worker, powershell_socket)
+    except OSError as e:
+        print(f"{Fore.RED}Failed to start PowerShell: {e}{Style.RESET_ALL}")
         sys.exit(1)
+    powershell.set_worker(powershell_worker)
+    os.environ[powershell.SOCKET_ENV] = powershell_socket
+    print(f"{Fore.GREEN}PowerShell worker started successfully.{Style.RESET_ALL}")
 
-def send_command_to_tmux(command):
-    """Send a command to the persistent PowerShell tmux session."""
-    try:
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_session_name, command, "C-m"],
-            check=True
-        )
-    except subprocess.CalledProcessError as e:
-        print(f"{Fore.RED}Failed to send command to tmux session: {e}{Style.RESET_ALL}")
-        sys.exit(1)
+def stop_powershell_worker():
+    """Shut down the PowerShell worker and its socket."""
+    if powershell_server is not None:
+        powershell_server.close()
+    if powershell_worker is not None:
+        powershell_worker.close()
 
 def authenticate_to_mggraph():
     """Authenticate to Microsoft Graph in the persistent PowerShell session."""
     print("\nAuthenticating to Microsoft Graph...\n")
     try:
-        send_command_to_tmux("Import-Module Microsoft.Graph.Identity.SignIns")
-        send_command_to_tmux("Connect-MgGraph")
-    except Exception as e:
+        output = powershell.authenticate(powershell_worker)
+        if output:
+            print(output)
+    except powershell.PowerShellError as e:
         print(f"{Fore.RED}Failed to authenticate: {e}{Style.RESET_ALL}")
         sys.exit(1)
 
 
+def collect_inventory(file_name=inventory.DEFAULT_INVENTORY_FILE, backend="arm"):
+    """Collect the shared ARM inventory snapshot and expose it to every check."""
+    print(f"\n{Fore.YELLOW}Collecting ARM inventory snapshot...{Style.RESET_ALL}\n")
+    try:
+        snapshot = inventory.collect(file_name, backend=backend)
+    except Exception as e:
+        print(f"{Fore.RED}Inventory collection failed, checks will query Azure directly: {e}{Style.RESET_ALL}")
+        return None
+    os.environ[inventory.INVENTORY_ENV] = os.path.abspath(file_name)
+    return snapshot
+
+
+def reuse_unchanged_results(script_list, fingerprints):
+    """Copy last run's verdicts for checks whose inventory inputs are unchanged; return the checks still to run."""
+    previous_results, previous_fingerprints = incremental.load_previous()
+    reused = incremental.reusable_results(script_list, previous_results, previous_fingerprints, fingerprints)
+    for script in reused:
+        print(f"{Fore.CYAN}Reusing last result for {script} (inventory unchanged).{Style.RESET_ALL}")
+    results.update(reused)
+    return [script for script in script_list if script not in reused]
+
+
 def extract_final_status(output):
     """
     Extract the final status from the script output, handling HTML and edge cases.
     """
     
-    soup = BeautifulSoup(output, "html.parser")
+    soup = BeautifulSoup(ansi.strip(output), "html.parser")
     clean_output = soup.get_text(separator=" ")
 
     
@@ -303,8 +319,6 @@ def extract_final_status(output):
     
     if "enabled (secure transfer required)" in clean_output.lower():
         return "PASS"
-    elif "error" in clean_output.lower() or "failed" in clean_output.lower():
-        return "FAIL"
     elif "manual check required" in clean_output.lower():
         return "MANUAL"
 
@@ -312,110 +326,288 @@ def extract_final_status(output):
     return "FAIL"
 
 
-def run_script(script_name):
-    """Run a script and determine its Final Status accurately."""
+def script_banner(script_name):
+    """Return the banner printed above a script's output."""
     description = script_descriptions.get(script_name, f"Running script: {script_name}")
-    print(f"{Fore.MAGENTA}{Style.BRIGHT}\n{'*' * 60}\n{description.upper()}\n{'*' * 60}{Style.RESET_ALL}\n")
+    return f"{Fore.MAGENTA}{Style.BRIGHT}\n{'*' * 60}\n{description.upper()}\n{'*' * 60}{Style.RESET_ALL}\n\n"
 
-    try:
-        master_fd, slave_fd = pty.openpty()
 
-        process = subprocess.Popen(
-            ['python3', script_name],
-            stdout=slave_fd,
-            stderr=slave_fd,
-            text=True
-        )
+class CheckRun:
+    """One check running in its own PTY.
 
-        os.close(slave_fd)
+    Console output and structured records arrive on two descriptors that
+    collect_checks() watches; the results entry is written when both close
+    or a deadline passes.
+    """
 
-        output_lines = []
-        start_time = datetime.now()
-        last_output_time = start_time
+    def __init__(self, script_name, stream):
+        self.script_name = script_name
+        self.stream = stream
+        self.banner = script_banner(script_name)
+        self.output_lines = []
+        self.html_chunks = []
+        self.converter = ansi.HtmlConverter()
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.records = []
+        self.records_buffer = b""
+        self.echo(self.banner)
 
-        while True:
-            if process.poll() is not None:  
-                break
+        master_fd, slave_fd = pty.openpty()
+        records_read_fd, records_write_fd = os.pipe()
+        try:
+            self.process = subprocess.Popen(
+                ['python3', script_name],
+                stdout=slave_fd,
+                stderr=slave_fd,
+                pass_fds=(records_write_fd,),
+                env=dict(os.environ, **{records.RECORDS_FD_ENV: str(records_write_fd)})
+            )
+        except Exception:
+            os.close(master_fd)
+            os.close(records_read_fd)
+            raise
+        finally:
+            os.close(slave_fd)
+            os.close(records_write_fd)
+
+        self.open_fds = {master_fd, records_read_fd}
+        self.master_fd = master_fd
+        self.records_fd = records_read_fd
+        self.started = self.last_output = time.monotonic()
+
+    def echo(self, text):
+        if self.stream:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    def add_output(self, text):
+        if text:
+            self.echo(text)
+            self.output_lines.append(text)
+            self.html_chunks.append(self.converter.feed(text))
+
+    def receive(self, fd, data):
+        """Handles bytes read from one of the check's descriptors."""
+        if fd == self.master_fd:
+            self.last_output = time.monotonic()
+            self.add_output(self.decoder.decode(data))
+            return
+        *lines, self.records_buffer = (self.records_buffer + data).split(b"\n")
+        for line in lines:
+            record = records.parse_line(line.decode(errors="replace"))
+            if record is not None:
+                self.records.append(record)
+
+    def close_fd(self, fd):
+        os.close(fd)
+        self.open_fds.discard(fd)
+
+    def deadline(self):
+        return min(self.last_output + timeout_seconds, self.started + max_runtime_seconds)
+
+    def flush_buffered(self):
+        if not self.stream:
+            with console_lock:
+                sys.stdout.write(self.banner + ''.join(self.output_lines))
+                sys.stdout.flush()
 
-            if (datetime.now() - last_output_time).total_seconds() >= timeout_seconds:
-                process.kill()
-                os.close(master_fd)
-                print(f"{Fore.RED}Script {script_name} timed out after {timeout_seconds} seconds of no output.{Style.RESET_ALL}")
-                results[script_name] = {"Output": "Script timed out due to no output.", "Final Status": "SKIPPED"}
-                return
+    def kill(self):
+        """Stops a check that passed its deadline and records it as skipped."""
+        self.process.kill()
+        self.process.wait()
+        for fd in list(self.open_fds):
+            self.close_fd(fd)
+        if time.monotonic() - self.started >= max_runtime_seconds:
+            message = f"Script {self.script_name} exceeded the {max_runtime_seconds} second runtime limit."
+        else:
+            message = f"Script {self.script_name} timed out after {timeout_seconds} seconds of no output."
+        self.add_output(f"{Fore.RED}{message}{Style.RESET_ALL}\n")
+        self.flush_buffered()
+        results[self.script_name] = {"Output": message, "Final Status": "SKIPPED"}
+
+    def finish(self):
+        """Determines the Final Status once the check has exited and its output is drained."""
+        self.process.wait()
+        self.add_output(self.decoder.decode(b"", final=True))
+        self.html_chunks.append(self.converter.close())
+        full_output = ''.join(self.output_lines)
+        self.flush_buffered()
+
+        final_status = records.final_verdict(self.records) or extract_final_status(full_output)
+
+        results[self.script_name] = {
+            "Output": ''.join(self.html_chunks),
+            "Final Status": final_status,
+            "Timestamp": datetime.now().isoformat()
+        }
+        if self.records:
+            results[self.script_name]["Records"] = self.records
+        raw_outputs[self.script_name] = full_output
 
-            try:
-                output = os.read(master_fd, 1024).decode()
-                if output:
-                    last_output_time = datetime.now()
-                    sys.stdout.write(output)
-                    sys.stdout.flush()
-                    output_lines.append(output)
-            except OSError:
-                break
 
-        while True:
+def collect_checks(script_list, jobs=1, stream=True):
+    """Run checks in PTYs, at most `jobs` at a time, multiplexing their output in this thread."""
+    selector = selectors.DefaultSelector()
+    pending = list(script_list)
+    running = set()
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            script_name = pending.pop(0)
             try:
-                output = os.read(master_fd, 1024).decode()
-                if not output:
-                    break
-                sys.stdout.write(output)
-                sys.stdout.flush()
-                output_lines.append(output)
+                run = CheckRun(script_name, stream)
+            except Exception as ex:
+                with console_lock:
+                    print(f"{Fore.RED}Unhandled exception for {script_name}: {ex}{Style.RESET_ALL}")
+                results[script_name] = {
+                    "Output": str(ex),
+                    "Final Status": "FAIL",
+                    "Timestamp": datetime.now().isoformat()
+                }
+                continue
+            for fd in run.open_fds:
+                selector.register(fd, selectors.EVENT_READ, run)
+            running.add(run)
+
+        if not running:
+            break
+
+        timeout = max(0, min(run.deadline() for run in running) - time.monotonic())
+        for key, _ in selector.select(timeout):
+            run = key.data
+            try:
+                data = os.read(key.fd, READ_SIZE)
             except OSError:
-                break
+                data = b""
+            if data:
+                run.receive(key.fd, data)
+                continue
+            selector.unregister(key.fd)
+            run.close_fd(key.fd)
+            if not run.open_fds:
+                running.discard(run)
+                run.finish()
+
+        now = time.monotonic()
+        for run in list(running):
+            if now >= run.deadline():
+                for fd in run.open_fds:
+                    selector.unregister(fd)
+                running.discard(run)
+                run.kill()
+
+    selector.close()
+
+
+def run_script(script_name, stream=True):
+    """Run a script and determine its Final Status accurately.
+
+    With stream=False the script's output is buffered and written to the
+    console as one block once the script finishes, so concurrent runs do
+    not interleave.
+    """
+    collect_checks([script_name], 1, stream)
 
-        process.wait()
-        full_output = ''.join(output_lines)
 
-        
-        final_status = extract_final_status(full_output)
+def run_script_in_process(script_name, stream=True):
+    """Run a check inside this interpreter through the checks plugin interface."""
+    banner = script_banner(script_name)
+    if stream:
+        sys.stdout.write(banner)
+        sys.stdout.flush()
 
-        results[script_name] = {
-            "Output": ansi_to_html(full_output),
-            "Final Status": final_status,
-            "Timestamp": datetime.now().isoformat()
-        }
+    context = {"inventory": inventory.load()}
+    echo = sys.__stdout__ if stream else None
+    result = checks.run_check(script_name, context, timeout=timeout_seconds, echo=echo, parse_status=extract_final_status)
 
-        os.close(master_fd)
+    if result.status == "SKIPPED":
+        message = f"{Fore.RED}Script {script_name} timed out after {timeout_seconds} seconds of no output.{Style.RESET_ALL}\n"
+        entry = {"Output": "Script timed out due to no output.", "Final Status": "SKIPPED"}
+    else:
+        message = ""
+        entry = result.to_dict()
+        entry["Output"] = ansi.to_html(result.output)
+        raw_outputs[script_name] = result.output
 
-    except Exception as ex:
-        print(f"{Fore.RED}Unhandled exception for {script_name}: {ex}{Style.RESET_ALL}")
-        results[script_name] = {
-            "Output": str(ex),
-            "Final Status": "FAIL",
-            "Timestamp": datetime.now().isoformat()
-        }
+    if stream:
+        sys.stdout.write(message)
+    else:
+        with console_lock:
+            sys.stdout.write(banner + result.output + message)
+    sys.stdout.flush()
+    results[script_name] = entry
+
+
+def run_scripts_serially(script_list, stream=True, in_process=False):
+    """Run scripts one after another, skipping any that are missing."""
+    runner = run_script_in_process if in_process else run_script
+    for script in script_list:
+        if os.path.isfile(script):
+            runner(script, stream=stream)
+        else:
+            with console_lock:
+                print(f"Script {script} not found. Skipping.")
 
-    except Exception as ex:
-        print(f"{Fore.RED}Unhandled exception for {script_name}: {ex}{Style.RESET_ALL}")
-        results[script_name] = {
-            "Output": str(ex),
-            "Final Status": "FAIL",
-            "Timestamp": datetime.now().isoformat()
-        }
+
+def run_scripts_parallel(script_list, jobs, in_process=False):
+    """Run up to `jobs` scripts at once.
+
+    Each check still runs in its own PTY and lands in its own results entry;
+    output is buffered per check. The PTYs are all read from this thread.
+    In-process checks run on a thread pool instead. PowerShell checks may
+    overlap: the shared worker queues their requests.
+    """
+    if in_process:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = []
+            for script in script_list:
+                futures.append(executor.submit(run_scripts_serially, [script], False, in_process))
+            for future in futures:
+                future.result()
+    else:
+        existing = []
+        for script in script_list:
+            if os.path.isfile(script):
+                existing.append(script)
+            else:
+                print(f"Script {script} not found. Skipping.")
+        collect_checks(existing, jobs, stream=False)
+
+    order_results(script_list)
 
 
+def order_results(script_list):
+    """Keep the report in benchmark order regardless of completion order."""
+    ordered = {script: results[script] for script in script_list if script in results}
+    ordered.update({script: result for script, result in results.items() if script not in ordered})
+    results.clear()
+    results.update(ordered)
 
 
-def retry_skipped_scripts():
-    """Retry scripts that were skipped due to timeout."""
+def retry_skipped_scripts(in_process=False, jobs=1):
+    """Retry scripts that were skipped due to timeout, `jobs` at a time.
+
+    Retries always run as PTY subprocesses. An in-process check that timed
+    out is abandoned, not stopped: its thread keeps running and may still
+    hold the shared rule modules' locks, so a second copy in the same
+    interpreter could block behind it and time out again.
+    """
     print("\nRetrying skipped scripts...\n")
-    for script, result in results.items():
-        if result["Final Status"] == "SKIPPED":
-            print(f"Retrying {script}...")
-            run_script(script)
+    skipped = [script for script, result in results.items() if result["Final Status"] == "SKIPPED"]
+    if in_process and skipped:
+        print("Retrying timed-out in-process checks as subprocesses.")
+    if jobs > 1 and skipped:
+        print(f"Retrying {', '.join(skipped)}...")
+        run_scripts_parallel(skipped, jobs)
+        return
+    for script in skipped:
+        print(f"Retrying {script}...")
+        run_script(script)
 
 
 
 
-def generate_html_report(results):
-    """Generate an HTML report that dynamically validates the Final Status."""
-    html_content = """
-    <html>
-    <head>
-        <link href="https://fonts.googleapis.com/css2?family=Fira+Code&display=swap" rel="stylesheet">
-        <style>
+REPORT_STYLE = """
             body {
                 font-family: 'Fira Code', monospace;
                 margin: 0;
@@ -467,52 +659,117 @@ def generate_html_report(results):
             html, body {
                 height: 100%; /* Ensure body takes up full height */
             }
-        </style>
-    </head>
-    <body>
+            table.index {
+                border-collapse: collapse;
+                margin: 0.5em 0 1.5em 0;
+            }
+            table.index td, table.index th {
+                border: 1px solid #ddd;
+                padding: 0.25em 0.75em;
+                text-align: left;
+            }
+            iframe.fragment {
+                width: 100%;
+                height: 600px;
+                border: 0;
+                background-color: #23252e;
+            }
+"""
+
+# Outputs longer than this go into a per-check fragment file that the report
+# loads only when the section is opened.
+FRAGMENT_THRESHOLD = 256 * 1024
+
+LAZY_FRAGMENT_SCRIPT = """
+    <script>
+        document.querySelectorAll("details").forEach(function (el) {
+            el.addEventListener("toggle", function () {
+                var frame = el.querySelector("iframe[data-src]");
+                if (el.open && frame && !frame.getAttribute("src")) {
+                    frame.setAttribute("src", frame.dataset.src);
+                }
+            });
+        });
+    </script>
+"""
+
+
+def _write_fragment(path, output):
+    """Write one check's output as a standalone page for lazy loading."""
+    with open(path, "w") as f:
+        f.write(f"<html><head><style>{REPORT_STYLE}</style></head><body style=\"background-color:#23252e\">")
+        f.write("<details open><pre>")
+        f.write(output)
+        f.write("</pre></details></body></html>")
+
+
+def generate_html_report(results):
+    """Stream the HTML report to disk: a summary index first, then one section per check.
+
+    Outputs over FRAGMENT_THRESHOLD are written to a fragments directory
+    next to the report and loaded when their section is opened.
     """
-    
-    for script, result in results.items():
-        output = result.get("Output", "")
-
-        output_lower = output.lower()
-        if "manual check required" in output_lower:
-            final_status = "MANUAL"
-            status_class = "manual"
-        elif "final status: pass" in output_lower:
-            final_status = "PASS"
-            status_class = "pass"
-        elif "final status: fail" in output_lower:
-            final_status = "FAIL"
-            status_class = "fail"
-        else:
-            final_status = "FAIL"
-            status_class = "fail"
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    html_file = f"results_{timestamp}.html"
+    fragment_dir = f"results_{timestamp}_fragments"
 
+    sections = []
+    for index, (script, result) in enumerate(results.items()):
+        # The status was settled when the check ran; anything that never finished is reported as a failure.
+        final_status = result.get("Final Status")
+        if final_status not in records.STATUSES:
+            final_status = "FAIL"
         result["Final Status"] = final_status
+        sections.append((f"check-{index}", script, result, final_status))
+
+    counts = {status: 0 for status in records.STATUSES}
+    for _, _, _, final_status in sections:
+        counts[final_status] += 1
 
-        description = script_descriptions.get(script, script)  
+    with open(html_file, "w") as f:
+        f.write(f"""
+    <html>
+    <head>
+        <link href="https://fonts.googleapis.com/css2?family=Fira+Code&display=swap" rel="stylesheet">
+        <style>{REPORT_STYLE}        </style>
+    </head>
+    <body>
+    <h2>Summary: <span class="pass">{counts["PASS"]} PASS</span>, <span class="fail">{counts["FAIL"]} FAIL</span>, <span class="manual">{counts["MANUAL"]} MANUAL</span></h2>
+    <table class="index">
+""")
+        for anchor, script, _, final_status in sections:
+            description = script_descriptions.get(script, script)
+            f.write(f'        <tr><td><a href="#{anchor}">{description}</a></td><td class="{final_status.lower()}">{final_status}</td></tr>\n')
+        f.write("    </table>\n")
+
+        for anchor, script, result, final_status in sections:
+            output = result.get("Output", "")
+            description = script_descriptions.get(script, script)
+            content_hash = hashlib.sha256(output.encode()).hexdigest()
+
+            if len(output) > FRAGMENT_THRESHOLD:
+                os.makedirs(fragment_dir, exist_ok=True)
+                fragment = os.path.join(fragment_dir, f"{anchor}.html")
+                _write_fragment(fragment, output)
+                body = f'<iframe class="fragment" data-src="{fragment}"></iframe>'
+            else:
+                body = f"<pre>{output}</pre>"
 
-        html_content += f"""
-        <details>
-            <summary class="{status_class}">
+            f.write(f"""
+        <details id="{anchor}" data-hash="{content_hash}">
+            <summary class="{final_status.lower()}">
                 <strong>{description}:</strong> {final_status}
             </summary>
-            <pre>{output}</pre>
+            {body}
         </details>
-        """
-    
-    html_content += """
+        """)
+
+        f.write(LAZY_FRAGMENT_SCRIPT)
+        f.write("""
     </body>
     </html>
-    """
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    html_file = f"results_{timestamp}.html"
-    
-    with open(html_file, "w") as f:
-        f.write(html_content)
-    
+    """)
+
     print(f"HTML report generated: {html_file}")
     return html_file
 
@@ -528,57 +785,121 @@ def write_results_to_file(results, file_name="results.json"):
 
 
 
-async def capture_screenshots_with_puppeteer(html_file, output_directory):
-    """Capture screenshots using Puppeteer for failed sections."""
-    print("🚀 Launching Puppeteer for capturing screenshots...")
-    browser = await launch(headless=True)
-    page = await browser.newPage()
+SCREENSHOT_PAGES = 4
+SCREENSHOT_MANIFEST = "manifest.json"
 
-    # Load the generated HTML file
-    file_url = f"file://{os.path.abspath(html_file)}"
-    await page.goto(file_url, {'waitUntil': 'domcontentloaded'})
 
-    # Find all <details> elements
-    details_handles = await page.querySelectorAll("details")
-    print(f"🔍 Found {len(details_handles)} <details> sections")
+async def _wait_for_paint(page):
+    """Resolve once the browser has laid out and painted the latest DOM change."""
+    await page.evaluate('() => new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)))')
 
-    if not os.path.exists(output_directory):
-        os.makedirs(output_directory)
 
-    screenshot_count = 0
-    for details in details_handles:
-        try:
-            summary_text = await page.evaluate('(el) => el.querySelector("summary").innerText', details)
+async def _open_report_page(browser, file_url):
+    page = await browser.newPage()
+    await page.goto(file_url, {'waitUntil': 'domcontentloaded'})
+    await page.evaluate('() => document.fonts.ready.then(() => true)')
+    return page
 
-            # Process only "Fail" sections
-            if "Fail" in summary_text or "fail" in summary_text:
-                print(f"⚠ Capturing 'Fail' section: {summary_text}")
 
-                # Clean filename
-                clean_title = re.sub(r'[^a-zA-Z0-9\s.-]', '', summary_text).strip().replace(" ", "_")
+async def capture_screenshots_with_puppeteer(html_file, output_directory, pages=SCREENSHOT_PAGES):
+    """Capture screenshots using Puppeteer for failed sections.
 
-                # Expand the details section
-                await page.evaluate('(el) => el.setAttribute("open", "")', details)
-                await asyncio.sleep(0.5)
+    Failed sections are shared out across several pages of one headless
+    browser. A section whose content hash matches the previous capture,
+    recorded in the output directory's manifest, keeps its existing image.
+    """
+    print("🚀 Launching Puppeteer for capturing screenshots...")
+    browser = await launch(headless=True)
+    file_url = f"file://{os.path.abspath(html_file)}"
 
-                # Capture screenshot
-                screenshot_path = os.path.join(output_directory, f"{clean_title}.png")
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    manifest_path = os.path.join(output_directory, SCREENSHOT_MANIFEST)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    # Read every section once, then decide which ones need a new image.
+    first_page = await _open_report_page(browser, file_url)
+    sections = await first_page.evaluate('''() => Array.from(document.querySelectorAll("details")).map(el => ({
+        summary: el.querySelector("summary").innerText,
+        content: el.dataset.hash || el.innerHTML
+    }))''')
+    print(f"🔍 Found {len(sections)} <details> sections")
+
+    queue = asyncio.Queue()
+    skipped = 0
+    for index, section in enumerate(sections):
+        summary_text = section["summary"]
+        # Summaries read "<description>: <STATUS>".
+        if not summary_text.strip().upper().endswith("FAIL"):
+            continue
+        clean_title = re.sub(r'[^a-zA-Z0-9\s.-]', '', summary_text).strip().replace(" ", "_")
+        screenshot_path = os.path.join(output_directory, f"{clean_title}.png")
+        content_hash = hashlib.sha256(section["content"].encode()).hexdigest()
+        if manifest.get(screenshot_path) == content_hash and os.path.exists(screenshot_path):
+            skipped += 1
+            continue
+        queue.put_nowait((index, summary_text, screenshot_path, content_hash))
+
+    captured = []
+
+    async def capture_worker(page):
+        while not queue.empty():
+            index, summary_text, screenshot_path, content_hash = queue.get_nowait()
+            try:
+                print(f"⚠ Capturing 'Fail' section: {summary_text}")
+                details = (await page.querySelectorAll("details"))[index]
+                await page.evaluate('''(el) => new Promise(resolve => {
+                    const frame = el.querySelector("iframe[data-src]");
+                    if (frame && !frame.getAttribute("src")) {
+                        frame.addEventListener("load", () => resolve(true), {once: true});
+                    } else {
+                        resolve(true);
+                    }
+                    el.setAttribute("open", "");
+                })''', details)
+                await _wait_for_paint(page)
                 await details.screenshot({'path': screenshot_path})
-
+                await page.evaluate('(el) => el.removeAttribute("open")', details)
+                manifest[screenshot_path] = content_hash
+                captured.append(screenshot_path)
                 print(f"📸 Screenshot saved: {screenshot_path}")
-                screenshot_count += 1
+            except Exception as e:
+                print(f"❌ Error processing a section: {e}")
 
-        except Exception as e:
-            print(f"❌ Error processing a section: {e}")
+    workers = [first_page]
+    for _ in range(min(pages, queue.qsize()) - 1):
+        workers.append(await _open_report_page(browser, file_url))
+    await asyncio.gather(*(capture_worker(page) for page in workers))
 
     await browser.close()
-    print(f"🎉 Captured {screenshot_count} screenshots of failed sections!")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    screenshot_count = len(captured)
+    print(f"🎉 Captured {screenshot_count} screenshots of failed sections! ({skipped} unchanged sections kept)")
 
 
 
 
 
 
+def render_failed_evidence(results, output_directory):
+    """Render failed checks' console output to SVG images without launching a browser."""
+    sections = []
+    for script, result in results.items():
+        if result.get("Final Status") != "FAIL":
+            continue
+        description = script_descriptions.get(script, script)
+        # Reused results have no console capture; fall back to the report text.
+        text = raw_outputs.get(script) or BeautifulSoup(result.get("Output", ""), "html.parser").get_text()
+        sections.append((f"{description}: FAIL", text))
+    paths = evidence.render_evidence(sections, output_directory)
+    print(f"🎉 Rendered {len(paths)} evidence images of failed sections!")
+
+
 def run_single_script(script_name):
     """Run a specific script by its name."""
     if os.path.isfile(script_name):
@@ -596,35 +917,109 @@ def main():
         type=str,
         help="Specify a script to run by its name (e.g., '2.2.1 trusted locations.py')."
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help="Number of checks to run concurrently (default: 1)."
+    )
+    parser.add_argument(
+        '--in-process',
+        action='store_true',
+        help="Import and run checks inside this interpreter instead of spawning python3 for each one."
+    )
+    parser.add_argument(
+        '--no-inventory',
+        action='store_true',
+        help="Skip the shared inventory snapshot and let every check enumerate Azure itself."
+    )
+    parser.add_argument(
+        '--resource-graph',
+        action='store_true',
+        help="Build the inventory snapshot from Azure Resource Graph queries instead of per-subscription ARM calls."
+    )
+    parser.add_argument(
+        '--since-last-run',
+        action='store_true',
+        help="Reuse the previous results.json verdicts of inventory-based checks whose resources have not changed."
+    )
+    parser.add_argument(
+        '--evidence',
+        choices=['screenshots', 'svg'],
+        default='screenshots',
+        help="How to capture failed checks: Puppeteer screenshots of the HTML report (default) or SVG renderings of the console output, which need no browser."
+    )
+    parser.add_argument(
+        '--calls-per-second',
+        type=float,
+        help=f"Rate at which all checks together may call Azure (default: {armclient.DEFAULT_CALL_RATE})."
+    )
     args = parser.parse_args()
 
-    if args.script:
-        if os.path.isfile(args.script):
-            run_script(args.script)
-        else:
-            print(f"{Fore.RED}Script {args.script} not found. Please provide a valid script name.{Style.RESET_ALL}")
-            return
-    else:
-        start_tmux_powershell()
-        authenticate_to_mggraph()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.since_last_run and args.no_inventory:
+        parser.error("--since-last-run needs the inventory snapshot; drop --no-inventory")
+    if args.calls_per_second is not None and args.calls_per_second <= 0:
+        parser.error("--calls-per-second must be positive")
 
-        for script in scripts:
-            if os.path.isfile(script):
-                run_script(script)
-            else:
-                print(f"Script {script} not found. Skipping.")
-
-        retry_skipped_scripts()
+    # Checks run as separate processes; they share one token bucket through this file.
+    if args.calls_per_second:
+        os.environ[armclient.CALL_RATE_ENV] = str(args.calls_per_second)
+    rate_fd, rate_state = tempfile.mkstemp(prefix="azurefy-rate-", suffix=".json")
+    os.close(rate_fd)
+    os.environ[armclient.RATE_STATE_ENV] = rate_state
 
-    html_file = generate_html_report(results)
+    try:
+        fingerprints = None
+
+        if args.script:
+            if os.path.isfile(args.script):
+                if args.in_process:
+                    run_script_in_process(args.script)
+                else:
+                    run_script(args.script)
+            else:
+                print(f"{Fore.RED}Script {args.script} not found. Please provide a valid script name.{Style.RESET_ALL}")
+                return
+        else:
+            start_powershell_worker()
+            authenticate_to_mggraph()
+
+            to_run = scripts
+            if not args.no_inventory:
+                snapshot = collect_inventory(backend="resourcegraph" if args.resource_graph else "arm")
+                if snapshot is not None:
+                    fingerprints = incremental.fingerprint_snapshot(snapshot)
+                    if args.since_last_run:
+                        to_run = reuse_unchanged_results(scripts, fingerprints)
+
+            if args.jobs > 1:
+                run_scripts_parallel(to_run, args.jobs, in_process=args.in_process)
+            else:
+                run_scripts_serially(to_run, in_process=args.in_process)
 
-    screenshot_dir = "screenshots"
-    asyncio.run(capture_screenshots_with_puppeteer(html_file, screenshot_dir))
-    print("Screenshots Captured")
+            retry_skipped_scripts(in_process=args.in_process, jobs=args.jobs)
+            order_results(scripts)
 
-    write_results_to_file(results)
+        html_file = generate_html_report(results)
 
-    subprocess.run(["tmux", "kill-session", "-t", "persistent_powershell"], check=True)
+        screenshot_dir = "screenshots"
+        if args.evidence == "svg":
+            render_failed_evidence(results, screenshot_dir)
+        else:
+            asyncio.run(capture_screenshots_with_puppeteer(html_file, screenshot_dir))
+            print("Screenshots Captured")
+
+        write_results_to_file(results)
+        if fingerprints is not None:
+            incremental.save_fingerprints(fingerprints)
+        elif os.path.exists(incremental.FINGERPRINT_FILE):
+            # These results were not checked against a snapshot; don't let a later run pair them with old fingerprints.
+            os.remove(incremental.FINGERPRINT_FILE)
+    finally:
+        stop_powershell_worker()
+        os.remove(rate_state)
 
 if __name__ == "__main__":
     main()
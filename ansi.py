@@ -0,0 +1,164 @@
+import re
+import html
+
+# Parsing of the SGR colour codes the checks print through colorama. Several
+# codes may share one sequence (e.g. "\x1b[1;31m"); anything that is not an
+# SGR sequence is dropped.
+
+ESCAPE_PATTERN = re.compile(r'\x1b\[([0-9;]*)([A-Za-z])')
+
+COLORS = {
+    0: "black", 1: "red", 2: "green", 3: "yellow",
+    4: "blue", 5: "magenta", 6: "cyan", 7: "white",
+}
+BRIGHT_COLORS = {
+    0: "gray", 1: "red", 2: "green", 3: "yellow",
+    4: "blue", 5: "magenta", 6: "cyan", 7: "white",
+}
+# CSS colours used in the HTML report; yellow stays orange so it reads on the light page.
+CSS_COLORS = {
+    "black": "black", "red": "red", "green": "green", "yellow": "orange",
+    "blue": "blue", "magenta": "magenta", "cyan": "cyan", "white": "white",
+    "gray": "gray",
+}
+# An escape sequence cut off at the end of a chunk read from the PTY.
+PARTIAL_ESCAPE_PATTERN = re.compile(r'\x1b(\[[0-9;]*)?$')
+
+
+class Style:
+    """Foreground, background and weight in effect at a point of the output."""
+
+    __slots__ = ("fg", "bg", "bold")
+
+    def __init__(self, fg=None, bg=None, bold=False):
+        self.fg = fg
+        self.bg = bg
+        self.bold = bold
+
+    def copy(self):
+        return Style(self.fg, self.bg, self.bold)
+
+    def __eq__(self, other):
+        return (self.fg, self.bg, self.bold) == (other.fg, other.bg, other.bold)
+
+    def is_plain(self):
+        return self.fg is None and self.bg is None and not self.bold
+
+
+def apply_sgr(style, params):
+    """Returns the style after one SGR sequence's parameters are applied."""
+    style = style.copy()
+    codes = [int(code) for code in params.split(";") if code.isdigit()] or [0]
+    for code in codes:
+        if code == 0:
+            style = Style()
+        elif code == 1:
+            style.bold = True
+        elif code == 22:
+            style.bold = False
+        elif 30 <= code <= 37:
+            style.fg = COLORS[code - 30]
+        elif 90 <= code <= 97:
+            style.fg = BRIGHT_COLORS[code - 90]
+        elif code == 39:
+            style.fg = None
+        elif 40 <= code <= 47:
+            style.bg = COLORS[code - 40]
+        elif 100 <= code <= 107:
+            style.bg = BRIGHT_COLORS[code - 100]
+        elif code == 49:
+            style.bg = None
+    return style
+
+
+def segments(text):
+    """Splits ANSI text into (text, Style) runs in a single pass."""
+    style = Style()
+    position = 0
+    for match in ESCAPE_PATTERN.finditer(text):
+        if match.start() > position:
+            yield text[position:match.start()], style
+        if match.group(2) == "m":
+            style = apply_sgr(style, match.group(1))
+        position = match.end()
+    if position < len(text):
+        yield text[position:], style
+
+
+def strip(text):
+    """Removes every escape sequence."""
+    return ESCAPE_PATTERN.sub("", text)
+
+
+def css(style):
+    """Returns the inline CSS for a style."""
+    rules = []
+    if style.fg:
+        rules.append(f"color:{CSS_COLORS[style.fg]};")
+    if style.bg:
+        rules.append(f"background-color:{CSS_COLORS[style.bg]};")
+    if style.bold:
+        rules.append("font-weight:bold;")
+    return "".join(rules)
+
+
+class HtmlConverter:
+    """Converts ANSI output to HTML chunk by chunk as it is read.
+
+    At most one <span> is open at a time, so the markup is balanced once
+    close() has been called.
+    """
+
+    def __init__(self):
+        self.style = Style()
+        self.open_style = None
+        self.pending = ""
+
+    def _write(self, parts, text):
+        if self.open_style is not None and not (self.open_style == self.style):
+            parts.append("</span>")
+            self.open_style = None
+        if self.open_style is None and not self.style.is_plain():
+            parts.append(f'<span style="{css(self.style)}">')
+            self.open_style = self.style
+        parts.append(html.escape(text, quote=False))
+
+    def feed(self, text):
+        """Returns the HTML for one chunk; an escape split across chunks is held back."""
+        text = self.pending + text
+        partial = PARTIAL_ESCAPE_PATTERN.search(text)
+        if partial:
+            self.pending = text[partial.start():]
+            text = text[:partial.start()]
+        else:
+            self.pending = ""
+
+        parts = []
+        position = 0
+        for match in ESCAPE_PATTERN.finditer(text):
+            if match.start() > position:
+                self._write(parts, text[position:match.start()])
+            if match.group(2) == "m":
+                self.style = apply_sgr(self.style, match.group(1))
+            position = match.end()
+        if position < len(text):
+            self._write(parts, text[position:])
+        return "".join(parts)
+
+    def close(self):
+        """Returns whatever is left, closing the open span."""
+        parts = []
+        if self.pending:
+            self._write(parts, self.pending)
+            self.pending = ""
+        if self.open_style is not None:
+            parts.append("</span>")
+            self.open_style = None
+        return "".join(parts)
+
+
+def to_html(text):
+    """Converts a complete ANSI output to HTML."""
+    converter = HtmlConverter()
+    return converter.feed(text) + converter.close()
+
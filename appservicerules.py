@@ -0,0 +1,262 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, Style
+import armclient
+import inventory
+import records
+
+# Section 9 App Service rules, evaluated together. Web apps are enumerated
+# once per process (from the inventory snapshot when there is one) and the
+# rules in RULES are applied to each app in a single pass; the per-control
+# scripts then print and record their own column of the result, one app at
+# a time as the pass reaches it.
+#
+# A rule lists the per-site details it reads in "needs" (see
+# inventory.WEB_APP_DETAILS); missing details are read once per site, sites
+# concurrently, and only when a rule that needs them is asked for. A rule
+# takes the site and returns (status, colour, text, details, proof) like the
+# rules in storagerules.py.
+
+RESOURCE = "https://management.azure.com"
+API_VERSION_SUBSCRIPTIONS = "2020-01-01"
+MAX_WORKERS = 8
+
+SUPPORTED_PHP_VERSIONS = ["PHP|7.4", "PHP|8.0", "PHP|8.1"]
+SUPPORTED_PYTHON_VERSIONS = ["3.7", "3.8", "3.9"]
+SUPPORTED_JAVA_VERSIONS = ["11", "17"]
+
+_outcomes = {}
+_site_locks = {}
+_site_locks_lock = threading.Lock()
+
+
+def _unknown(what):
+    return "FAIL", Fore.YELLOW, f"Unable to determine {what}", {}, None
+
+
+def _result(passed, text, details, proof=None):
+    if passed:
+        return "PASS", Fore.GREEN, text, details, None
+    return "FAIL", Fore.RED, text, details, proof
+
+
+def https_only(site):
+    enabled = (site.get("properties") or {}).get("httpsOnly", False)
+    return _result(enabled is True, "Enabled" if enabled else "Not enabled", {"httpsOnly": enabled})
+
+
+def authentication(site):
+    auth_settings = site.get("authSettings")
+    policies = site.get("publishingCredentials")
+    if auth_settings is None or policies is None:
+        return _unknown("authentication settings")
+    auth_enabled = auth_settings.get("enabled", False)
+    scm_disabled = (policies.get("scm") or {}).get("allow", True) is False
+    ftp_disabled = (policies.get("ftp") or {}).get("allow", True) is False
+    text = "Compliant" if auth_enabled and scm_disabled and ftp_disabled else (
+        f"Authentication {'enabled' if auth_enabled else 'disabled'}, "
+        f"SCM basic auth {'disabled' if scm_disabled else 'allowed'}, FTP basic auth {'disabled' if ftp_disabled else 'allowed'}"
+    )
+    proof = {"authSettings": {"enabled": auth_enabled}, "basicPublishingCredentialsPolicies": policies}
+    return _result(auth_enabled and scm_disabled and ftp_disabled, text, {"authEnabled": auth_enabled, "scmBasicAuthDisabled": scm_disabled, "ftpBasicAuthDisabled": ftp_disabled}, proof)
+
+
+def ftps_state(site):
+    config = site.get("config")
+    if config is None:
+        return _unknown("ftpsState")
+    state = config.get("ftpsState")
+    return _result(state == "FtpsOnly", state or "Not Set", {"ftpsState": state}, {"ftpsState": state})
+
+
+def minimum_tls_version(site):
+    config = site.get("config")
+    if config is None:
+        return _unknown("minTlsVersion")
+    version = config.get("minTlsVersion")
+    return _result(version in ("1.2", "1.3"), version or "Not Set", {"minTlsVersion": version}, {"minTlsVersion": version})
+
+
+def entra_id_registration(site):
+    principal_id = (site.get("identity") or {}).get("principalId")
+    text = f"Registered with Entra ID: {principal_id}" if principal_id else "Not registered with Entra ID"
+    return _result(bool(principal_id), text, {"principalId": principal_id})
+
+
+def basic_authentication(site):
+    policies = site.get("publishingCredentials")
+    if policies is None:
+        return _unknown("basic publishing credentials policies")
+    allowed = [name for name in ("ftp", "scm") if (policies.get(name) or {}).get("allow", True) is not False]
+    text = f"Basic authentication allowed for {', '.join(allowed).upper()}" if allowed else "Disabled"
+    return _result(not allowed, text, {"basicAuthAllowed": allowed}, policies)
+
+
+def _runtime_version(site, field, supported, language):
+    config = site.get("config")
+    if config is None:
+        return _unknown(f"{language} version")
+    version = config.get(field)
+    proof = {key: config.get(key) for key in ("linuxFxVersion", "windowsFxVersion", field)}
+    if not version:
+        return _result(True, f"{language} not used", {field: version})
+    if version in supported:
+        return _result(True, f"Supported {language} version: {version}", {field: version})
+    return _result(False, f"Unsupported {language} version: {version}", {field: version}, proof)
+
+
+def php_version(site):
+    return _runtime_version(site, "phpVersion", SUPPORTED_PHP_VERSIONS, "PHP")
+
+
+def python_version(site):
+    return _runtime_version(site, "pythonVersion", SUPPORTED_PYTHON_VERSIONS, "Python")
+
+
+def java_version(site):
+    status, color, text, details, proof = _runtime_version(site, "javaVersion", SUPPORTED_JAVA_VERSIONS, "Java")
+    config = site.get("config") or {}
+    if config.get("javaVersion") and config.get("javaContainer") and config.get("javaContainerVersion"):
+        text = f"{text} ({config['javaContainer']} {config['javaContainerVersion']})"
+    return status, color, text, details, proof
+
+
+def http2(site):
+    config = site.get("config")
+    if config is None or config.get("http20Enabled") is None:
+        return _unknown("HTTP 2.0 status")
+    enabled = config["http20Enabled"]
+    return _result(enabled is True, "Enabled" if enabled else "Disabled", {"http20Enabled": enabled})
+
+
+def remote_debugging(site):
+    config = site.get("config")
+    if config is None or config.get("remoteDebuggingEnabled") is None:
+        return _unknown("remote debugging status")
+    enabled = config["remoteDebuggingEnabled"]
+    return _result(enabled is False, "Enabled" if enabled else "Disabled", {"remoteDebuggingEnabled": enabled}, {"remoteDebuggingEnabled": enabled})
+
+
+RULES = {
+    "9.1": {"label": "HTTPS Only", "evaluate": https_only, "needs": ()},
+    "9.2": {"label": "App Service Authentication", "evaluate": authentication, "needs": ("authSettings", "publishingCredentials")},
+    "9.3": {"label": "FTP State", "evaluate": ftps_state, "needs": ("config",)},
+    "9.4": {"label": "Minimum TLS Version", "evaluate": minimum_tls_version, "needs": ("config",)},
+    "9.5": {"label": "Managed Identity", "evaluate": entra_id_registration, "needs": ()},
+    "9.6": {"label": "Basic Authentication", "evaluate": basic_authentication, "needs": ("publishingCredentials",)},
+    "9.7": {"label": "PHP Version", "evaluate": php_version, "needs": ("config",)},
+    "9.8": {"label": "Python Version", "evaluate": python_version, "needs": ("config",)},
+    "9.9": {"label": "Java Version", "evaluate": java_version, "needs": ("config",)},
+    "9.10": {"label": "HTTP 2.0", "evaluate": http2, "needs": ("config",)},
+    "9.12": {"label": "Remote Debugging", "evaluate": remote_debugging, "needs": ("config",)},
+}
+
+
+def get_subscriptions():
+    """Returns the enabled subscriptions, from the snapshot when there is one."""
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
+    subscriptions = armclient.get_all(f"{RESOURCE}/subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}")
+    if subscriptions is None:
+        return []
+    return [subscription for subscription in subscriptions if subscription.get("state") in (None, "Enabled")]
+
+
+def _site_lock(key):
+    with _site_locks_lock:
+        return _site_locks.setdefault(key, threading.Lock())
+
+
+def clear_cache():
+    """Forgets every outcome evaluated so far."""
+    with _site_locks_lock:
+        _outcomes.clear()
+        _site_locks.clear()
+
+
+def evaluate_site(site, controls):
+    """Returns {control: outcome} for one web app, reading the details its rules need first.
+
+    Outcomes are kept for the process, so later controls are answered
+    without another read.
+    """
+    key = site.get("id") or site.get("name")
+    with _site_lock(key):
+        pending = [control for control in controls if (key, control) not in _outcomes]
+        inventory.read_web_app_details(site, sorted({detail for control in pending for detail in RULES[control]["needs"]}))
+        for control in pending:
+            _outcomes[(key, control)] = RULES[control]["evaluate"](site)
+        return {control: _outcomes[(key, control)] for control in controls}
+
+
+def evaluate(controls=None):
+    """Applies the given rules (all by default) to every web app in one pass.
+
+    Yields (subscription, site_results) in subscription order; site_results
+    is None where the web apps could not be listed, and otherwise yields
+    (site, {control: outcome}) in listing order. Listings are read
+    concurrently ahead of the caller and each subscription's sites are
+    evaluated concurrently, so every app is available as soon as it and the
+    ones before it are done.
+    """
+    controls = list(controls or RULES)
+    subscriptions = get_subscriptions()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as listing_executor, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        listings = listing_executor.map(
+            lambda subscription: inventory.get_collection("sites", subscription["subscriptionId"]),
+            subscriptions
+        )
+        for subscription, sites in zip(subscriptions, listings):
+            if sites is None:
+                yield subscription, None
+                continue
+            yield subscription, zip(sites, executor.map(lambda site: evaluate_site(site, controls), sites))
+
+
+def report(control):
+    """Prints and records one control's result for every web app, then its final status.
+
+    The pass also evaluates every rule whose details this control reads
+    anyway, so the other section 9 checks in this process reuse it.
+    """
+    rule = RULES[control]
+    controls = [name for name, other in RULES.items() if set(other["needs"]) <= set(rule["needs"])]
+    all_passed = True
+    subscriptions_found = False
+    for subscription, site_results in evaluate(controls):
+        subscriptions_found = True
+        subscription_name = subscription["displayName"]
+        print(f"\n{Fore.YELLOW}Checking App Services in subscription: {subscription_name}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
+        print()
+
+        if site_results is None:
+            print(f"{Fore.RED}Failed to retrieve App Services for subscription {subscription_name}.{Style.RESET_ALL}")
+            continue
+
+        sites_found = False
+        for site, outcomes in site_results:
+            sites_found = True
+            status, color, text, details, proof = outcomes[control]
+            app_name = site.get("name")
+            print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
+            print()
+            print(f"{app_name} - {rule['label']}: {color}{text}{Style.RESET_ALL}")
+            records.resource(site.get("id", app_name), status, **details)
+            if status != "PASS":
+                all_passed = False
+                if proof:
+                    print(f"{Fore.CYAN}\n{json.dumps(proof, indent=4)}{Style.RESET_ALL}")
+        if not sites_found:
+            print(f"{Fore.YELLOW}No App Services found in subscription {subscription_name}.{Style.RESET_ALL}")
+
+    if not subscriptions_found:
+        print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
+        print("Final Status: FAIL")
+        records.verdict("FAIL", reason="no subscriptions")
+        return
+
+    print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN if all_passed else Fore.RED}{'PASS' if all_passed else 'FAIL'}{Style.RESET_ALL}")
+    records.verdict("PASS" if all_passed else "FAIL")
@@ -0,0 +1,309 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import threading
+import subprocess
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from colorama import Fore, Style
+
+ARM_RESOURCE = "https://management.azure.com/"
+GRAPH_RESOURCE = "https://graph.microsoft.com/"
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+POOL_SIZE = 32
+REQUEST_TIMEOUT_SECONDS = 60
+
+# Retries. Throttled (429) and transient server errors are retried with full
+# jitter backoff, honouring Retry-After when Azure sends it.
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_CAP_SECONDS = 60
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+TRANSIENT_CLI_ERROR = re.compile(
+    r"TooManyRequests|Too Many Requests|\b429\b|RetryableError|ServiceUnavailable|GatewayTimeout|"
+    r"InternalServerError|Connection aborted|Connection reset|timed out",
+    re.IGNORECASE
+)
+
+# Every call to Azure takes a token first. AZUREFY_CALL_RATE sets the refill
+# rate per second; AZUREFY_RATE_STATE names a file that lets the checks of a
+# parallel run share one bucket.
+CALL_RATE_ENV = "AZUREFY_CALL_RATE"
+RATE_STATE_ENV = "AZUREFY_RATE_STATE"
+DEFAULT_CALL_RATE = 20
+BUCKET_CAPACITY = 100
+RATELIMIT_HEADERS = ("x-ms-ratelimit-remaining-subscription-reads", "x-ms-ratelimit-remaining-tenant-reads",
+                     "x-ms-ratelimit-remaining-subscription-writes")
+RATELIMIT_LOW_WATERMARK = 25
+
+_session = None
+_session_lock = threading.Lock()
+_tokens = {}
+_token_lock = threading.Lock()
+
+
+def get_session():
+    """Returns the process-wide keep-alive session shared by every ARM and Graph call."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+        return _session
+
+
+class TokenBucket:
+    """Paces calls to Azure at `rate` per second with bursts of up to `capacity`.
+
+    With a state file the bucket is shared between processes through an
+    exclusive lock on that file.
+    """
+
+    def __init__(self, rate, capacity, state_file=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.tokens = capacity
+        self.updated = time.time()
+        self.paused_until = 0
+
+    def _update(self, change):
+        """Applies `change(state)` to the refilled bucket state and returns its result."""
+        with self.lock:
+            if not self.state_file:
+                state = {"tokens": self.tokens, "updated": self.updated, "paused_until": self.paused_until}
+                result = self._refill_and_apply(state, change)
+                self.tokens, self.updated, self.paused_until = state["tokens"], state["updated"], state["paused_until"]
+                return result
+
+            import fcntl
+            with open(self.state_file, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    state = json.loads(f.read())
+                except ValueError:
+                    state = {"tokens": self.capacity, "updated": time.time(), "paused_until": 0}
+                result = self._refill_and_apply(state, change)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                return result
+
+    def _refill_and_apply(self, state, change):
+        now = time.time()
+        state["tokens"] = min(self.capacity, state["tokens"] + (now - state["updated"]) * self.rate)
+        state["updated"] = now
+        return change(state, now)
+
+    def acquire(self):
+        """Blocks until a call may be made."""
+        def take(state, now):
+            if now < state["paused_until"]:
+                return state["paused_until"] - now
+            if state["tokens"] >= 1:
+                state["tokens"] -= 1
+                return 0
+            return (1 - state["tokens"]) / self.rate
+
+        while True:
+            wait = self._update(take)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Holds every caller back for `seconds`, e.g. after a 429."""
+        def hold(state, now):
+            state["paused_until"] = max(state["paused_until"], now + seconds)
+
+        self._update(hold)
+
+
+_bucket = None
+_bucket_lock = threading.Lock()
+
+
+def get_bucket():
+    """Returns the bucket every call in this process draws from."""
+    global _bucket
+    with _bucket_lock:
+        if _bucket is None:
+            rate = float(os.environ.get(CALL_RATE_ENV) or DEFAULT_CALL_RATE)
+            _bucket = TokenBucket(rate, BUCKET_CAPACITY, os.environ.get(RATE_STATE_ENV))
+        return _bucket
+
+
+def backoff_delay(attempt):
+    """Full jitter: a random delay up to an exponentially growing cap."""
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def retry_after_seconds(headers):
+    """Reads Retry-After (seconds or an HTTP date); returns None when absent."""
+    value = headers.get("Retry-After")
+    if not value and headers.get("x-ms-retry-after-ms"):
+        value = str(float(headers["x-ms-retry-after-ms"]) / 1000)
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def observe_rate_limits(headers):
+    """Slows the bucket down when ARM reports little quota left."""
+    remaining = [int(headers[name]) for name in RATELIMIT_HEADERS if str(headers.get(name, "")).isdigit()]
+    if remaining and min(remaining) < RATELIMIT_LOW_WATERMARK:
+        bucket = get_bucket()
+        bucket.pause((RATELIMIT_LOW_WATERMARK - min(remaining)) / bucket.rate)
+
+
+def run(args, **kwargs):
+    """Drop-in for subprocess.run for `az` commands: paced by the bucket and retried on throttling.
+
+    Failures that are not transient behave exactly as with subprocess.run.
+    """
+    check = kwargs.pop("check", False)
+    capture_stderr = "stderr" not in kwargs
+    if capture_stderr:
+        kwargs["stderr"] = subprocess.PIPE
+    for attempt in range(MAX_ATTEMPTS):
+        get_bucket().acquire()
+        process = subprocess.run(args, **kwargs)
+        stderr = process.stderr.decode(errors="replace") if isinstance(process.stderr, bytes) else (process.stderr or "")
+        if process.returncode == 0 or not TRANSIENT_CLI_ERROR.search(stderr) or attempt == MAX_ATTEMPTS - 1:
+            break
+        delay = backoff_delay(attempt)
+        if "429" in stderr or "TooManyRequests" in stderr or "Too Many Requests" in stderr:
+            get_bucket().pause(delay)
+        time.sleep(delay)
+    if capture_stderr and process.stderr:
+        if isinstance(process.stderr, bytes):
+            sys.stderr.buffer.write(process.stderr)
+        else:
+            sys.stderr.write(process.stderr)
+        sys.stderr.flush()
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args, process.stdout, process.stderr)
+    return process
+
+
+def resource_for_url(url):
+    """Maps a request URL to the token audience it needs."""
+    host = urlparse(url).netloc.lower()
+    if host == "graph.microsoft.com":
+        return GRAPH_RESOURCE
+    return ARM_RESOURCE
+
+
+def _token_expiry(token_data):
+    """Reads the expiry of an `az account get-access-token` response as epoch seconds."""
+    if token_data.get("expires_on"):
+        return int(token_data["expires_on"])
+    expires_on = token_data.get("expiresOn")
+    if expires_on:
+        return time.mktime(time.strptime(expires_on.split(".")[0], "%Y-%m-%d %H:%M:%S"))
+    return time.time() + TOKEN_REFRESH_MARGIN_SECONDS
+
+
+def get_token(resource=ARM_RESOURCE):
+    """Returns a bearer token for a resource, calling the Azure CLI only when the cached one is near expiry."""
+    with _token_lock:
+        cached = _tokens.get(resource)
+        if cached and cached[1] - TOKEN_REFRESH_MARGIN_SECONDS > time.time():
+            return cached[0]
+        try:
+            process = subprocess.run(
+                ["az", "account", "get-access-token", "--resource", resource, "-o", "json"],
+                check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            token_data = json.loads(process.stdout)
+        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+            print(f"{Fore.RED}Failed to retrieve access token for {resource}: {e}{Style.RESET_ALL}")
+            return None
+        _tokens[resource] = (token_data["accessToken"], _token_expiry(token_data))
+        return token_data["accessToken"]
+
+
+def send(method, url, body=None):
+    """Sends an authenticated request and returns the final requests.Response, or None if none arrived.
+
+    Throttled and transient failures are retried up to MAX_ATTEMPTS times;
+    any other status is returned for the caller to inspect.
+    """
+    token = get_token(resource_for_url(url))
+    if not token:
+        return None
+    for attempt in range(MAX_ATTEMPTS):
+        last_attempt = attempt == MAX_ATTEMPTS - 1
+        get_bucket().acquire()
+        try:
+            response = get_session().request(
+                method, url, json=body, timeout=REQUEST_TIMEOUT_SECONDS,
+                headers={"Authorization": f"Bearer {token}"}
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last_attempt:
+                print(f"{Fore.RED}Error calling {method.upper()} {url}: {e}{Style.RESET_ALL}")
+                return None
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        observe_rate_limits(response.headers)
+        if response.status_code in RETRY_STATUS_CODES and not last_attempt:
+            delay = retry_after_seconds(response.headers)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            if response.status_code == 429:
+                get_bucket().pause(delay)
+            time.sleep(delay)
+            continue
+        return response
+
+
+def request(method, url, body=None):
+    """Sends an authenticated request and returns the parsed JSON body, or None on failure."""
+    response = send(method, url, body)
+    if response is None:
+        return None
+    try:
+        response.raise_for_status()
+        return response.json() if response.content else {}
+    except (requests.RequestException, ValueError) as e:
+        print(f"{Fore.RED}Error calling {method.upper()} {url}: {e}{Style.RESET_ALL}")
+        return None
+
+
+def get(url):
+    """GETs a single ARM or Graph object."""
+    return request("get", url)
+
+
+def post(url, body):
+    """POSTs a JSON body and returns the parsed response."""
+    return request("post", url, body)
+
+
+def get_all(url):
+    """GETs a list endpoint and returns every item, following nextLink / @odata.nextLink pages."""
+    items = []
+    while url:
+        page = get(url)
+        if page is None:
+            return None
+        items.extend(page.get("value", []))
+        url = page.get("nextLink") or page.get("@odata.nextLink")
+    return items
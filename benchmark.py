@@ -0,0 +1,305 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+from colorama import init, Fore, Style
+import inventory
+import checks
+import records
+import replay
+
+init(autoreset=True)
+
+# Runs checks under replay.py and reports wall time, Azure call counts and peak
+# RSS for each. With --record the calls go to Azure and are saved per check;
+# afterwards every run is offline. --synthetic-tenant builds a scaled inventory
+# snapshot so the inventory-backed checks can be timed against a large tenant.
+
+SYNTHETIC_CASSETTE = "_synthetic.json"
+SYNTHETIC_INVENTORY = "_synthetic_inventory.json"
+ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+
+
+def default_scripts():
+    """Returns the benchmark order used by Azurefy.py."""
+    import Azurefy
+    return list(Azurefy.scripts)
+
+
+def cassette_name(directory, script_name):
+    return os.path.join(directory, os.path.splitext(os.path.basename(script_name))[0] + ".json")
+
+
+def _synthetic_id(collection, subscription_id, index):
+    provider, _ = inventory.COLLECTIONS[collection]
+    return f"/subscriptions/{subscription_id}/resourceGroups/rg-{index % 50:02d}/providers/{provider}/{collection.lower()[:10]}{index:06d}"
+
+
+def _synthetic_resource(collection, subscription_id, index, rng, peers=None):
+    """Builds one resource record with the fields the checks read, half of them compliant.
+
+    peers maps each collection to the index of its resource in the same
+    subscription row, so network resources can reference each other: the
+    VNet's subnet uses the row's NSG, the NIC sits in that subnet and holds
+    the row's public IP, and the public IP points back at the NIC.
+    """
+    provider, _ = inventory.COLLECTIONS[collection]
+    resource_group = f"rg-{index % 50:02d}"
+    name = f"{collection.lower()[:10]}{index:06d}"
+    resource_id = _synthetic_id(collection, subscription_id, index)
+    peers = peers or {}
+
+    def peer_id(peer):
+        return _synthetic_id(peer, subscription_id, peers[peer])
+
+    compliant = rng.random() < 0.5
+    properties = {}
+    if collection == "storageAccounts":
+        properties = {
+            "supportsHttpsTrafficOnly": compliant,
+            "minimumTlsVersion": "TLS1_2" if compliant else "TLS1_0",
+            "allowBlobPublicAccess": not compliant,
+            "allowCrossTenantReplication": not compliant,
+            "publicNetworkAccess": "Disabled" if compliant else "Enabled",
+            "networkAcls": {"bypass": "AzureServices" if compliant else "None", "defaultAction": "Deny" if compliant else "Allow"},
+            "encryption": {"requireInfrastructureEncryption": compliant, "keySource": "Microsoft.Keyvault" if compliant else "Microsoft.Storage"},
+            "privateEndpointConnections": [{"id": f"pe-{index}"}] if compliant else [],
+        }
+    elif collection == "virtualMachines":
+        properties = {
+            "securityProfile": {
+                "securityType": "TrustedLaunch" if compliant else "Standard",
+                "uefiSettings": {"secureBootEnabled": compliant, "vTpmEnabled": compliant},
+            },
+            "storageProfile": {"osDisk": {"name": f"{name}-os", "managedDisk": {"storageAccountType": "Premium_LRS"}}},
+        }
+    elif collection == "networkSecurityGroups":
+        properties = {"securityRules": [{"name": "allow-management", "properties": {
+            "priority": 100, "access": "Allow", "direction": "Inbound", "protocol": "Tcp",
+            "destinationPortRanges": ["22", "3389", "443"], "sourceAddressPrefix": "10.0.0.0/8" if compliant else "Internet",
+        }}]}
+    elif collection == "virtualNetworks":
+        subnet = {"id": f"{resource_id}/subnets/default", "name": "default", "properties": {"addressPrefix": "10.0.0.0/16"}}
+        if "networkSecurityGroups" in peers:
+            subnet["properties"]["networkSecurityGroup"] = {"id": peer_id("networkSecurityGroups")}
+        properties = {"addressSpace": {"addressPrefixes": ["10.0.0.0/16"]}, "subnets": [subnet]}
+    elif collection == "networkInterfaces":
+        ip_configuration = {"id": f"{resource_id}/ipConfigurations/ipconfig1", "name": "ipconfig1",
+                            "properties": {"privateIPAddress": f"10.0.{index // 256 % 256}.{index % 256}"}}
+        if "virtualNetworks" in peers:
+            ip_configuration["properties"]["subnet"] = {"id": f"{peer_id('virtualNetworks')}/subnets/default"}
+        if "publicIPAddresses" in peers:
+            ip_configuration["properties"]["publicIPAddress"] = {"id": peer_id("publicIPAddresses")}
+        properties = {"ipConfigurations": [ip_configuration]}
+    elif collection == "publicIPAddresses":
+        properties = {"ipAddress": f"20.0.{index // 256 % 256}.{index % 256}", "publicIPAllocationMethod": "Static"}
+        if "networkInterfaces" in peers:
+            properties["ipConfiguration"] = {"id": f"{peer_id('networkInterfaces')}/ipConfigurations/ipconfig1"}
+    elif collection == "sites":
+        properties = {"httpsOnly": compliant, "siteConfig": {"minTlsVersion": "1.2" if compliant else "1.0"}}
+    resource = {
+        "id": resource_id,
+        "name": name,
+        "type": provider,
+        "location": "eastus",
+        "resourceGroup": resource_group,
+        "subscriptionId": subscription_id,
+        "properties": properties,
+    }
+    if collection == "virtualMachines":
+        extension = "EndpointSecurity" if compliant else "CustomScriptExtension"
+        resource["extensions"] = [{"id": f"{resource['id']}/extensions/{extension}", "name": extension,
+                                   "publisher": "Microsoft.Azure", "type": extension, "provisioningState": "Succeeded"}]
+        resource["instanceView"] = {"statuses": [{"code": "PowerState/running"}]}
+    elif collection == "sites":
+        resource["identity"] = {"principalId": f"principal-{index}"} if compliant else None
+        resource["config"] = {
+            "ftpsState": "FtpsOnly" if compliant else "AllAllowed", "minTlsVersion": "1.2" if compliant else "1.0",
+            "http20Enabled": compliant, "remoteDebuggingEnabled": not compliant,
+            "phpVersion": "", "pythonVersion": "" if compliant else "2.7", "javaVersion": "17" if compliant else "1.8",
+        }
+        resource["authSettings"] = {"enabled": compliant}
+        resource["publishingCredentials"] = {"ftp": {"allow": not compliant}, "scm": {"allow": not compliant}}
+    elif collection == "publicIPAddresses":
+        resource["sku"] = {"name": "Standard", "tier": "Regional"}
+    elif collection == "storageAccounts":
+        resource["blobService"] = {"deleteRetentionPolicy": {"enabled": compliant, "days": 7 if compliant else None}}
+    return resource
+
+
+def generate_synthetic_tenant(directory, subscription_count=1000, resource_count=100000, seed=0):
+    """Writes a scaled inventory snapshot and the cassette entries every check needs to start.
+
+    Resources are spread evenly over subscriptions and inventory collections.
+    Returns the snapshot path.
+    """
+    rng = random.Random(seed)
+    subscription_ids = [f"00000000-0000-0000-0000-{index:012d}" for index in range(subscription_count)]
+    subscriptions = [{
+        "id": subscription_id, "subscriptionId": subscription_id,
+        "name": f"Synthetic {index}", "displayName": f"Synthetic {index}",
+        "state": "Enabled", "tenantId": "synthetic",
+    } for index, subscription_id in enumerate(subscription_ids)]
+
+    collections = list(inventory.COLLECTIONS)
+    resources = {name: {subscription_id: [] for subscription_id in subscription_ids} for name in collections}
+    for index in range(resource_count):
+        collection = collections[index % len(collections)]
+        subscription_id = subscription_ids[(index // len(collections)) % subscription_count]
+        row = index - index % len(collections)
+        peers = {name: row + offset for offset, name in enumerate(collections) if row + offset < resource_count}
+        resources[collection][subscription_id].append(_synthetic_resource(collection, subscription_id, index, rng, peers))
+
+    snapshot_file = os.path.join(directory, SYNTHETIC_INVENTORY)
+    with open(snapshot_file, "w") as f:
+        json.dump({"collectedAt": "synthetic", "backend": "synthetic", "subscriptions": subscriptions, "resources": resources}, f)
+
+    token = json.dumps({"accessToken": "REDACTED", "expiresOn": "2999-01-01 00:00:00.000000", "tokenType": "Bearer"})
+    ok = {"returncode": 0, "stderr": ""}
+    cassette = {"subprocess": {
+        "az account show": dict(ok, stdout=json.dumps({"id": subscription_ids[0], "name": "Synthetic 0", "state": "Enabled"})),
+        "az account list --all -o json": dict(ok, stdout=json.dumps([{"id": s["id"], "name": s["name"], "state": "Enabled"} for s in subscriptions])),
+    }, "http": {}, "powershell": {}}
+    for subscription_id in subscription_ids:
+        cassette["subprocess"][f"az account set --subscription {subscription_id}"] = dict(ok, stdout="")
+    for resource in ("https://management.azure.com/", "https://graph.microsoft.com/"):
+        cassette["subprocess"][replay.command_key(["az", "account", "get-access-token", "--resource", resource, "-o", "json"])] = dict(ok, stdout=token)
+    with open(os.path.join(directory, SYNTHETIC_CASSETTE), "w") as f:
+        json.dump(cassette, f)
+    return snapshot_file
+
+
+def run_benchmark(script_name, cassettes, mode, snapshot_file=None, timeout=600):
+    """Runs one check under replay.py and returns its wall time, call counts, peak RSS and status."""
+    stats_fd, stats_file = tempfile.mkstemp(suffix=".json")
+    os.close(stats_fd)
+    records_read_fd, records_write_fd = os.pipe()
+    env = dict(os.environ, **{
+        replay.MODE_ENV: mode,
+        replay.FILE_ENV: os.pathsep.join(cassettes),
+        replay.STATS_ENV: stats_file,
+        records.RECORDS_FD_ENV: str(records_write_fd),
+    })
+    if snapshot_file:
+        env[inventory.INVENTORY_ENV] = os.path.abspath(snapshot_file)
+
+    check_records = []
+
+    def read_records():
+        with os.fdopen(records_read_fd) as channel:
+            for line in channel:
+                record = records.parse_line(line)
+                if record is not None:
+                    check_records.append(record)
+
+    with tempfile.TemporaryFile(mode="w+") as output:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay.py"), script_name],
+            stdout=output, stderr=subprocess.STDOUT, env=env, pass_fds=(records_write_fd,)
+        )
+        os.close(records_write_fd)
+        reader = threading.Thread(target=read_records, daemon=True)
+        reader.start()
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+        _, exit_status, usage = os.wait4(process.pid, 0)
+        wall_time = time.perf_counter() - start
+        timer.cancel()
+        process.returncode = os.waitstatus_to_exitcode(exit_status)
+        reader.join(timeout=5)
+        output.seek(0)
+        text = ANSI_PATTERN.sub("", output.read())
+
+    try:
+        with open(stats_file) as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        stats = {"calls": {}, "misses": {}}
+    os.remove(stats_file)
+
+    return {
+        "Wall Time": round(wall_time, 3),
+        "Calls": stats["calls"],
+        "Misses": stats["misses"],
+        "Peak RSS KB": usage.ru_maxrss,
+        "Exit Code": process.returncode,
+        "Final Status": records.final_verdict(check_records) or checks.status_from_output(text),
+    }
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """Lists checks that got slower than the tolerance allows or started making more calls."""
+    regressions = []
+    for script_name, current in report.items():
+        previous = baseline.get(script_name)
+        if not previous:
+            continue
+        if current["Wall Time"] > previous["Wall Time"] * (1 + tolerance) + 0.05:
+            regressions.append(f"{script_name}: wall time {previous['Wall Time']}s -> {current['Wall Time']}s")
+        if sum(current["Calls"].values()) > sum(previous["Calls"].values()):
+            regressions.append(f"{script_name}: calls {sum(previous['Calls'].values())} -> {sum(current['Calls'].values())}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Azurefy checks against recorded Azure responses.")
+    parser.add_argument('--script', action='append', help="Check to benchmark; repeat for several (default: every check).")
+    parser.add_argument('--cassettes', default="cassettes", help="Directory holding one cassette per check (default: cassettes).")
+    parser.add_argument('--record', action='store_true', help="Call Azure for real and save the responses instead of replaying them.")
+    parser.add_argument('--synthetic-tenant', action='store_true', help="Run against a generated inventory snapshot instead of a recorded one.")
+    parser.add_argument('--subscriptions', type=int, default=1000, help="Subscriptions in the synthetic tenant (default: 1000).")
+    parser.add_argument('--resources', type=int, default=100000, help="Resources in the synthetic tenant (default: 100000).")
+    parser.add_argument('--timeout', type=int, default=600, help="Seconds before a check is killed (default: 600).")
+    parser.add_argument('--output', default="benchmark.json", help="Where to write the report (default: benchmark.json).")
+    parser.add_argument('--baseline', help="Earlier report to compare against; exits non-zero on a regression.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed wall-time growth over the baseline (default: 0.25).")
+    args = parser.parse_args()
+
+    if args.record and args.synthetic_tenant:
+        parser.error("--record talks to Azure; it cannot be combined with --synthetic-tenant")
+
+    os.makedirs(args.cassettes, exist_ok=True)
+    snapshot_file = None
+    shared = []
+    if args.synthetic_tenant:
+        print(f"{Fore.YELLOW}Generating synthetic tenant: {args.subscriptions} subscriptions, {args.resources} resources...{Style.RESET_ALL}")
+        snapshot_file = generate_synthetic_tenant(args.cassettes, args.subscriptions, args.resources)
+        shared = [os.path.join(args.cassettes, SYNTHETIC_CASSETTE)]
+
+    mode = "record" if args.record else "replay"
+    report = {}
+    for script_name in args.script or default_scripts():
+        if not os.path.isfile(script_name):
+            print(f"Script {script_name} not found. Skipping.")
+            continue
+        result = run_benchmark(script_name, [cassette_name(args.cassettes, script_name)] + shared, mode, snapshot_file, args.timeout)
+        report[script_name] = result
+        calls = ", ".join(f"{kind} {count}" for kind, count in result["Calls"].items() if count) or "none"
+        misses = sum(result["Misses"].values())
+        miss_note = f" {Fore.RED}({misses} unrecorded){Style.RESET_ALL}" if misses and mode == "replay" else ""
+        print(f"{script_name}: {Fore.CYAN}{result['Wall Time']:.2f}s{Style.RESET_ALL}, calls: {calls}{miss_note}, "
+              f"peak RSS {result['Peak RSS KB'] // 1024} MB, {result['Final Status']}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    total = sum(result["Wall Time"] for result in report.values())
+    print(f"\n{Fore.GREEN}Benchmarked {len(report)} checks in {total:.2f}s. Report written to {args.output}{Style.RESET_ALL}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_with_baseline(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"{Fore.RED}REGRESSION {regression}{Style.RESET_ALL}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import io
+import os
+import ast
+import re
+import sys
+import time
+import runpy
+import threading
+import importlib.util
+from datetime import datetime
+import records
+
+# A check script may define `run(context)` returning a CheckResult (or None to
+# have its status read from the captured output). Scripts without it are
+# executed as `__main__`, exactly as `python3 "<script>.py"` would run them.
+#
+# A script whose verdict depends only on inventory snapshot data lists those
+# collections in a top-level `INVENTORY_COLLECTIONS`; --since-last-run reuses
+# its previous result while the listed resources are unchanged.
+
+FINAL_STATUS_PATTERN = re.compile(r'final status:\s*(pass|fail|manual)', re.IGNORECASE)
+
+
+class CheckResult:
+    """Outcome of one check: its final status, the console output it produced and any structured records."""
+
+    def __init__(self, status, output="", timestamp=None, records=None):
+        self.status = status
+        self.output = output
+        self.timestamp = timestamp or datetime.now().isoformat()
+        self.records = records or []
+
+    def to_dict(self):
+        """Returns the entry stored in Azurefy's results map."""
+        entry = {"Output": self.output, "Final Status": self.status, "Timestamp": self.timestamp}
+        if self.records:
+            entry["Records"] = self.records
+        return entry
+
+
+class _Capture:
+    """Per-thread output buffer that remembers when it was last written to."""
+
+    def __init__(self, echo=None):
+        self.buffer = io.StringIO()
+        self.echo = echo
+        self.last_write = time.monotonic()
+
+    def write(self, text):
+        self.buffer.write(text)
+        self.last_write = time.monotonic()
+        if self.echo is not None:
+            self.echo.write(text)
+            self.echo.flush()
+
+
+class _ThreadRoutedStream:
+    """Stands in for sys.stdout/sys.stderr and sends each thread's writes to its own capture."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        capture = getattr(self.local, "capture", None)
+        if capture is None:
+            return self.stream.write(text)
+        capture.write(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(self.local, "capture", None) is None:
+            self.stream.flush()
+
+    def isatty(self):
+        # Report a terminal so colorama keeps the ANSI colours the report relies on.
+        return True
+
+    def fileno(self):
+        return self.stream.fileno()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+_routed_stdout = None
+_routed_stderr = None
+_install_lock = threading.Lock()
+
+
+def _install_streams():
+    """Installs the routing streams once for the whole process."""
+    global _routed_stdout, _routed_stderr
+    with _install_lock:
+        if _routed_stdout is None:
+            _routed_stdout = _ThreadRoutedStream(sys.stdout)
+            _routed_stderr = _ThreadRoutedStream(sys.stderr)
+        sys.stdout = _routed_stdout
+        sys.stderr = _routed_stderr
+
+
+def route_thread_output(stream):
+    """Sends the calling thread's stdout and stderr writes to `stream`, or back to the process streams when None."""
+    _install_streams()
+    _routed_stdout.local.capture = stream
+    _routed_stderr.local.capture = stream
+
+
+def _module_name(script_name):
+    return "azurefy_check_" + re.sub(r'\W', '_', os.path.splitext(os.path.basename(script_name))[0])
+
+
+def load_check(script_name):
+    """Imports a check script by path without running its `__main__` block."""
+    directory = os.path.dirname(os.path.abspath(script_name))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(_module_name(script_name), script_name)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        # Scripts call colorama.init() at import time, which rewraps sys.stdout.
+        _install_streams()
+    return module
+
+
+def defines_run(script_name):
+    """Tells whether a check script defines the `run(context)` plugin entry point."""
+    with open(script_name, "rb") as f:
+        tree = ast.parse(f.read(), filename=script_name)
+    return any(isinstance(node, ast.FunctionDef) and node.name == "run" for node in tree.body)
+
+
+def inventory_dependencies(script_name):
+    """Returns the snapshot collections a check declares in INVENTORY_COLLECTIONS, or None if it declares none."""
+    with open(script_name, "rb") as f:
+        tree = ast.parse(f.read(), filename=script_name)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "INVENTORY_COLLECTIONS" for t in node.targets):
+            return list(ast.literal_eval(node.value))
+    return None
+
+
+def status_from_output(output):
+    """Reads the 'Final Status:' line a check prints, defaulting to FAIL."""
+    match = FINAL_STATUS_PATTERN.search(output)
+    if match:
+        return match.group(1).upper()
+    if "manual check required" in output.lower():
+        return "MANUAL"
+    return "FAIL"
+
+
+def _execute(script_name, context):
+    """Runs a check's plugin entry point, or the script itself as `__main__`."""
+    if defines_run(script_name):
+        return load_check(script_name).run(context)
+    directory = os.path.dirname(os.path.abspath(script_name))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    try:
+        runpy.run_path(script_name, run_name="__main__")
+    finally:
+        _install_streams()
+    return None
+
+
+def run_check(script_name, context=None, timeout=60, echo=None, parse_status=status_from_output):
+    """Runs one check in-process and returns its CheckResult.
+
+    The check runs on its own thread with stdout and stderr captured. If it
+    writes nothing for `timeout` seconds it is abandoned and reported as
+    SKIPPED, the same as a silent subprocess check; its thread cannot be
+    stopped and keeps running, so a retry belongs in a subprocess. Output
+    written while the check runs is copied to `echo` when one is given. A
+    verdict record emitted by the check decides its status; the output is
+    parsed only when there is none.
+    """
+    _install_streams()
+    context = dict(context or {}, script=script_name)
+    capture = _Capture(echo=echo)
+    check_records = []
+    outcome = {}
+
+    def target():
+        _routed_stdout.local.capture = capture
+        _routed_stderr.local.capture = capture
+        records.set_sink(check_records.append)
+        try:
+            outcome["result"] = _execute(script_name, context)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                capture.write(f"Script exited with status {e.code}\n")
+        except Exception as e:
+            outcome["error"] = e
+            capture.write(f"Unhandled exception for {script_name}: {e}\n")
+        finally:
+            _routed_stdout.local.capture = None
+            _routed_stderr.local.capture = None
+            records.set_sink(None)
+
+    worker = threading.Thread(target=target, name=f"check:{script_name}", daemon=True)
+    worker.start()
+    while worker.is_alive():
+        worker.join(0.1)
+        if worker.is_alive() and time.monotonic() - capture.last_write >= timeout:
+            return CheckResult("SKIPPED", capture.buffer.getvalue(), records=list(check_records))
+
+    output = capture.buffer.getvalue()
+    result = outcome.get("result")
+    if isinstance(result, CheckResult):
+        if not result.output:
+            result.output = output
+        if not result.records:
+            result.records = check_records
+        return result
+    if "error" in outcome:
+        return CheckResult("FAIL", output, records=check_records)
+    return CheckResult(records.final_verdict(check_records) or parse_status(output), output, records=check_records)
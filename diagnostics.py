@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, Style
+import armclient
+import resourcegraph
+
+# Diagnostic-settings scan shared by the section 6 checks. Resources are
+# enumerated in bulk (Resource Graph, or one paged ARM listing per
+# subscription) and their settings fetched concurrently over the pooled ARM
+# session. Resource Graph does not index diagnostic settings, so the settings
+# themselves are always read from ARM.
+#
+# Which resource types support diagnostic settings is kept in a capability
+# index on disk (diagnostic_capabilities.json, or AZUREFY_CAPABILITY_INDEX):
+# the log and metric categories per type, learned by asking one resource of
+# the type for its diagnosticSettingsCategories. Entries expire after
+# CAPABILITY_TTL_SECONDS and the whole index is dropped when the API version
+# changes. Resources of unsupported types are skipped without a call.
+
+RESOURCE = "https://management.azure.com"
+DIAGNOSTIC_SETTINGS_API_VERSION = "2021-05-01-preview"
+RESOURCES_API_VERSION = "2021-04-01"
+MAX_WORKERS = 16
+UNSUPPORTED_MARKERS = ("does not support diagnostic settings", "ResourceTypeNotSupported")
+CAPABILITY_INDEX_ENV = "AZUREFY_CAPABILITY_INDEX"
+CAPABILITY_INDEX_FILE = "diagnostic_capabilities.json"
+CAPABILITY_TTL_SECONDS = 7 * 24 * 3600
+
+_capabilities = None
+_capabilities_changed = False
+_capabilities_lock = threading.Lock()
+
+
+def resource_type(resource_id):
+    """Returns the lower-cased resource type of an ARM ID, e.g. 'microsoft.storage/storageaccounts'."""
+    parts = resource_id.strip("/").split("/")
+    if "providers" not in [part.lower() for part in parts]:
+        return ""
+    index = max(i for i, part in enumerate(parts) if part.lower() == "providers")
+    namespace, rest = parts[index + 1], parts[index + 2:]
+    return "/".join([namespace] + rest[0::2]).lower()
+
+
+def capability_index_file():
+    return os.environ.get(CAPABILITY_INDEX_ENV) or CAPABILITY_INDEX_FILE
+
+
+def _read_index_file():
+    """Returns the type index on disk, empty when missing, unreadable or for another API version."""
+    try:
+        with open(capability_index_file()) as f:
+            data = json.load(f)
+        return dict(data["types"]) if data.get("apiVersion") == DIAGNOSTIC_SETTINGS_API_VERSION else {}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _load_capabilities():
+    global _capabilities
+    if _capabilities is None:
+        _capabilities = _read_index_file()
+    return _capabilities
+
+
+def save_capabilities():
+    """Merges what this process learned into the index on disk, keeping the newer entry per type.
+
+    The file is replaced atomically so concurrent checks never read half of it.
+    """
+    global _capabilities_changed
+    with _capabilities_lock:
+        if not _capabilities_changed:
+            return
+        types = _read_index_file()
+        for type_name, entry in _load_capabilities().items():
+            if entry.get("checkedAt", 0) >= types.get(type_name, {}).get("checkedAt", 0):
+                types[type_name] = entry
+        _capabilities_changed = False
+    path = capability_index_file()
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump({"apiVersion": DIAGNOSTIC_SETTINGS_API_VERSION, "types": types}, f, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def capability(type_name):
+    """Returns the fresh index entry for a type ({supported, categories, checkedAt}) or None."""
+    with _capabilities_lock:
+        entry = _load_capabilities().get(type_name)
+    if entry and time.time() - entry.get("checkedAt", 0) < CAPABILITY_TTL_SECONDS:
+        return entry
+    return None
+
+
+def record_capability(type_name, supported, categories=None):
+    global _capabilities_changed
+    with _capabilities_lock:
+        _load_capabilities()[type_name] = {"supported": supported, "categories": categories or [], "checkedAt": time.time()}
+        _capabilities_changed = True
+
+
+def is_unsupported(type_name):
+    entry = capability(type_name)
+    return entry is not None and not entry["supported"]
+
+
+def mark_unsupported(type_name):
+    record_capability(type_name, False)
+
+
+def probe_type(resource_id):
+    """Asks one resource for its diagnostic categories and records what its type supports."""
+    type_name = resource_type(resource_id)
+    response = armclient.send("get", f"{RESOURCE}{resource_id}/providers/Microsoft.Insights/diagnosticSettingsCategories?api-version={DIAGNOSTIC_SETTINGS_API_VERSION}")
+    if response is None:
+        return None
+    if response.status_code == 200:
+        try:
+            categories = [
+                {"name": category.get("name"), "categoryType": (category.get("properties") or {}).get("categoryType")}
+                for category in response.json().get("value", [])
+            ]
+        except ValueError:
+            return None
+        record_capability(type_name, bool(categories), categories)
+        return capability(type_name)
+    if any(marker in response.text for marker in UNSUPPORTED_MARKERS):
+        mark_unsupported(type_name)
+        return capability(type_name)
+    return None
+
+
+def _list_from_arm(subscription_id):
+    items = armclient.get_all(f"{RESOURCE}/subscriptions/{subscription_id}/resources?api-version={RESOURCES_API_VERSION}")
+    if items is None:
+        return None
+    return [{"id": item["id"], "name": item.get("name"), "type": item.get("type")} for item in items]
+
+
+def list_resources(subscription_ids):
+    """Yields (subscription_id, [{id, name, type}] or None) in input order, None for a subscription that could not be listed.
+
+    Resource Graph answers every subscription in one query. The ARM fallback
+    lists them concurrently and yields each one as soon as it is ready, so
+    callers can report a subscription before the rest are listed.
+    """
+    subscription_ids = list(subscription_ids)
+    try:
+        rows = resourcegraph.query("resources | project id, name, type, subscriptionId | order by id asc", subscription_ids)
+    except resourcegraph.ResourceGraphError as e:
+        print(f"{Fore.YELLOW}Resource Graph query failed, listing resources through ARM: {e}{Style.RESET_ALL}")
+    else:
+        listing = {subscription_id: [] for subscription_id in subscription_ids}
+        for row in rows:
+            if row.get("subscriptionId") in listing:
+                listing[row["subscriptionId"]].append({"id": row["id"], "name": row.get("name"), "type": row.get("type")})
+        yield from listing.items()
+        return
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        yield from zip(subscription_ids, executor.map(_list_from_arm, subscription_ids))
+
+
+def get_settings(resource_id):
+    """Returns (status, data) for one resource or subscription scope.
+
+    status is "configured", "not_configured", "unsupported" or "error";
+    data is the settings list, or the error message.
+    """
+    type_name = resource_type(resource_id)
+    if type_name and is_unsupported(type_name):
+        return "unsupported", None
+    response = armclient.send("get", f"{RESOURCE}{resource_id}/providers/Microsoft.Insights/diagnosticSettings?api-version={DIAGNOSTIC_SETTINGS_API_VERSION}")
+    if response is None:
+        return "error", "no response"
+    if response.status_code == 200:
+        try:
+            settings = response.json().get("value", [])
+        except ValueError:
+            return "error", "unreadable response"
+        return ("configured" if settings else "not_configured"), settings
+    if any(marker in response.text for marker in UNSUPPORTED_MARKERS):
+        if type_name:
+            mark_unsupported(type_name)
+        return "unsupported", None
+    return "error", f"HTTP {response.status_code}: {response.text[:300]}"
+
+
+def scan(resources, max_workers=MAX_WORKERS):
+    """Fetches the diagnostic settings of every resource; yields (resource, status, data) in input order as they arrive.
+
+    Types missing from the capability index are probed first, one resource
+    each; resources of unsupported types are then answered without a call.
+    The index is saved once the scan is complete.
+    """
+    resources = list(resources)
+    unknown = {}
+    for resource in resources:
+        type_name = resource_type(resource["id"])
+        if type_name and type_name not in unknown and capability(type_name) is None:
+            unknown[type_name] = resource["id"]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(probe_type, unknown.values()))
+        for resource, (status, data) in zip(resources, executor.map(lambda resource: get_settings(resource["id"]), resources)):
+            yield resource, status, data
+    save_capabilities()
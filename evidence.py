@@ -0,0 +1,101 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+import ansi
+
+# Renders a failed check's console output as an SVG terminal snapshot, without
+# a browser. The colours match the HTML report's dark <pre> blocks.
+
+FONT_SIZE = 14
+CHAR_WIDTH = 8.4
+LINE_HEIGHT = 18
+PADDING = 12
+MAX_COLUMNS = 160
+BACKGROUND = "#23252e"
+FOREGROUND = "#ffffff"
+PALETTE = {
+    "black": "#000000", "red": "#ff5555", "green": "#50fa7b", "yellow": "#f1fa8c",
+    "blue": "#6b9bff", "magenta": "#ff79c6", "cyan": "#8be9fd", "white": "#f8f8f2",
+    "gray": "#9aa0a6",
+}
+
+
+def _lines(text):
+    """Splits ANSI output into lines of (text, style) runs, wrapping at MAX_COLUMNS."""
+    lines = [[]]
+    column = 0
+    for chunk, style in ansi.segments(text.replace("\r\n", "\n").replace("\r", "")):
+        for index, part in enumerate(chunk.split("\n")):
+            if index:
+                lines.append([])
+                column = 0
+            part = part.expandtabs(4)
+            while part:
+                room = MAX_COLUMNS - column
+                if room <= 0:
+                    lines.append([])
+                    column, room = 0, MAX_COLUMNS
+                lines[-1].append((part[:room], style))
+                column += len(part[:room])
+                part = part[room:]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def render_svg(title, text):
+    """Returns an SVG document showing `title` above the coloured output."""
+    lines = [[(title, ansi.Style(fg="white", bold=True))], []] + _lines(text)
+    columns = max([sum(len(part) for part, _ in line) for line in lines] + [1])
+    width = int(columns * CHAR_WIDTH + 2 * PADDING)
+    height = int(len(lines) * LINE_HEIGHT + 2 * PADDING)
+
+    body = []
+    for row, line in enumerate(lines):
+        y = PADDING + (row + 1) * LINE_HEIGHT - 4
+        column = 0
+        spans = []
+        for part, style in line:
+            if style.bg:
+                x = PADDING + column * CHAR_WIDTH
+                body.append(f'<rect x="{x:.1f}" y="{y - LINE_HEIGHT + 5}" width="{len(part) * CHAR_WIDTH:.1f}" '
+                            f'height="{LINE_HEIGHT}" fill="{PALETTE[style.bg]}"/>')
+            attributes = f' fill="{PALETTE.get(style.fg, FOREGROUND)}"'
+            if style.bold:
+                attributes += ' font-weight="bold"'
+            spans.append(f'<tspan{attributes}>{escape(part)}</tspan>')
+            column += len(part)
+        if spans:
+            body.append(f'<text x="{PADDING}" y="{y}">{"".join(spans)}</text>')
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n'
+        f'<rect width="100%" height="100%" rx="4" fill="{BACKGROUND}"/>\n'
+        f'<g font-family="Fira Code, DejaVu Sans Mono, Consolas, monospace" font-size="{FONT_SIZE}" xml:space="preserve">\n'
+        + "\n".join(body) +
+        '\n</g>\n</svg>\n'
+    )
+
+
+def evidence_file_name(title):
+    """Names the image the same way as the Puppeteer screenshots."""
+    return re.sub(r'[^a-zA-Z0-9\s.-]', '', title).strip().replace(" ", "_") + ".svg"
+
+
+def _write_evidence(job):
+    title, text, path = job
+    with open(path, "w") as f:
+        f.write(render_svg(title, text))
+    return path
+
+
+def render_evidence(sections, output_directory, workers=None):
+    """Renders (title, ANSI output) pairs to SVG files on a process pool and returns their paths."""
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    jobs = [(title, text, os.path.join(output_directory, evidence_file_name(title))) for title, text in sections]
+    if not jobs:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_write_evidence, jobs))
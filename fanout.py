@@ -0,0 +1,72 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import checks
+import records
+
+# Spreads a check's per-subscription or per-resource work over a thread pool.
+# Each call's console output and records are held back and replayed in input
+# order, so the output reads the same as a serial run however the calls
+# finish. Work run this way must not depend on `az account set`; pass
+# --subscription or use subscription-scoped ARM URLs instead.
+
+DEFAULT_WORKERS = 8
+
+
+class _ShardOutput:
+    """Keeps one call's writes separately so colorama's autoreset still applies to each on replay."""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+
+def _run_shard(function, item):
+    output = _ShardOutput()
+    shard_records = []
+    checks.route_thread_output(output)
+    records.set_sink(shard_records.append)
+    try:
+        return function(item), None, output, shard_records
+    except Exception as e:
+        return None, e, output, shard_records
+    finally:
+        checks.route_thread_output(None)
+        records.set_sink(None)
+
+
+def map_ordered(function, items, max_workers=DEFAULT_WORKERS):
+    """Calls function(item) for every item concurrently and returns the results in item order.
+
+    An exception raised by a call is re-raised after the output of that call
+    and every earlier one has been replayed.
+    """
+    items = list(items)
+    if not items:
+        return []
+    results = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(_run_shard, function, item) for item in items]
+        for future in futures:
+            value, error, output, shard_records = future.result()
+            for text in output.writes:
+                sys.stdout.write(text)
+            for record in shard_records:
+                records.emit(record)
+            if error is not None:
+                sys.stdout.flush()
+                for pending in futures:
+                    pending.cancel()
+                raise error
+            results.append(value)
+    sys.stdout.flush()
+    return results
+
+
+def per_subscription(function, subscriptions, max_workers=DEFAULT_WORKERS):
+    """Calls function(subscription_id, subscription_name) for every subscription; results follow the subscription order."""
+    return map_ordered(
+        lambda subscription: function(subscription["subscriptionId"], subscription["displayName"]),
+        subscriptions, max_workers
+    )
@@ -0,0 +1,138 @@
+import os
+import re
+import html
+import json
+import hashlib
+import checks
+import records
+
+# Fingerprints of the inventory snapshot, written next to results.json after
+# every full run. --since-last-run compares them with the fresh snapshot and
+# reuses the previous verdict of any check whose inputs did not change, as
+# long as that verdict was a real one: recorded by the check itself, with no
+# failed call behind it.
+
+FINGERPRINT_FILE = "fingerprints.json"
+
+# Fields that change without any change to the resource's configuration:
+# VM power state, agent heartbeats and status timestamps, a web app's last
+# restart, a storage account's replication health. No rule reads them, so
+# they are left out of the fingerprint; otherwise no check reading these
+# collections would ever be reused.
+VOLATILE_FIELDS = (
+    ("instanceView",),
+    ("properties", "instanceView"),
+    ("properties", "extended", "instanceView"),
+    ("properties", "lastModifiedTimeUtc"),
+    ("properties", "statusOfPrimary"),
+    ("properties", "statusOfSecondary"),
+    ("properties", "lastGeoFailoverTime"),
+)
+
+# Phrases the checks print when a call or lookup failed. A result showing
+# any of them may owe its verdict to the failure, so it is run again.
+ERROR_MARKERS = ("failed to", "error", "unable to", "timed out")
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def _without_volatile_fields(item):
+    """Returns a copy of a resource record without VOLATILE_FIELDS, leaving the snapshot untouched."""
+    item = dict(item)
+    for path in VOLATILE_FIELDS:
+        parent = item
+        for field in path[:-1]:
+            if not isinstance(parent.get(field), dict):
+                break
+            parent[field] = dict(parent[field])
+            parent = parent[field]
+        else:
+            parent.pop(path[-1], None)
+    return item
+
+
+def fingerprint_snapshot(snapshot):
+    """Fingerprints every resource in a snapshot by hashing its record without VOLATILE_FIELDS.
+
+    A collection that failed for any subscription is recorded as None, so no
+    check that reads it is ever reused.
+    """
+    resources = {}
+    for name, by_subscription in snapshot.get("resources", {}).items():
+        if any(items is None for items in by_subscription.values()):
+            resources[name] = None
+            continue
+        resources[name] = {
+            (item.get("id") or "").lower(): _digest(_without_volatile_fields(item))
+            for items in by_subscription.values() for item in items
+        }
+    subscriptions = sorted((s.get("subscriptionId"), s.get("state")) for s in snapshot.get("subscriptions", []))
+    return {
+        "collectedAt": snapshot.get("collectedAt"),
+        "subscriptions": _digest(subscriptions),
+        "resources": resources,
+    }
+
+
+def check_fingerprint(fingerprints, collections):
+    """Combines the fingerprints of every resource a check reads, or None if any collection is missing."""
+    if not fingerprints:
+        return None
+    selected = {}
+    for name in collections:
+        resources = fingerprints.get("resources", {}).get(name)
+        if resources is None:
+            return None
+        selected[name] = resources
+    return _digest({"subscriptions": fingerprints.get("subscriptions"), "resources": selected})
+
+
+def load_previous(results_file="results.json", fingerprint_file=FINGERPRINT_FILE):
+    """Loads the previous run's results and fingerprints, or (None, None) when either is missing."""
+    try:
+        with open(results_file) as f:
+            results = json.load(f)
+        with open(fingerprint_file) as f:
+            fingerprints = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None, None
+    return results, fingerprints
+
+
+def save_fingerprints(fingerprints, file_name=FINGERPRINT_FILE):
+    """Writes the fingerprints of this run's snapshot for the next --since-last-run."""
+    try:
+        with open(file_name, "w") as f:
+            json.dump(fingerprints, f)
+    except OSError as e:
+        print(f"Error writing fingerprints to file: {e}")
+
+
+def is_trustworthy(result):
+    """Whether a previous result can stand for a new run: the check recorded its own verdict and hit no error path."""
+    status = records.final_verdict(result.get("Records") or [])
+    if status is None or status != result.get("Final Status"):
+        return False
+    output = html.unescape(TAG_PATTERN.sub("", result.get("Output") or "")).lower()
+    return not any(marker in output for marker in ERROR_MARKERS)
+
+
+def reusable_results(script_list, previous_results, previous_fingerprints, fingerprints):
+    """Returns the previous results of checks whose declared inventory inputs are unchanged."""
+    reused = {}
+    if not previous_results or not previous_fingerprints:
+        return reused
+    for script in script_list:
+        previous = previous_results.get(script)
+        if not previous or not is_trustworthy(previous) or not os.path.isfile(script):
+            continue
+        collections = checks.inventory_dependencies(script)
+        if not collections:
+            continue
+        current = check_fingerprint(fingerprints, collections)
+        if current is not None and current == check_fingerprint(previous_fingerprints, collections):
+            reused[script] = dict(previous, Reused=True)
+    return reused
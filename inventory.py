@@ -0,0 +1,410 @@
+import os
+import json
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from colorama import Fore, Style
+import resourcegraph
+import armclient
+
+RESOURCE = "https://management.azure.com"
+INVENTORY_ENV = "AZUREFY_INVENTORY"
+DEFAULT_INVENTORY_FILE = "inventory.json"
+
+# Resource collections gathered once per subscription and shared by the checks.
+COLLECTIONS = {
+    "storageAccounts": ("Microsoft.Storage/storageAccounts", "2023-01-01"),
+    "virtualMachines": ("Microsoft.Compute/virtualMachines", "2023-03-01"),
+    "disks": ("Microsoft.Compute/disks", "2023-04-02"),
+    "networkSecurityGroups": ("Microsoft.Network/networkSecurityGroups", "2023-05-01"),
+    "publicIPAddresses": ("Microsoft.Network/publicIPAddresses", "2023-05-01"),
+    "networkInterfaces": ("Microsoft.Network/networkInterfaces", "2023-05-01"),
+    "virtualNetworks": ("Microsoft.Network/virtualNetworks", "2023-05-01"),
+    "networkWatchers": ("Microsoft.Network/networkWatchers", "2023-05-01"),
+    "bastionHosts": ("Microsoft.Network/bastionHosts", "2023-05-01"),
+    "sites": ("Microsoft.Web/sites", "2022-03-01"),
+    "vaults": ("Microsoft.KeyVault/vaults", "2022-07-01"),
+    "sqlServers": ("Microsoft.Sql/servers", "2021-11-01"),
+    "postgresFlexibleServers": ("Microsoft.DBforPostgreSQL/flexibleServers", "2022-12-01"),
+    "mysqlFlexibleServers": ("Microsoft.DBforMySQL/flexibleServers", "2021-05-01"),
+}
+
+# Virtual machines carry two extra fields in the snapshot: "extensions" (name,
+# publisher, type and provisioning state of each VM extension) and
+# "instanceView". Together with the VM's own properties (securityProfile,
+# storageProfile, ...) they answer the section 8 checks without a per-VM call.
+VM_EXTENSION_TYPE = "Microsoft.Compute/virtualMachines/extensions"
+
+# PostgreSQL and MySQL flexible servers carry "configurations": every server
+# parameter as {name: value}, from one paged /configurations listing per
+# server. The 5.2.x and 5.3.x checks read their parameters from it rather
+# than running one `az ... parameter show` per server and parameter.
+FLEXIBLE_SERVER_COLLECTIONS = ("postgresFlexibleServers", "mysqlFlexibleServers")
+
+# Storage accounts carry "blobService": the properties of their default blob
+# service (delete retention, versioning, ...), which the account resource
+# itself does not include.
+BLOB_SERVICE_API_VERSION = "2023-01-01"
+
+# Web apps ("sites") carry the details the section 9 checks read, each from
+# one call per site: "config" (config/web properties), "authSettings"
+# (classic authentication settings) and "publishingCredentials" ({"ftp": ...,
+# "scm": ...} basic publishing credentials policy properties).
+WEB_APP_DETAILS = ("config", "authSettings", "publishingCredentials")
+
+_snapshot = None
+_live_vms = {}
+_live_vms_lock = threading.Lock()
+_live_servers = {}
+_live_servers_lock = threading.Lock()
+_live_collections = {}
+_live_collections_lock = threading.Lock()
+
+
+def _az_json(command):
+    """Runs an az command and returns its parsed JSON output, or None on failure."""
+    try:
+        process = armclient.run(command, shell=True, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return json.loads(process.stdout) if process.stdout.strip() else None
+    except (subprocess.CalledProcessError, json.JSONDecodeError):
+        return None
+
+
+def _list_collection(subscription_id, provider, api_version):
+    """Lists every resource of one type in a subscription, following nextLink pages."""
+    url = f"{RESOURCE}/subscriptions/{subscription_id}/providers/{provider}?api-version={api_version}"
+    items = armclient.get_all(url)
+    if items is None:
+        return None
+    for item in items:
+        item.setdefault("subscriptionId", subscription_id)
+        item.setdefault("resourceGroup", resource_group_from_id(item.get("id", "")))
+    return items
+
+
+def resource_group_from_id(resource_id):
+    """Extracts the resource group name from an ARM resource ID."""
+    parts = resource_id.split("/")
+    for index, part in enumerate(parts[:-1]):
+        if part.lower() == "resourcegroups":
+            return parts[index + 1]
+    return None
+
+
+def list_subscriptions():
+    """Lists all subscriptions, normalised so both `az account list` and ARM field names work."""
+    accounts = _az_json("az account list --all -o json") or []
+    subscriptions = []
+    for account in accounts:
+        subscriptions.append({
+            "id": account.get("id"),
+            "subscriptionId": account.get("id"),
+            "name": account.get("name"),
+            "displayName": account.get("name"),
+            "state": account.get("state"),
+            "tenantId": account.get("tenantId"),
+        })
+    return subscriptions
+
+
+def _collect_from_arm(collections, subscription_ids, max_workers):
+    """Lists each collection per subscription through ARM, concurrently."""
+    jobs = [(name, subscription_id) for name in collections for subscription_id in subscription_ids]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        listings = list(executor.map(lambda job: _list_collection(job[1], *COLLECTIONS[job[0]]), jobs))
+
+    resources = {name: {} for name in collections}
+    for (name, subscription_id), items in zip(jobs, listings):
+        resources[name][subscription_id] = items
+    return resources
+
+
+def _extension_summary(extension):
+    properties = extension.get("properties") or {}
+    return {
+        "id": extension.get("id"),
+        "name": extension.get("name"),
+        "publisher": properties.get("publisher"),
+        "type": properties.get("type"),
+        "provisioningState": properties.get("provisioningState"),
+    }
+
+
+def _attach_vm_details_from_arm(vms, subscription_id, max_workers=8):
+    """Adds extensions and instance view to one subscription's VMs.
+
+    Instance views come from one paged statusOnly listing; extensions are
+    listed per VM over the shared HTTP session, concurrently.
+    """
+    provider, api_version = COLLECTIONS["virtualMachines"]
+    statuses = armclient.get_all(
+        f"{RESOURCE}/subscriptions/{subscription_id}/providers/{provider}?api-version={api_version}&statusOnly=true"
+    ) or []
+    instance_views = {(status.get("id") or "").lower(): (status.get("properties") or {}).get("instanceView") for status in statuses}
+
+    def list_extensions(vm):
+        extensions = armclient.get_all(f"{RESOURCE}{vm['id']}/extensions?api-version={api_version}")
+        return None if extensions is None else [_extension_summary(extension) for extension in extensions]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        extensions = list(executor.map(list_extensions, vms))
+    for vm, vm_extensions in zip(vms, extensions):
+        vm["extensions"] = vm_extensions
+        vm["instanceView"] = instance_views.get((vm.get("id") or "").lower())
+
+
+def _attach_vm_details_from_resource_graph(vms_by_subscription, subscription_ids):
+    """Adds extensions and instance view to every VM with one paged Resource Graph query."""
+    rows = resourcegraph.query(
+        f"resources | where type =~ '{VM_EXTENSION_TYPE}' | project id, name, properties | order by id asc",
+        subscription_ids
+    )
+    by_vm = {}
+    for row in rows:
+        vm_id = (row.get("id") or "").rsplit("/extensions/", 1)[0].lower()
+        by_vm.setdefault(vm_id, []).append(_extension_summary(row))
+    for vms in vms_by_subscription.values():
+        for vm in vms or []:
+            vm["extensions"] = by_vm.get((vm.get("id") or "").lower(), [])
+            vm["instanceView"] = ((vm.get("properties") or {}).get("extended") or {}).get("instanceView")
+
+
+def _attach_vm_details(vms_by_subscription, backend, max_workers):
+    if backend == "resourcegraph":
+        try:
+            _attach_vm_details_from_resource_graph(vms_by_subscription, list(vms_by_subscription))
+            return
+        except resourcegraph.ResourceGraphError as e:
+            print(f"{Fore.YELLOW}Resource Graph query for VM extensions failed, listing them through ARM: {e}{Style.RESET_ALL}")
+    for subscription_id, vms in vms_by_subscription.items():
+        if vms:
+            _attach_vm_details_from_arm(vms, subscription_id, max_workers)
+
+
+def _attach_server_configurations(servers, collection, max_workers=8):
+    """Adds each flexible server's parameters, listing the configurations of several servers at once.
+
+    A server whose configurations cannot be listed gets None, so the checks
+    fall back to asking for its parameters one by one.
+    """
+    api_version = COLLECTIONS[collection][1]
+
+    def list_configurations(server):
+        items = armclient.get_all(f"{RESOURCE}{server['id']}/configurations?api-version={api_version}")
+        if items is None:
+            return None
+        return {item.get("name"): (item.get("properties") or {}).get("value") for item in items}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        configurations = list(executor.map(list_configurations, servers))
+    for server, server_configurations in zip(servers, configurations):
+        server["configurations"] = server_configurations
+
+
+def _get_blob_service(account):
+    data = armclient.get(f"{RESOURCE}{account['id']}/blobServices/default?api-version={BLOB_SERVICE_API_VERSION}")
+    return None if data is None else data.get("properties", {})
+
+
+def _attach_blob_services(accounts, max_workers=8):
+    """Adds each storage account's default blob service properties, None where they cannot be read."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        blob_services = list(executor.map(_get_blob_service, accounts))
+    for account, blob_service in zip(accounts, blob_services):
+        account["blobService"] = blob_service
+
+
+def _get_web_app_detail(site, detail):
+    api_version = COLLECTIONS["sites"][1]
+    if detail == "config":
+        data = armclient.get(f"{RESOURCE}{site['id']}/config/web?api-version={api_version}")
+        return None if data is None else data.get("properties", {})
+    if detail == "authSettings":
+        data = armclient.post(f"{RESOURCE}{site['id']}/config/authsettings/list?api-version={api_version}", None)
+        return None if data is None else data.get("properties", {})
+    policies = armclient.get_all(f"{RESOURCE}{site['id']}/basicPublishingCredentialsPolicies?api-version={api_version}")
+    return None if policies is None else {policy.get("name"): policy.get("properties", {}) for policy in policies}
+
+
+def _attach_web_app_details(sites, details=WEB_APP_DETAILS, max_workers=8):
+    """Adds the given details to every site, reading them all concurrently; None where one cannot be read."""
+    calls = [(site, detail) for site in sites for detail in details]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        values = list(executor.map(lambda call: _get_web_app_detail(*call), calls))
+    for (site, detail), value in zip(calls, values):
+        site[detail] = value
+
+
+def _collect_from_resource_graph(collections, subscription_ids):
+    """Answers every collection for every subscription with a few paged Resource Graph queries."""
+    by_type = {COLLECTIONS[name][0].lower(): name for name in collections}
+    rows = resourcegraph.list_resources(subscription_ids, list(by_type))
+
+    resources = {name: {subscription_id: [] for subscription_id in subscription_ids} for name in collections}
+    for row in rows:
+        name = by_type.get((row.get("type") or "").lower())
+        subscription_id = row.get("subscriptionId")
+        if name and subscription_id in resources[name]:
+            resources[name][subscription_id].append(row)
+    return resources
+
+
+def collect(file_name=DEFAULT_INVENTORY_FILE, collections=None, max_workers=8, backend="arm"):
+    """Collects subscriptions and resource collections once and writes the snapshot to disk.
+
+    backend is "arm" for per-subscription list calls or "resourcegraph" for
+    bulk Resource Graph queries; the snapshot has the same shape either way.
+    """
+    collections = collections or list(COLLECTIONS)
+    subscriptions = list_subscriptions()
+    enabled = [s["subscriptionId"] for s in subscriptions if s.get("state") in (None, "Enabled")]
+
+    if backend == "resourcegraph":
+        try:
+            resources = _collect_from_resource_graph(collections, enabled)
+        except resourcegraph.ResourceGraphError as e:
+            print(f"{Fore.YELLOW}Resource Graph query failed, falling back to ARM listing: {e}{Style.RESET_ALL}")
+            resources = _collect_from_arm(collections, enabled, max_workers)
+    else:
+        resources = _collect_from_arm(collections, enabled, max_workers)
+
+    if "virtualMachines" in resources:
+        _attach_vm_details(resources["virtualMachines"], backend, max_workers)
+    if "sites" in resources:
+        sites = [site for by_sub in resources["sites"].values() for site in by_sub or []]
+        _attach_web_app_details(sites, max_workers=max_workers)
+    if "storageAccounts" in resources:
+        accounts = [account for by_sub in resources["storageAccounts"].values() for account in by_sub or []]
+        _attach_blob_services(accounts, max_workers)
+    for collection in FLEXIBLE_SERVER_COLLECTIONS:
+        if collection in resources:
+            servers = [server for by_sub in resources[collection].values() for server in by_sub or []]
+            _attach_server_configurations(servers, collection, max_workers)
+
+    snapshot = {
+        "collectedAt": datetime.now().isoformat(),
+        "backend": backend,
+        "subscriptions": subscriptions,
+        "resources": resources,
+    }
+    with open(file_name, "w") as f:
+        json.dump(snapshot, f)
+
+    total = sum(len(items or []) for by_sub in resources.values() for items in by_sub.values())
+    print(f"{Fore.GREEN}Inventory collected: {len(subscriptions)} subscriptions, {total} resources.{Style.RESET_ALL}")
+    return snapshot
+
+
+def load():
+    """Returns the snapshot named by AZUREFY_INVENTORY, or None when no snapshot is available."""
+    global _snapshot
+    if _snapshot is None:
+        file_name = os.environ.get(INVENTORY_ENV)
+        if not file_name or not os.path.isfile(file_name):
+            return None
+        try:
+            with open(file_name) as f:
+                _snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+    return _snapshot
+
+
+def get_subscriptions(include_disabled=True):
+    """Returns subscriptions from the snapshot, or None so the caller falls back to a live query."""
+    snapshot = load()
+    if snapshot is None:
+        return None
+    subscriptions = snapshot.get("subscriptions", [])
+    if not include_disabled:
+        subscriptions = [s for s in subscriptions if s.get("state") in (None, "Enabled")]
+    return subscriptions
+
+
+def get_resources(collection, subscription_id):
+    """Returns one collection for a subscription, or None when it was not captured."""
+    snapshot = load()
+    if snapshot is None:
+        return None
+    return snapshot.get("resources", {}).get(collection, {}).get(subscription_id)
+
+
+def find_resource(collection, subscription_id, resource_group, name):
+    """Looks up a single resource in the snapshot by resource group and name."""
+    for item in get_resources(collection, subscription_id) or []:
+        if item.get("name") == name and (item.get("resourceGroup") or "").lower() == (resource_group or "").lower():
+            return item
+    return None
+
+
+def get_collection(collection, subscription_id):
+    """Returns one collection for a subscription from the snapshot, or lists it live once per process; None when it cannot be listed."""
+    resources = get_resources(collection, subscription_id)
+    if resources is not None:
+        return resources
+    key = (collection, subscription_id)
+    with _live_collections_lock:
+        if key in _live_collections:
+            return _live_collections[key]
+    resources = _list_collection(subscription_id, *COLLECTIONS[collection])
+    with _live_collections_lock:
+        return _live_collections.setdefault(key, resources)
+
+
+def get_virtual_machines(subscription_id):
+    """Returns a subscription's VMs with extensions and instance view, or None when they cannot be listed.
+
+    The snapshot answers when it holds the details; otherwise the VMs are
+    listed live, once per process.
+    """
+    vms = get_resources("virtualMachines", subscription_id)
+    if vms is not None and all("extensions" in vm for vm in vms):
+        return vms
+    with _live_vms_lock:
+        if subscription_id in _live_vms:
+            return _live_vms[subscription_id]
+    vms = _list_collection(subscription_id, *COLLECTIONS["virtualMachines"])
+    if vms is not None:
+        _attach_vm_details_from_arm(vms, subscription_id)
+    with _live_vms_lock:
+        _live_vms[subscription_id] = vms
+    return vms
+
+
+
+def get_flexible_servers(collection, subscription_id):
+    """Returns a subscription's PostgreSQL or MySQL flexible servers with their configurations, or None when they cannot be listed.
+
+    collection is "postgresFlexibleServers" or "mysqlFlexibleServers". The
+    snapshot answers when it holds the configurations; otherwise the servers
+    are listed live, once per process.
+    """
+    servers = get_resources(collection, subscription_id)
+    if servers is not None and all("configurations" in server for server in servers):
+        return servers
+    key = (collection, subscription_id)
+    with _live_servers_lock:
+        if key in _live_servers:
+            return _live_servers[key]
+    servers = _list_collection(subscription_id, *COLLECTIONS[collection])
+    if servers is not None:
+        _attach_server_configurations(servers, collection)
+    with _live_servers_lock:
+        _live_servers[key] = servers
+    return servers
+
+
+def read_blob_service(account):
+    """Reads a storage account's default blob service into "blobService" unless the snapshot already holds it (None when it cannot be read)."""
+    if "blobService" not in account:
+        account["blobService"] = _get_blob_service(account)
+    return account
+
+
+def read_web_app_details(site, details=WEB_APP_DETAILS):
+    """Reads the requested details (see WEB_APP_DETAILS) a site lacks into it, None where one cannot be read."""
+    for detail in details:
+        if detail not in site:
+            site[detail] = _get_web_app_detail(site, detail)
+    return site
@@ -0,0 +1,294 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, Style
+import armclient
+import inventory
+import nsgrules
+import records
+
+# Effective internet exposure for the section 7 checks. A subscription's NSGs,
+# network interfaces, virtual networks (for their subnets) and public IP
+# addresses are loaded once per process, from the inventory snapshot when
+# there is one, and joined into maps keyed by lower-cased resource ID.
+#
+# A public IP attached to a NIC IP configuration is an endpoint. Internet
+# traffic reaches it on a port when the subnet's NSG and then the NIC's NSG
+# both decide Allow for it: in each, the highest-priority internet-facing
+# inbound rule that matches the port and the configuration's private address
+# decides (see nsgrules.RuleIndex.effective_rules). A level without an NSG
+# lets everything through, but a Standard SKU public IP with no NSG at all
+# stays closed. Public IPs on load balancers, gateways and other resources
+# are listed but not evaluated.
+
+RESOURCE = "https://management.azure.com"
+API_VERSION_SUBSCRIPTIONS = "2020-01-01"
+MAX_WORKERS = 8
+NETWORK_COLLECTIONS = ("networkSecurityGroups", "networkInterfaces", "virtualNetworks", "publicIPAddresses")
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def _key(resource_id):
+    return (resource_id or "").lower()
+
+
+def _properties(resource):
+    return resource.get("properties") or {}
+
+
+def _reference(resource, field):
+    return _key((_properties(resource).get(field) or {}).get("id"))
+
+
+def _ports_by_protocol(policies=nsgrules.POLICIES):
+    ports = {}
+    for policy in policies.values():
+        ports.setdefault(policy["protocol"], set()).update(policy["ports"])
+    return ports
+
+
+class NetworkGraph:
+    """One subscription's NSGs, NICs, subnets and public IPs, and the endpoints they expose."""
+
+    def __init__(self, nsgs, nics, vnets, public_ips):
+        self.nsgs = {_key(nsg.get("id")): nsg for nsg in nsgs}
+        self.nics = {_key(nic.get("id")): nic for nic in nics}
+        self.subnets = {_key(subnet.get("id")): subnet for vnet in vnets for subnet in _properties(vnet).get("subnets") or []}
+        self.public_ips = {_key(public_ip.get("id")): public_ip for public_ip in public_ips}
+        self.ip_configurations = {
+            _key(ip_configuration.get("id")): (nic, ip_configuration)
+            for nic in nics for ip_configuration in _properties(nic).get("ipConfigurations") or []
+        }
+
+        self.attachments = {key: set() for key in self.nsgs}
+        for key, nsg in self.nsgs.items():
+            for field in ("subnets", "networkInterfaces"):
+                self.attachments[key].update(_key(item.get("id")) for item in _properties(nsg).get(field) or [])
+        for key, resource in list(self.subnets.items()) + list(self.nics.items()):
+            nsg_key = _reference(resource, "networkSecurityGroup")
+            if nsg_key:
+                self.attachments.setdefault(nsg_key, set()).add(key)
+
+        self.findings = {key: nsgrules.analyze(nsg) for key, nsg in self.nsgs.items()}
+        ip_configuration_of = {
+            _reference(ip_configuration, "publicIPAddress"): key
+            for key, (_, ip_configuration) in self.ip_configurations.items()
+            if _reference(ip_configuration, "publicIPAddress")
+        }
+        self.endpoints = [self._endpoint(public_ip, ip_configuration_of.get(key)) for key, public_ip in self.public_ips.items()]
+
+    def is_attached(self, nsg):
+        return bool(self.attachments.get(_key(nsg.get("id"))))
+
+    def _endpoint(self, public_ip, ip_configuration_key):
+        """Returns {publicIp, address, attachedTo, networkInterface, nsgs, exposedPorts} for one public IP.
+
+        exposedPorts is {port: [deciding Allow rule per NSG]}, or None when the
+        IP is unattached or not attached to a NIC.
+        """
+        attached_to = (_properties(public_ip).get("ipConfiguration") or {}).get("id")
+        endpoint = {
+            "publicIp": public_ip, "address": _properties(public_ip).get("ipAddress"),
+            "attachedTo": attached_to, "networkInterface": None, "nsgs": [], "exposedPorts": None,
+        }
+        key = _key(attached_to) or ip_configuration_key
+        if key not in self.ip_configurations:
+            return endpoint
+        nic, ip_configuration = self.ip_configurations[key]
+        subnet = self.subnets.get(_reference(ip_configuration, "subnet")) or {}
+        nsg_keys = [_reference(subnet, "networkSecurityGroup"), _reference(nic, "networkSecurityGroup")]
+        nsgs = [self.nsgs[nsg_key] for nsg_key in nsg_keys if nsg_key in self.nsgs]
+        endpoint.update(attachedTo=attached_to or ip_configuration.get("id"), networkInterface=nic, nsgs=nsgs,
+                        exposedPorts=self._exposure(public_ip, ip_configuration, nsgs))
+        return endpoint
+
+    def _exposure(self, public_ip, ip_configuration, nsgs):
+        address = _properties(ip_configuration).get("privateIPAddress")
+        groups = [group.get("id") or "" for group in _properties(ip_configuration).get("applicationSecurityGroups") or []]
+        open_without_nsg = ((public_ip.get("sku") or {}).get("name") or "Basic").lower() == "basic"
+        exposed = {}
+        for protocol, ports in _ports_by_protocol().items():
+            if not nsgs:
+                if open_without_nsg:
+                    exposed.update((port, []) for port in ports)
+                continue
+            decisions = [nsgrules.index(nsg).effective_rules(ports, protocol, address, groups) for nsg in nsgs]
+            for port in ports:
+                rules = [decision[port] for decision in decisions]
+                if all(rule is not None and rule["access"] == "allow" for rule in rules):
+                    exposed[port] = rules
+        return dict(sorted(exposed.items()))
+
+
+def get(subscription_id):
+    """Returns a subscription's NetworkGraph, built once per process; None when its network resources cannot be listed."""
+    with _graphs_lock:
+        if subscription_id in _graphs:
+            return _graphs[subscription_id]
+    listings = [inventory.get_collection(collection, subscription_id) for collection in NETWORK_COLLECTIONS]
+    graph = None if any(listing is None for listing in listings) else NetworkGraph(*listings)
+    with _graphs_lock:
+        return _graphs.setdefault(subscription_id, graph)
+
+
+def clear_cache():
+    """Forgets every NetworkGraph built so far."""
+    with _graphs_lock:
+        _graphs.clear()
+
+
+def get_subscriptions():
+    """Returns the enabled subscriptions, from the snapshot when there is one."""
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
+    subscriptions = armclient.get_all(f"{RESOURCE}/subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}")
+    if subscriptions is None:
+        return []
+    return [subscription for subscription in subscriptions if subscription.get("state") in (None, "Enabled")]
+
+
+def evaluate():
+    """Yields (subscription, NetworkGraph or None) for every enabled subscription, in order.
+
+    The graphs are built concurrently ahead of the caller, so each
+    subscription can be reported as soon as its graph is ready, and kept for
+    the process, so every section 7 check in it reuses them.
+    """
+    subscriptions = get_subscriptions()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        yield from zip(subscriptions, executor.map(lambda subscription: get(subscription["subscriptionId"]), subscriptions))
+
+
+def _ports_text(ports):
+    return ", ".join(str(port) for port in ports)
+
+
+def _attached_resource(resource_id):
+    """Returns the resource part of a child ID such as a NIC's ipConfigurations/<name>."""
+    return "/".join((resource_id or "").split("/")[:9])
+
+
+def _describe_path(endpoint):
+    via = ", ".join(nsg.get("name") for nsg in endpoint["nsgs"]) or "no NSG"
+    return f"network interface {endpoint['networkInterface'].get('name')}, guarded by {via}"
+
+
+def _describe_endpoint(endpoint):
+    return f"{endpoint['publicIp'].get('name')} ({endpoint['address'] or 'Unknown IP'}) on {_describe_path(endpoint)}"
+
+
+def _no_subscriptions():
+    print(f"{Fore.RED}No subscriptions found or failed to retrieve subscriptions.{Style.RESET_ALL}")
+    print("Final Status: FAIL")
+    records.verdict("FAIL", reason="no subscriptions")
+
+
+def report(control):
+    """Prints and records one NSG policy (7.1, 7.2 or 7.4) for every NSG and exposed endpoint, then its final status.
+
+    An NSG fails when a rule that is not overridden opens the policy's ports
+    to the internet and the NSG is attached to a subnet or NIC; an endpoint
+    fails when internet traffic actually reaches it on one of those ports.
+    """
+    policy = nsgrules.POLICIES[control]
+    all_passed = True
+    subscriptions_found = False
+    for subscription, graph in evaluate():
+        subscriptions_found = True
+        subscription_name = subscription["displayName"]
+        print(f"\n{Fore.YELLOW}Checking NSGs for subscription: {subscription_name}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
+        print()
+
+        if graph is None:
+            print(f"{Fore.RED}Failed to retrieve network resources for subscription {subscription_name}.{Style.RESET_ALL}")
+            continue
+        if not graph.nsgs:
+            print(f"{Fore.YELLOW}No network security groups found in subscription {subscription_name}.{Style.RESET_ALL}")
+
+        for key, nsg in graph.nsgs.items():
+            nsg_name = nsg.get("name")
+            exposing = graph.findings[key][control]
+            attached = graph.is_attached(nsg)
+            open_ports = sorted({port for _, ports in exposing for port in ports})
+            records.resource(nsg.get("id", nsg_name), "FAIL" if exposing and attached else "PASS",
+                             openPorts=open_ports, rules=[rule["name"] for rule, _ in exposing], attached=attached)
+            if not exposing:
+                continue
+            if not attached:
+                print(f"{Fore.YELLOW}NSG {nsg_name} allows {policy['label']} on port(s) {_ports_text(open_ports)} from the internet "
+                      f"but is not attached to any subnet or network interface.{Style.RESET_ALL}")
+                continue
+            all_passed = False
+            for rule, ports in exposing:
+                print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
+                print()
+                print(f"{Fore.RED}Non-compliant security rule found in NSG: {nsg_name} - {rule['name']} allows {policy['label']} on port(s) {_ports_text(ports)} from the internet{Style.RESET_ALL}")
+                print(nsgrules.highlight(rule["rule"], ports))
+
+        for endpoint in graph.endpoints:
+            ports = [port for port in endpoint["exposedPorts"] or {} if port in policy["ports"]]
+            if not ports:
+                continue
+            all_passed = False
+            print(f"{Fore.RED}Internet-reachable endpoint {_describe_endpoint(endpoint)} exposes {policy['label']} on port(s) {_ports_text(ports)}{Style.RESET_ALL}")
+            records.resource(endpoint["publicIp"].get("id"), "FAIL", exposedPorts=ports,
+                             networkInterface=endpoint["networkInterface"].get("id"))
+
+    if not subscriptions_found:
+        _no_subscriptions()
+        return
+
+    print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN if all_passed else Fore.RED}{'PASS' if all_passed else 'FAIL'}{Style.RESET_ALL}")
+    records.verdict("PASS" if all_passed else "FAIL")
+
+
+def report_public_ips():
+    """Prints and records every public IP with what it is attached to and the sensitive ports it exposes (7.7).
+
+    A public IP fails when it exposes a section 7 port to the internet. One
+    that is attached but exposes none, or sits on a resource other than a NIC,
+    is left for manual review; an unattached one passes.
+    """
+    statuses = set()
+    subscriptions_found = False
+    for subscription, graph in evaluate():
+        subscriptions_found = True
+        subscription_name = subscription["displayName"]
+        print(f"\n{Fore.YELLOW}Checking public IPs for subscription: {subscription_name}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
+        print()
+
+        if graph is None:
+            print(f"{Fore.RED}Failed to retrieve network resources for subscription {subscription_name}.{Style.RESET_ALL}")
+            continue
+        if not graph.endpoints:
+            print(f"{Fore.GREEN}No public IPs exist in subscription {subscription_name}.{Style.RESET_ALL}")
+            continue
+
+        for endpoint in graph.endpoints:
+            public_ip = endpoint["publicIp"]
+            exposed_ports = sorted(endpoint["exposedPorts"] or {})
+            if not endpoint["attachedTo"]:
+                status, color, text = "PASS", Fore.GREEN, "Not attached"
+            elif endpoint["exposedPorts"] is None:
+                status, color, text = "MANUAL", Fore.YELLOW, f"Attached to {_attached_resource(endpoint['attachedTo'])}, review its exposure"
+            elif exposed_ports:
+                status, color, text = "FAIL", Fore.RED, f"Exposes port(s) {_ports_text(exposed_ports)} to the internet on {_describe_path(endpoint)}"
+            else:
+                status, color, text = "MANUAL", Fore.YELLOW, f"No sensitive port reachable on {_describe_path(endpoint)}"
+            statuses.add(status)
+            print(f"{color}IP Address: {endpoint['address'] or 'Unknown IP'}, Name: {public_ip.get('name', 'Unnamed')} - {text}{Style.RESET_ALL}")
+            records.resource(public_ip.get("id"), status, address=endpoint["address"],
+                             attachedTo=endpoint["attachedTo"], exposedPorts=exposed_ports)
+
+    if not subscriptions_found:
+        _no_subscriptions()
+        return
+
+    final_status = "FAIL" if "FAIL" in statuses else "MANUAL" if "MANUAL" in statuses else "PASS"
+    color = {"PASS": Fore.GREEN, "MANUAL": Fore.YELLOW}.get(final_status, Fore.RED)
+    print(f"\n{Fore.CYAN}Final Status: {color}{final_status}{Style.RESET_ALL}")
+    records.verdict(final_status)
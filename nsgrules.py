@@ -0,0 +1,237 @@
+import heapq
+import json
+import ipaddress
+import threading
+from colorama import Fore, Style
+
+# Section 7 NSG rule analysis. Each NSG's rules are parsed once into port
+# intervals: destinationPortRange and destinationPortRanges ("*", "22",
+# "1000-2000") become (low, high) pairs, and sourceAddressPrefix and
+# sourceAddressPrefixes decide whether a rule admits the internet. The
+# internet-facing inbound rules, Allow and Deny, are then indexed per
+# protocol, sorted by interval start, and every policy port is answered in
+# one sweep over the sorted ports with a heap of the intervals still open, so
+# the cost is O((rules + ports) log rules) however many policies are asked.
+# The rules covering a port come back in priority order, so an Allow that a
+# higher-priority Deny overrides is not reported.
+#
+# Rules are read in both shapes: ARM ({"name", "properties": {...}}) and the
+# flattened az CLI one. networkgraph.py applies the analysis to the NSGs that
+# actually guard internet-reachable endpoints.
+
+MIN_PORT = 0
+MAX_PORT = 65535
+LOWEST_PRIORITY = 65536
+INDEXED_PROTOCOLS = ("tcp", "udp")
+INTERNET_PREFIXES = ("*", "internet", "any", "0.0.0.0", "0.0.0.0/0", "::/0")
+ANY_DESTINATION = ("*", "any")
+
+POLICIES = {
+    "7.1": {"label": "RDP", "ports": (3389,), "protocol": "tcp"},
+    "7.2": {"label": "SSH", "ports": (22,), "protocol": "tcp"},
+    "7.4": {"label": "HTTP(S)", "ports": (80, 443), "protocol": "tcp"},
+}
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _properties(item):
+    return item.get("properties") or item
+
+
+def _values(properties, single, plural):
+    values = [properties.get(single)] + list(properties.get(plural) or [])
+    return [str(value).strip() for value in values if value not in (None, "")]
+
+
+def parse_port_ranges(rule):
+    """Returns the rule's destination ports as sorted (low, high) intervals; unreadable entries are skipped."""
+    intervals = []
+    for value in _values(_properties(rule), "destinationPortRange", "destinationPortRanges"):
+        if value == "*":
+            intervals.append((MIN_PORT, MAX_PORT))
+            continue
+        low, _, high = value.partition("-")
+        try:
+            low, high = int(low), int(high or low)
+        except ValueError:
+            continue
+        if MIN_PORT <= low <= high <= MAX_PORT:
+            intervals.append((low, high))
+    return sorted(intervals)
+
+
+def internet_prefixes(rule):
+    """Returns the rule's source prefixes that stand for the whole internet."""
+    return [
+        prefix for prefix in _values(_properties(rule), "sourceAddressPrefix", "sourceAddressPrefixes")
+        if prefix.lower() in INTERNET_PREFIXES or prefix.endswith("/0")
+    ]
+
+
+def parse_rule(rule):
+    """Returns the fields the analysis reads from one security rule."""
+    properties = _properties(rule)
+    try:
+        priority = int(properties.get("priority"))
+    except (TypeError, ValueError):
+        priority = LOWEST_PRIORITY
+    return {
+        "name": rule.get("name"),
+        "priority": priority,
+        "access": (properties.get("access") or "").lower(),
+        "direction": (properties.get("direction") or "").lower(),
+        "protocol": (properties.get("protocol") or "").lower(),
+        "ports": parse_port_ranges(rule),
+        "internetPrefixes": internet_prefixes(rule),
+        "destinations": [prefix.lower() for prefix in _values(properties, "destinationAddressPrefix", "destinationAddressPrefixes")],
+        "destinationGroups": {(group.get("id") or "").lower() for group in properties.get("destinationApplicationSecurityGroups") or []},
+        "rule": rule,
+    }
+
+
+def security_rules(nsg):
+    """Returns an NSG's custom and default security rules."""
+    properties = _properties(nsg)
+    return list(properties.get("securityRules") or []) + list(properties.get("defaultSecurityRules") or [])
+
+
+def applies_to_any_destination(rule):
+    """Whether the rule matches inbound traffic to every address the NSG guards."""
+    if rule["destinationGroups"]:
+        return False
+    return not rule["destinations"] or any(prefix in ANY_DESTINATION for prefix in rule["destinations"])
+
+
+def applies_to(rule, address, security_groups=()):
+    """Whether the rule matches inbound traffic to a private address in the given application security groups.
+
+    Service tags other than Internet are taken to match, so an unknown
+    destination never hides an exposure.
+    """
+    if rule["destinationGroups"]:
+        return bool(rule["destinationGroups"] & {group.lower() for group in security_groups})
+    if not rule["destinations"] or not address:
+        return True
+    for prefix in rule["destinations"]:
+        if prefix in ANY_DESTINATION or prefix == "virtualnetwork":
+            return True
+        try:
+            if ipaddress.ip_address(address) in ipaddress.ip_network(prefix, strict=False):
+                return True
+        except ValueError:
+            if prefix != "internet":
+                return True
+    return False
+
+
+class RuleIndex:
+    """An NSG's rules in priority order, with the internet-facing inbound intervals indexed per protocol."""
+
+    def __init__(self, nsg):
+        self.rules = sorted((parse_rule(rule) for rule in security_rules(nsg)), key=lambda rule: rule["priority"])
+        self.intervals = {protocol: [] for protocol in INDEXED_PROTOCOLS}
+        for position, rule in enumerate(self.rules):
+            if rule["direction"] != "inbound" or not rule["internetPrefixes"]:
+                continue
+            protocols = INDEXED_PROTOCOLS if rule["protocol"] in ("*", "any") else (rule["protocol"],)
+            for protocol in protocols:
+                if protocol in self.intervals:
+                    self.intervals[protocol].extend((low, high, position) for low, high in rule["ports"])
+        for intervals in self.intervals.values():
+            intervals.sort()
+
+    def covering_rules(self, ports, protocol="tcp"):
+        """Returns {port: [rule, ...]}: the internet-facing inbound rules that match each port, in priority order."""
+        intervals = self.intervals.get(protocol, [])
+        covering = {}
+        active = []
+        next_interval = 0
+        for port in sorted(set(ports)):
+            while next_interval < len(intervals) and intervals[next_interval][0] <= port:
+                low, high, position = intervals[next_interval]
+                heapq.heappush(active, (high, position))
+                next_interval += 1
+            while active and active[0][0] < port:
+                heapq.heappop(active)
+            covering[port] = [self.rules[position] for position in sorted({position for _, position in active})]
+        return covering
+
+    def exposing_rules(self, ports, protocol="tcp"):
+        """Returns {port: [rule, ...]}: the Allow rules that open each port to the internet, in priority order.
+
+        Allow rules below a Deny that matches every destination are overridden and left out.
+        """
+        exposing = {}
+        for port, rules in self.covering_rules(ports, protocol).items():
+            exposing[port] = []
+            for rule in rules:
+                if rule["access"] == "allow":
+                    exposing[port].append(rule)
+                elif applies_to_any_destination(rule):
+                    break
+        return exposing
+
+    def effective_rules(self, ports, protocol="tcp", address=None, security_groups=()):
+        """Returns {port: rule or None}: the rule that decides internet traffic to the address on each port.
+
+        None means no rule matches and the implicit DenyAllInBound applies.
+        """
+        return {
+            port: next((rule for rule in rules if applies_to(rule, address, security_groups)), None)
+            for port, rules in self.covering_rules(ports, protocol).items()
+        }
+
+
+def index(nsg):
+    """Returns the RuleIndex of an NSG, built once per process per NSG ID."""
+    key = nsg.get("id") or id(nsg)
+    with _indexes_lock:
+        rule_index = _indexes.get(key)
+    if rule_index is None:
+        rule_index = RuleIndex(nsg)
+        with _indexes_lock:
+            rule_index = _indexes.setdefault(key, rule_index)
+    return rule_index
+
+
+def clear_cache():
+    """Forgets every RuleIndex built so far."""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def analyze(nsg, policies=POLICIES):
+    """Evaluates every policy against one NSG with one sweep per protocol.
+
+    Returns {control: [(rule, [ports])]}, the rules that open a policy's
+    ports to the internet and are not overridden, in priority order.
+    """
+    rule_index = index(nsg)
+    ports_by_protocol = {}
+    for policy in policies.values():
+        ports_by_protocol.setdefault(policy["protocol"], set()).update(policy["ports"])
+    covering = {protocol: rule_index.exposing_rules(ports, protocol) for protocol, ports in ports_by_protocol.items()}
+
+    findings = {}
+    for control, policy in policies.items():
+        opened = {}
+        for port in policy["ports"]:
+            for rule in covering[policy["protocol"]][port]:
+                opened.setdefault(id(rule), (rule, []))[1].append(port)
+        findings[control] = sorted(opened.values(), key=lambda finding: finding[0]["priority"])
+    return findings
+
+
+def highlight(rule, ports):
+    """Returns the rule as JSON with the parts that open it to the internet in red."""
+    properties = _properties(rule)
+    tokens = {"Allow", "Inbound", properties.get("protocol") or ""} | {str(port) for port in ports} | set(internet_prefixes(rule))
+    for value in _values(properties, "destinationPortRange", "destinationPortRanges"):
+        if any(low <= port <= high for low, high in parse_port_ranges({"destinationPortRange": value}) for port in ports):
+            tokens.add(value)
+    rule_str = json.dumps(rule, indent=4)
+    for token in sorted(token for token in tokens if token):
+        rule_str = rule_str.replace(f'"{token}"', f'{Fore.RED}"{token}"{Style.RESET_ALL}')
+    return rule_str
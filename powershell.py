@@ -0,0 +1,189 @@
+import os
+import json
+import socket
+import itertools
+import threading
+import subprocess
+from concurrent.futures import Future, TimeoutError
+from colorama import Fore, Style
+
+# One long-lived `pwsh` serves every Entra check. Requests are written to its
+# stdin one per line and each response ends with a sentinel line carrying the
+# request id, so several requests can be in flight at once and are answered in
+# order. Azurefy.py also exposes the worker on a Unix socket so check scripts
+# running as separate processes share the same authenticated session.
+
+PWSH_COMMAND = ["pwsh", "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-"]
+SOCKET_ENV = "AZUREFY_PWSH_SOCKET"
+SENTINEL_PREFIX = "<<<AZUREFY-END "
+SENTINEL_SUFFIX = ">>>"
+DEFAULT_TIMEOUT_SECONDS = 60
+
+
+class PowerShellError(Exception):
+    """Raised when the PowerShell worker cannot answer a request."""
+
+
+def frame_request(request_id, commands):
+    """Builds the single PowerShell line that runs `commands` and prints a sentinel after their output.
+
+    Every command but the last runs silently, as it did when typed into the
+    shared session; only the last command's output is returned.
+    """
+    setup = "".join(f"{command} | Out-Null; " for command in commands[:-1])
+    body = f"& {{ {setup}{commands[-1]} }} 2>&1 | Out-String -Width 4096"
+    return f"{body}; Write-Output '{SENTINEL_PREFIX}{request_id}{SENTINEL_SUFFIX}'\n"
+
+
+class PowerShellWorker:
+    """A persistent PowerShell process driven over stdin/stdout pipes."""
+
+    def __init__(self, command=None):
+        self.process = subprocess.Popen(
+            command or PWSH_COMMAND,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,
+            text=True,
+            bufsize=1,
+        )
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.write_lock = threading.Lock()
+        self.reader = threading.Thread(target=self._read_responses, name="pwsh-reader", daemon=True)
+        self.reader.start()
+
+    def _read_responses(self):
+        """Collects stdout lines into the response of the oldest unanswered request."""
+        lines = []
+        for line in self.process.stdout:
+            stripped = line.rstrip("\r\n")
+            if stripped.startswith(SENTINEL_PREFIX) and stripped.endswith(SENTINEL_SUFFIX):
+                request_id = int(stripped[len(SENTINEL_PREFIX):-len(SENTINEL_SUFFIX)])
+                future = self.pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result("".join(lines).strip())
+                lines = []
+            else:
+                lines.append(line)
+        for future in list(self.pending.values()):
+            if not future.done():
+                future.set_exception(PowerShellError("PowerShell process exited"))
+        self.pending.clear()
+
+    def submit(self, commands):
+        """Queues a request without waiting for it, and returns a Future for its output."""
+        future = Future()
+        with self.write_lock:
+            if self.process.poll() is not None:
+                raise PowerShellError("PowerShell process is not running")
+            request_id = next(self.ids)
+            self.pending[request_id] = future
+            self.process.stdin.write(frame_request(request_id, commands))
+            self.process.stdin.flush()
+        return future
+
+    def run(self, commands, timeout=DEFAULT_TIMEOUT_SECONDS):
+        """Runs commands and returns the last one's output, raising PowerShellError on failure or timeout."""
+        try:
+            return self.submit(commands).result(timeout=timeout)
+        except TimeoutError:
+            raise PowerShellError(f"No response from PowerShell within {timeout} seconds")
+
+    def close(self):
+        """Stops the PowerShell process."""
+        if self.process.poll() is None:
+            try:
+                with self.write_lock:
+                    self.process.stdin.write("exit\n")
+                    self.process.stdin.flush()
+                self.process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+
+class PowerShellServer:
+    """Shares a worker with check subprocesses over a Unix socket, one JSON line per request."""
+
+    def __init__(self, worker, socket_path):
+        self.worker = worker
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(socket_path)
+        self.listener.listen()
+        threading.Thread(target=self._accept, name="pwsh-server", daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        with connection, connection.makefile("rw") as stream:
+            for line in stream:
+                request = json.loads(line)
+                try:
+                    reply = {"output": self.worker.run(request["commands"], request.get("timeout", DEFAULT_TIMEOUT_SECONDS))}
+                except PowerShellError as e:
+                    reply = {"error": str(e)}
+                stream.write(json.dumps(reply) + "\n")
+                stream.flush()
+
+    def close(self):
+        self.listener.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def set_worker(worker):
+    """Registers the worker used by in-process checks."""
+    global _worker
+    _worker = worker
+
+
+def authenticate(worker):
+    """Connects a worker's session to Microsoft Graph."""
+    return worker.run(["Import-Module Microsoft.Graph.Identity.SignIns", "Connect-MgGraph -NoWelcome"], timeout=300)
+
+
+def _request_over_socket(socket_path, commands, timeout):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout + 5)
+        client.connect(socket_path)
+        with client.makefile("rw") as stream:
+            stream.write(json.dumps({"commands": commands, "timeout": timeout}) + "\n")
+            stream.flush()
+            reply = json.loads(stream.readline())
+    if "error" in reply:
+        raise PowerShellError(reply["error"])
+    return reply["output"]
+
+
+def run_powershell(commands, timeout=DEFAULT_TIMEOUT_SECONDS):
+    """Runs PowerShell commands in the shared session and returns the last command's output, or None on failure.
+
+    Uses Azurefy's worker when one is running; a standalone script starts and
+    authenticates a private worker instead.
+    """
+    global _worker
+    try:
+        socket_path = os.environ.get(SOCKET_ENV)
+        if _worker is None and socket_path:
+            return _request_over_socket(socket_path, commands, timeout)
+        with _worker_lock:
+            if _worker is None:
+                _worker = PowerShellWorker()
+                authenticate(_worker)
+        return _worker.run(commands, timeout)
+    except (PowerShellError, OSError, ValueError) as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        return None
@@ -0,0 +1,64 @@
+import os
+import json
+import threading
+
+# Checks report what they found as JSON-lines records on a side channel next
+# to their console output: one "resource" record per evaluated resource and a
+# final "verdict". Azurefy.py reads the verdict instead of scraping the text.
+# Run standalone, a check has no channel and emitting is a no-op.
+
+RECORDS_FD_ENV = "AZUREFY_RECORDS_FD"
+STATUSES = ("PASS", "FAIL", "MANUAL")
+
+_local = threading.local()
+_channel = None
+_channel_lock = threading.Lock()
+
+
+def set_sink(sink):
+    """Sends this thread's records to `sink(record)`, or stops doing so when sink is None (in-process checks)."""
+    _local.sink = sink
+
+
+def _write_to_channel(record):
+    global _channel
+    with _channel_lock:
+        if _channel is None:
+            _channel = os.fdopen(int(os.environ[RECORDS_FD_ENV]), "w", buffering=1)
+        _channel.write(json.dumps(record) + "\n")
+
+
+def emit(record):
+    """Sends one record to the current check's channel."""
+    sink = getattr(_local, "sink", None)
+    if sink is not None:
+        sink(record)
+    elif os.environ.get(RECORDS_FD_ENV):
+        _write_to_channel(record)
+
+
+def resource(resource_id, status, **details):
+    """Records the outcome for one resource."""
+    emit(dict(details, type="resource", resource=resource_id, status=status.upper()))
+
+
+def verdict(status, **details):
+    """Records the check's final status."""
+    emit(dict(details, type="verdict", status=status.upper()))
+
+
+def parse_line(line):
+    """Parses one JSON-lines record, or returns None for anything that is not one."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and "type" in record else None
+
+
+def final_verdict(check_records):
+    """Returns the status of the last verdict record, or None if the check emitted none."""
+    for record in reversed(check_records):
+        if record.get("type") == "verdict" and record.get("status") in STATUSES:
+            return record["status"]
+    return None
@@ -0,0 +1,225 @@
+import os
+import re
+import sys
+import json
+import shlex
+import atexit
+import runpy
+import subprocess
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Record/replay of everything a check asks of Azure: `az` and other commands
+# run through subprocess.run, HTTP calls made with requests, and PowerShell
+# requests sent to the shared worker. Run a check under it with
+#
+#   AZUREFY_REPLAY_MODE=record AZUREFY_REPLAY_FILE=cassette.json python3 replay.py "4.1 Securetransfer.py"
+#
+# and later with AZUREFY_REPLAY_MODE=replay to answer the same calls offline.
+# AZUREFY_REPLAY_FILE may list several cassettes separated by os.pathsep;
+# replay answers from the first that has the call, recording writes the first.
+
+MODE_ENV = "AZUREFY_REPLAY_MODE"
+FILE_ENV = "AZUREFY_REPLAY_FILE"
+STATS_ENV = "AZUREFY_REPLAY_STATS"
+KINDS = ("subprocess", "http", "powershell")
+KEPT_HEADERS = ("content-type", "retry-after", "x-ms-ratelimit-remaining-subscription-reads", "x-ms-ratelimit-remaining-tenant-reads")
+
+# Bearer tokens issued by Entra ID are JWTs; any that a command prints is
+# replaced, whatever else its output holds.
+TOKEN_PATTERN = re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]*")
+REDACTED = "REDACTED"
+
+_original_run = subprocess.run
+_original_request = requests.Session.request
+
+
+def command_key(args):
+    """Identifies a command the same way whether it was given as a string or an argument list."""
+    if isinstance(args, (list, tuple)):
+        return " ".join(shlex.quote(str(arg)) for arg in args)
+    return str(args)
+
+
+def http_key(method, url, body=None):
+    key = f"{method.upper()} {url}"
+    if body is not None:
+        key += " " + json.dumps(body, sort_keys=True)
+    return key
+
+
+def powershell_key(commands):
+    return " ; ".join(commands)
+
+
+def prints_access_token(key):
+    """Whether a command's output comes from `az account get-access-token`, i.e. it is the last stage of its pipeline."""
+    return "get-access-token" in key.rsplit("|", 1)[-1]
+
+
+def _redact(key, stdout):
+    """Keeps access tokens out of cassettes.
+
+    The output of `az account get-access-token` is always replaced: JSON
+    objects keep their other fields, anything else (tsv, a JSON string)
+    becomes a placeholder.
+    """
+    if prints_access_token(key):
+        try:
+            data = json.loads(stdout)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            data.update((field, REDACTED) for field in ("accessToken", "access_token") if field in data)
+            return TOKEN_PATTERN.sub(REDACTED, json.dumps(data))
+        if isinstance(data, str):
+            return json.dumps(REDACTED)
+        return REDACTED + "\n" if stdout else stdout
+    return TOKEN_PATTERN.sub(REDACTED, stdout)
+
+
+def _as_text(value):
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    return value or ""
+
+
+class Cassette:
+    """Recorded responses keyed by call, plus counters of the calls a check made."""
+
+    def __init__(self, file_names, mode):
+        self.file_names = file_names
+        self.mode = mode
+        self.calls = {kind: 0 for kind in KINDS}
+        self.misses = {kind: 0 for kind in KINDS}
+        self.layers = []
+        for file_name in file_names:
+            try:
+                with open(file_name) as f:
+                    self.layers.append(json.load(f))
+            except (OSError, ValueError):
+                self.layers.append({})
+        if not self.layers:
+            self.layers.append({})
+        for layer in self.layers:
+            for kind in KINDS:
+                layer.setdefault(kind, {})
+
+    def lookup(self, kind, key):
+        self.calls[kind] += 1
+        for layer in self.layers:
+            if key in layer[kind]:
+                return layer[kind][key]
+        self.misses[kind] += 1
+        return None
+
+    def record(self, kind, key, response):
+        self.calls[kind] += 1
+        self.layers[0][kind][key] = response
+
+    def save(self):
+        if self.mode == "record" and self.file_names:
+            with open(self.file_names[0], "w") as f:
+                json.dump(self.layers[0], f, indent=2, sort_keys=True)
+
+    def save_stats(self, file_name):
+        with open(file_name, "w") as f:
+            json.dump({"calls": self.calls, "misses": self.misses}, f)
+
+
+def _patched_run(cassette):
+    def run(args, *popenargs, **kwargs):
+        key = command_key(args)
+        text = kwargs.get("text") or kwargs.get("universal_newlines") or kwargs.get("encoding")
+        if cassette.mode == "record":
+            result = _original_run(args, *popenargs, **kwargs)
+            cassette.record("subprocess", key, {
+                "returncode": result.returncode,
+                "stdout": _redact(key, _as_text(result.stdout)),
+                "stderr": TOKEN_PATTERN.sub(REDACTED, _as_text(result.stderr)),
+            })
+            return result
+
+        recorded = cassette.lookup("subprocess", key) or {
+            "returncode": 1, "stdout": "", "stderr": f"No recorded response for: {key}"
+        }
+        stdout, stderr = recorded["stdout"], recorded["stderr"]
+        if not text:
+            stdout, stderr = stdout.encode(), stderr.encode()
+        if kwargs.get("check") and recorded["returncode"] != 0:
+            raise subprocess.CalledProcessError(recorded["returncode"], args, stdout, stderr)
+        return subprocess.CompletedProcess(args, recorded["returncode"], stdout, stderr)
+    return run
+
+
+def _patched_request(cassette):
+    def request(session, method, url, *args, **kwargs):
+        key = http_key(method, url, kwargs.get("json"))
+        if cassette.mode == "record":
+            response = _original_request(session, method, url, *args, **kwargs)
+            cassette.record("http", key, {
+                "status_code": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+                "body": response.text,
+            })
+            return response
+
+        recorded = cassette.lookup("http", key) or {
+            "status_code": 404, "headers": {}, "body": json.dumps({"error": {"message": f"No recorded response for: {key}"}})
+        }
+        response = requests.models.Response()
+        response.status_code = recorded["status_code"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = recorded["body"].encode()
+        response.encoding = "utf-8"
+        response.url = url
+        response.reason = ""
+        response.request = requests.Request(method.upper(), url).prepare()
+        return response
+    return request
+
+
+def _patch_powershell(cassette):
+    import powershell
+    original = powershell.run_powershell
+
+    def run_powershell(commands, timeout=powershell.DEFAULT_TIMEOUT_SECONDS):
+        key = powershell_key(commands)
+        if cassette.mode == "record":
+            output = original(commands, timeout)
+            cassette.record("powershell", key, output)
+            return output
+        return cassette.lookup("powershell", key)
+
+    powershell.run_powershell = run_powershell
+
+
+def install(mode=None, file_names=None):
+    """Routes subprocess, HTTP and PowerShell calls through a cassette for the rest of the process."""
+    mode = mode or os.environ.get(MODE_ENV, "replay")
+    if file_names is None:
+        file_names = [name for name in os.environ.get(FILE_ENV, "").split(os.pathsep) if name]
+    cassette = Cassette(file_names, mode)
+    subprocess.run = _patched_run(cassette)
+    requests.Session.request = _patched_request(cassette)
+    _patch_powershell(cassette)
+    atexit.register(cassette.save)
+    stats_file = os.environ.get(STATS_ENV)
+    if stats_file:
+        atexit.register(cassette.save_stats, stats_file)
+    return cassette
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 replay.py <check script> [args...]")
+        sys.exit(2)
+    script_name = sys.argv[1]
+    sys.argv = sys.argv[1:]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script_name)))
+    install()
+    runpy.run_path(script_name, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import json
+import armclient
+
+RESOURCE = "https://management.azure.com"
+API_VERSION_RESOURCE_GRAPH = "2021-03-01"
+RESOURCE_GRAPH_URL = f"{RESOURCE}/providers/Microsoft.ResourceGraph/resources?api-version={API_VERSION_RESOURCE_GRAPH}"
+REPLAY_ENV = "AZUREFY_RESOURCE_GRAPH_REPLAY"
+PAGE_SIZE = 1000
+MAX_SUBSCRIPTIONS_PER_QUERY = 1000
+
+
+class ResourceGraphError(Exception):
+    """Raised when a Resource Graph query cannot be answered."""
+
+
+def arm_transport(body):
+    """Posts one Resource Graph request over the shared ARM session and returns the parsed response."""
+    response = armclient.post(RESOURCE_GRAPH_URL, body)
+    if response is None:
+        raise ResourceGraphError("Resource Graph request failed")
+    return response
+
+
+def _request_key(body):
+    """Identifies a request independently of subscription order."""
+    return json.dumps({
+        "query": body.get("query"),
+        "subscriptions": sorted(body.get("subscriptions", [])),
+        "skipToken": body.get("options", {}).get("$skipToken"),
+    }, sort_keys=True)
+
+
+class RecordingTransport:
+    """Wraps a transport and saves every request/response pair to a file for later replay."""
+
+    def __init__(self, file_name, transport=arm_transport):
+        self.file_name = file_name
+        self.transport = transport
+        self.exchanges = []
+
+    def __call__(self, body):
+        response = self.transport(body)
+        self.exchanges.append({"request": body, "response": response})
+        with open(self.file_name, "w") as f:
+            json.dump({"exchanges": self.exchanges}, f, indent=2)
+        return response
+
+
+class RecordedTransport:
+    """Answers Resource Graph requests from a file written by RecordingTransport."""
+
+    def __init__(self, file_name):
+        with open(file_name) as f:
+            exchanges = json.load(f).get("exchanges", [])
+        self.responses = {_request_key(e["request"]): e["response"] for e in exchanges}
+
+    def __call__(self, body):
+        try:
+            return self.responses[_request_key(body)]
+        except KeyError:
+            raise ResourceGraphError(f"No recorded response for query: {body.get('query')}")
+
+
+def default_transport():
+    """Uses the recorded stand-in named by AZUREFY_RESOURCE_GRAPH_REPLAY, else the live ARM endpoint."""
+    replay_file = os.environ.get(REPLAY_ENV)
+    if replay_file:
+        return RecordedTransport(replay_file)
+    return arm_transport
+
+
+def query(kql, subscription_ids, transport=None):
+    """Runs a KQL query across the given subscriptions and returns every row, following $skipToken pages."""
+    transport = transport or default_transport()
+    subscription_ids = list(subscription_ids)
+    rows = []
+    for start in range(0, len(subscription_ids), MAX_SUBSCRIPTIONS_PER_QUERY):
+        body = {
+            "subscriptions": subscription_ids[start:start + MAX_SUBSCRIPTIONS_PER_QUERY],
+            "query": kql,
+            "options": {"$top": PAGE_SIZE, "resultFormat": "objectArray"},
+        }
+        while True:
+            page = transport(body)
+            rows.extend(page.get("data", []))
+            skip_token = page.get("$skipToken")
+            if not skip_token:
+                break
+            body = dict(body, options=dict(body["options"], **{"$skipToken": skip_token}))
+    return rows
+
+
+def list_resources(subscription_ids, resource_types, transport=None):
+    """Lists full resource records for several resource types in one paged query.
+
+    Rows carry the same id, name, resourceGroup, subscriptionId and properties
+    fields as an ARM list call, so checks read them the same way.
+    """
+    types = ", ".join(f"'{resource_type.lower()}'" for resource_type in resource_types)
+    kql = (
+        f"resources | where type in~ ({types}) "
+        "| project id, name, type, kind, location, resourceGroup, subscriptionId, sku, identity, tags, properties "
+        "| order by id asc"
+    )
+    return query(kql, subscription_ids, transport=transport)
@@ -0,0 +1,230 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, Style
+import armclient
+import inventory
+import records
+
+# Section 4 storage-account rules, evaluated together. Storage accounts are
+# enumerated once per process (from the inventory snapshot when there is one)
+# and every rule in RULES is applied to each account in a single pass; the
+# per-control scripts then print and record their own column of the result,
+# one account at a time as the pass reaches it. A rule that needs more than
+# the account resource names it in "needs"; "blobService" is read once per
+# account, and only when such a rule is asked for.
+#
+# A rule takes the account and returns (status, colour, text, details, proof):
+# status is PASS, FAIL or MANUAL, details become the resource record and
+# proof, when given, is printed as JSON under a failing account.
+
+RESOURCE = "https://management.azure.com"
+API_VERSION_SUBSCRIPTIONS = "2020-01-01"
+MAX_WORKERS = 8
+
+_outcomes = {}
+_account_locks = {}
+_account_locks_lock = threading.Lock()
+
+
+def _properties(account):
+    return account.get("properties") or {}
+
+
+def _result(passed, text, details, proof=None):
+    if passed:
+        return "PASS", Fore.GREEN, text, details, None
+    return "FAIL", Fore.RED, text, details, proof
+
+
+def secure_transfer(account):
+    enabled = _properties(account).get("supportsHttpsTrafficOnly", False)
+    return _result(enabled, "Required" if enabled else "Not Required", {"supportsHttpsTrafficOnly": enabled})
+
+
+def infrastructure_encryption(account):
+    enabled = (_properties(account).get("encryption") or {}).get("requireInfrastructureEncryption", False)
+    return _result(enabled, "Enabled" if enabled else "Not Enabled", {"requireInfrastructureEncryption": enabled})
+
+
+def public_network_access(account):
+    access = _properties(account).get("publicNetworkAccess") or "Unknown"
+    return _result(access == "Disabled", access, {"publicNetworkAccess": access}, {"id": account.get("id"), "publicNetworkAccess": access})
+
+
+def default_network_action(account):
+    network_acls = _properties(account).get("networkAcls") or {}
+    action = network_acls.get("defaultAction") or "Unknown"
+    return _result(action == "Deny", action, {"defaultAction": action}, network_acls)
+
+
+def trusted_azure_services(account):
+    network_acls = _properties(account).get("networkAcls") or {}
+    bypass = network_acls.get("bypass") or ""
+    allowed = "AzureServices" in bypass
+    return _result(allowed, "Allowed" if allowed else f"Bypass: {bypass or 'None'}", {"bypass": bypass}, network_acls)
+
+
+def private_endpoints(account):
+    connections = _properties(account).get("privateEndpointConnections") or []
+    text = "Private endpoints enabled" if connections else "Private endpoints not used"
+    return _result(bool(connections), text, {"privateEndpoints": len(connections)}, connections)
+
+
+def soft_delete(account):
+    blob_service = account.get("blobService")
+    if blob_service is None:
+        return "FAIL", Fore.RED, "Unknown status", {"deleteRetentionDays": None}, None
+    policy = blob_service.get("deleteRetentionPolicy") or {}
+    days = policy.get("days")
+    if policy.get("enabled") and days:
+        return _result(True, f"Enabled for {days} day(s)", {"deleteRetentionDays": days})
+    if policy.get("enabled"):
+        return "FAIL", Fore.YELLOW, "Enabled but no retention days set", {"deleteRetentionDays": None}, None
+    return _result(False, "Disabled", {"deleteRetentionDays": None})
+
+
+def customer_managed_keys(account):
+    key_source = (_properties(account).get("encryption") or {}).get("keySource") or "Unknown"
+    return "MANUAL", Fore.YELLOW, key_source, {"keySource": key_source}, None
+
+
+def minimum_tls_version(account):
+    version = _properties(account).get("minimumTlsVersion") or "Unknown"
+    return _result(version == "TLS1_2", version, {"minimumTlsVersion": version})
+
+
+def cross_tenant_replication(account):
+    allowed = _properties(account).get("allowCrossTenantReplication", False)
+    return _result(not allowed, "Enabled" if allowed else "Disabled", {"allowCrossTenantReplication": allowed})
+
+
+def anonymous_blob_access(account):
+    allowed = _properties(account).get("allowBlobPublicAccess")
+    return _result(allowed is False, "false" if allowed is False else "true", {"allowBlobPublicAccess": allowed})
+
+
+RULES = {
+    "4.1": {"label": "Secure Transfer", "evaluate": secure_transfer},
+    "4.2": {"label": "Infrastructure Encryption", "evaluate": infrastructure_encryption},
+    "4.6": {"label": "Public Network Access", "evaluate": public_network_access},
+    "4.7": {"label": "Default Network Action", "evaluate": default_network_action},
+    "4.8": {"label": "Trusted Azure Services", "evaluate": trusted_azure_services},
+    "4.9": {"label": "Private Endpoint Connections", "evaluate": private_endpoints},
+    "4.10": {"label": "Blob Soft Delete", "evaluate": soft_delete, "needs": "blobService"},
+    "4.11": {"label": "Encryption Key Source", "evaluate": customer_managed_keys},
+    "4.15": {"label": "Minimum TLS Version", "evaluate": minimum_tls_version},
+    "4.16": {"label": "Cross-tenant Replication", "evaluate": cross_tenant_replication},
+    "4.17": {"label": "Allow Blob Public Access", "evaluate": anonymous_blob_access},
+}
+
+
+def get_subscriptions():
+    """Returns the enabled subscriptions, from the snapshot when there is one."""
+    subscriptions = inventory.get_subscriptions(include_disabled=False)
+    if subscriptions is not None:
+        return subscriptions
+    subscriptions = armclient.get_all(f"{RESOURCE}/subscriptions?api-version={API_VERSION_SUBSCRIPTIONS}")
+    if subscriptions is None:
+        return []
+    return [subscription for subscription in subscriptions if subscription.get("state") in (None, "Enabled")]
+
+
+def _account_lock(key):
+    with _account_locks_lock:
+        return _account_locks.setdefault(key, threading.Lock())
+
+
+def clear_cache():
+    """Forgets every outcome evaluated so far."""
+    with _account_locks_lock:
+        _outcomes.clear()
+        _account_locks.clear()
+
+
+def evaluate_account(account, controls):
+    """Returns {control: outcome} for one storage account, reading its blob service first when a rule needs it.
+
+    Outcomes are kept for the process, so later controls are answered
+    without another read.
+    """
+    key = account.get("id") or account.get("name")
+    with _account_lock(key):
+        pending = [control for control in controls if (key, control) not in _outcomes]
+        if any(RULES[control].get("needs") == "blobService" for control in pending):
+            inventory.read_blob_service(account)
+        for control in pending:
+            _outcomes[(key, control)] = RULES[control]["evaluate"](account)
+        return {control: _outcomes[(key, control)] for control in controls}
+
+
+def evaluate(controls=None):
+    """Applies the given rules (all by default) to every storage account in one pass.
+
+    Yields (subscription, account_results) in subscription order;
+    account_results is None where the accounts could not be listed, and
+    otherwise yields (account, {control: outcome}) in listing order.
+    Listings are read concurrently ahead of the caller and each
+    subscription's accounts are evaluated concurrently, so every account is
+    available as soon as it and the ones before it are done.
+    """
+    controls = list(controls or RULES)
+    subscriptions = get_subscriptions()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as listing_executor, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        listings = listing_executor.map(
+            lambda subscription: inventory.get_collection("storageAccounts", subscription["subscriptionId"]),
+            subscriptions
+        )
+        for subscription, accounts in zip(subscriptions, listings):
+            if accounts is None:
+                yield subscription, None
+                continue
+            yield subscription, zip(accounts, executor.map(lambda account: evaluate_account(account, controls), accounts))
+
+
+def report(control):
+    """Prints and records one control's result for every storage account, then its final status.
+
+    The pass evaluates every rule that needs nothing beyond the account
+    resource, so the other section 4 checks in this process reuse it.
+    """
+    rule = RULES[control]
+    controls = [name for name, other in RULES.items() if "needs" not in other or name == control]
+    all_passed = True
+    subscriptions_found = False
+    for subscription, account_results in evaluate(controls):
+        subscriptions_found = True
+        subscription_name = subscription["displayName"]
+        print(f"\n{Fore.YELLOW}Checking storage accounts in subscription: {subscription_name}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}____________________________________________________{Style.RESET_ALL}")
+        print()
+
+        if account_results is None:
+            print(f"{Fore.RED}Failed to retrieve storage accounts for subscription {subscription_name}.{Style.RESET_ALL}")
+            continue
+
+        accounts_found = False
+        for account, outcomes in account_results:
+            accounts_found = True
+            status, color, text, details, proof = outcomes[control]
+            account_name = account.get("name")
+            print(f"{Fore.YELLOW}____________________________________________________{Style.RESET_ALL}")
+            print()
+            print(f"Storage Account: {account_name} - {rule['label']}: {color}{text}{Style.RESET_ALL}")
+            records.resource(account.get("id", account_name), status, **details)
+            if status != "PASS":
+                all_passed = False
+                if proof:
+                    print(f"{Fore.CYAN}Sample JSON Proof for {account_name}:{Style.RESET_ALL}")
+                    print(json.dumps(proof, indent=4))
+        if not accounts_found:
+            print(f"{Fore.YELLOW}No storage accounts found in subscription {subscription_name}.{Style.RESET_ALL}")
+
+    if not subscriptions_found:
+        print(f"{Fore.RED}No subscriptions found.{Style.RESET_ALL}")
+        print("Final Status: FAIL")
+        records.verdict("FAIL", reason="no subscriptions")
+        return
+
+    print(f"\n{Fore.CYAN}Final Status: {Fore.GREEN}Pass{Style.RESET_ALL}" if all_passed else f"\n{Fore.CYAN}Final Status: {Fore.RED}Fail{Style.RESET_ALL}")
+    records.verdict("PASS" if all_passed else "FAIL")
@@ -0,0 +1,21 @@
+import os
+import sys
+import pytest
+
+# The checks and their shared modules live at the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import appservicerules  # noqa: E402
+import networkgraph  # noqa: E402
+import nsgrules  # noqa: E402
+import storagerules  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Starts every test without the per-process caches earlier tests filled."""
+    yield
+    nsgrules.clear_cache()
+    networkgraph.clear_cache()
+    storagerules.clear_cache()
+    appservicerules.clear_cache()
@@ -0,0 +1,48 @@
+import os
+import re
+import sys
+import time
+import threading
+
+# Stand-in for `pwsh` in the PowerShellWorker tests. It reads the lines built
+# by powershell.frame_request and answers each on its own thread, so a slow
+# request can finish after a later fast one. The last command of a request
+# decides the reply:
+#
+#   Echo <text>             prints <text>
+#   Sleep <seconds> <text>  prints <text> after a delay
+#   Hang                    never answers
+#   Exit                    ends the process without answering
+
+FRAME = re.compile(r"^& \{ (?:.*; )?(?P<command>[^;]*?) \} 2>&1 \| Out-String -Width 4096; Write-Output '(?P<sentinel>.*)'$")
+
+write_lock = threading.Lock()
+
+
+def answer(command, sentinel):
+    verb, _, rest = command.partition(" ")
+    if verb == "Hang":
+        return
+    if verb == "Exit":
+        sys.stdout.flush()
+        os._exit(0)
+    if verb == "Sleep":
+        seconds, _, rest = rest.partition(" ")
+        time.sleep(float(seconds))
+    with write_lock:
+        sys.stdout.write(rest.replace("\\n", "\n") + "\n" + sentinel + "\n")
+        sys.stdout.flush()
+
+
+def main():
+    for line in sys.stdin:
+        line = line.rstrip("\n")
+        if line == "exit":
+            return
+        match = FRAME.match(line)
+        if match:
+            threading.Thread(target=answer, args=(match.group("command"), match.group("sentinel")), daemon=True).start()
+
+
+if __name__ == "__main__":
+    main()
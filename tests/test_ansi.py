@@ -0,0 +1,43 @@
+import ansi
+
+RED = '<span style="color:red;">'
+BOLD_RED = '<span style="color:red;font-weight:bold;">'
+
+
+def test_combined_codes_in_one_sequence_apply_together():
+    assert ansi.to_html("\x1b[1;31mFAIL\x1b[0m done") == f"{BOLD_RED}FAIL</span> done"
+
+
+def test_a_style_change_closes_the_open_span_first():
+    assert ansi.to_html("\x1b[31mred\x1b[32mgreen\x1b[39mplain") == (
+        f'{RED}red</span><span style="color:green;">green</span>plain'
+    )
+
+
+def test_bright_codes_and_yellow_map_to_report_colours():
+    assert ansi.to_html("\x1b[90mgray\x1b[33myellow") == (
+        '<span style="color:gray;">gray</span><span style="color:orange;">yellow</span>'
+    )
+
+
+def test_an_escape_split_across_chunks_is_held_back():
+    converter = ansi.HtmlConverter()
+    assert converter.feed("before \x1b[1") == "before "
+    assert converter.feed(";31mFAIL") == f"{BOLD_RED}FAIL"
+    assert converter.feed("\x1b") == ""
+    assert converter.feed("[0m after") == "</span> after"
+    assert converter.close() == ""
+
+
+def test_style_carries_over_between_chunks_and_close_balances_the_markup():
+    converter = ansi.HtmlConverter()
+    html = converter.feed("\x1b[31mone ") + converter.feed("two") + converter.close()
+    assert html == f"{RED}one two</span>"
+
+
+def test_text_is_escaped_and_other_sequences_are_dropped():
+    assert ansi.to_html("\x1b[2K<a & b>") == "&lt;a &amp; b&gt;"
+
+
+def test_strip_removes_every_sequence():
+    assert ansi.strip("\x1b[1;31mFAIL\x1b[0m") == "FAIL"
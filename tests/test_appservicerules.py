@@ -0,0 +1,65 @@
+import pytest
+import appservicerules
+import inventory
+
+LOCKED_DOWN = {"ftp": {"allow": False}, "scm": {"allow": False}}
+
+
+def site(**fields):
+    return dict({"id": "/sites/app", "name": "app", "properties": {}}, **fields)
+
+
+@pytest.mark.parametrize("control, fields, status, text", [
+    ("9.1", {"properties": {"httpsOnly": True}}, "PASS", "Enabled"),
+    ("9.1", {"properties": {}}, "FAIL", "Not enabled"),
+    ("9.2", {"authSettings": {"enabled": True}, "publishingCredentials": LOCKED_DOWN}, "PASS", "Compliant"),
+    ("9.2", {"authSettings": {"enabled": True}, "publishingCredentials": {"ftp": {"allow": False}, "scm": {"allow": True}}},
+     "FAIL", "Authentication enabled, SCM basic auth allowed, FTP basic auth disabled"),
+    ("9.2", {"authSettings": None, "publishingCredentials": LOCKED_DOWN}, "FAIL", "Unable to determine authentication settings"),
+    ("9.3", {"config": {"ftpsState": "FtpsOnly"}}, "PASS", "FtpsOnly"),
+    ("9.3", {"config": {"ftpsState": "AllAllowed"}}, "FAIL", "AllAllowed"),
+    ("9.4", {"config": {"minTlsVersion": "1.3"}}, "PASS", "1.3"),
+    ("9.4", {"config": {"minTlsVersion": "1.0"}}, "FAIL", "1.0"),
+    ("9.4", {"config": None}, "FAIL", "Unable to determine minTlsVersion"),
+    ("9.5", {"identity": {"principalId": "p-1"}}, "PASS", "Registered with Entra ID: p-1"),
+    ("9.5", {}, "FAIL", "Not registered with Entra ID"),
+    ("9.6", {"publishingCredentials": LOCKED_DOWN}, "PASS", "Disabled"),
+    ("9.6", {"publishingCredentials": {"ftp": {"allow": True}, "scm": {}}}, "FAIL", "Basic authentication allowed for FTP, SCM"),
+    ("9.7", {"config": {"phpVersion": "PHP|8.1"}}, "PASS", "Supported PHP version: PHP|8.1"),
+    ("9.7", {"config": {"phpVersion": "PHP|5.6"}}, "FAIL", "Unsupported PHP version: PHP|5.6"),
+    ("9.8", {"config": {}}, "PASS", "Python not used"),
+    ("9.8", {"config": {"pythonVersion": "2.7"}}, "FAIL", "Unsupported Python version: 2.7"),
+    ("9.9", {"config": {"javaVersion": "17", "javaContainer": "TOMCAT", "javaContainerVersion": "10.0"}},
+     "PASS", "Supported Java version: 17 (TOMCAT 10.0)"),
+    ("9.9", {"config": {"javaVersion": "1.8"}}, "FAIL", "Unsupported Java version: 1.8"),
+    ("9.10", {"config": {"http20Enabled": True}}, "PASS", "Enabled"),
+    ("9.10", {"config": {}}, "FAIL", "Unable to determine HTTP 2.0 status"),
+    ("9.12", {"config": {"remoteDebuggingEnabled": False}}, "PASS", "Disabled"),
+    ("9.12", {"config": {"remoteDebuggingEnabled": True}}, "FAIL", "Enabled"),
+])
+def test_rules(control, fields, status, text):
+    outcome = appservicerules.RULES[control]["evaluate"](site(**fields))
+    assert outcome[0] == status
+    assert outcome[2] == text
+
+
+def test_every_rule_names_details_the_inventory_can_read():
+    for rule in appservicerules.RULES.values():
+        assert set(rule["needs"]) <= set(inventory.WEB_APP_DETAILS)
+
+
+def test_details_are_read_once_and_only_for_rules_that_need_them(monkeypatch):
+    reads = []
+
+    def get_web_app_detail(resource, detail):
+        reads.append(detail)
+        return {"config": {"minTlsVersion": "1.2", "http20Enabled": True}, "publishingCredentials": LOCKED_DOWN}.get(detail)
+
+    monkeypatch.setattr(inventory, "_get_web_app_detail", get_web_app_detail)
+    resource = site(properties={"httpsOnly": True})
+    assert appservicerules.evaluate_site(resource, ["9.1"])["9.1"][0] == "PASS"
+    assert reads == []
+    outcomes = appservicerules.evaluate_site(resource, ["9.4", "9.6", "9.10"])
+    assert [outcomes[control][0] for control in ("9.4", "9.6", "9.10")] == ["PASS", "PASS", "PASS"]
+    appservicerules.evaluate_site(resource, ["9.3", "9.6"])
+    assert sorted(reads) == ["config", "publishingCredentials"]
@@ -0,0 +1,80 @@
+import copy
+import incremental
+
+
+def vm(power_state="PowerState/running", heartbeat="2026-10-17T01:00:00Z", **properties):
+    return {
+        "id": "/subscriptions/sub-1/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/vm1",
+        "properties": dict({
+            "securityProfile": {"securityType": "TrustedLaunch"},
+            "extended": {"instanceView": {"powerState": {"code": power_state}}},
+        }, **properties),
+        "extensions": [{"name": "AzureMonitorLinuxAgent"}],
+        "instanceView": {"statuses": [{"code": power_state, "time": heartbeat}], "vmAgent": {"statuses": [{"time": heartbeat}]}},
+    }
+
+
+def snapshot(*vms):
+    return {
+        "subscriptions": [{"subscriptionId": "sub-1", "state": "Enabled"}],
+        "resources": {"virtualMachines": {"sub-1": list(vms)}},
+    }
+
+
+def vm_fingerprint(snapshot_):
+    return incremental.check_fingerprint(incremental.fingerprint_snapshot(snapshot_), ["virtualMachines"])
+
+
+def test_instance_view_changes_do_not_change_the_fingerprint():
+    before = vm_fingerprint(snapshot(vm()))
+    assert vm_fingerprint(snapshot(vm(power_state="PowerState/deallocated", heartbeat="2026-10-18T01:00:00Z"))) == before
+
+
+def test_configuration_changes_change_the_fingerprint():
+    before = vm_fingerprint(snapshot(vm()))
+    assert vm_fingerprint(snapshot(vm(securityProfile={"securityType": "Standard"}))) != before
+
+
+def test_fingerprinting_leaves_the_snapshot_untouched():
+    original = snapshot(vm())
+    kept = copy.deepcopy(original)
+    incremental.fingerprint_snapshot(original)
+    assert original == kept
+
+
+def test_a_collection_that_failed_is_never_fingerprinted():
+    failed = {"subscriptions": [], "resources": {"virtualMachines": {"sub-1": None}}}
+    assert vm_fingerprint(failed) is None
+
+
+def previous_result(status="PASS", output="VM: vm1 - Trusted launch enabled", verdict=True):
+    result = {"Output": f'<span style="color:green;">{output}</span>', "Final Status": status, "Records": [
+        {"type": "resource", "resource": "vm1", "status": status},
+    ]}
+    if verdict:
+        result["Records"].append({"type": "verdict", "status": status})
+    return result
+
+
+def reuse(tmp_path, result):
+    script = tmp_path / "8.11 trustedlaunch.py"
+    script.write_text('INVENTORY_COLLECTIONS = ["virtualMachines"]\n')
+    fingerprints = incremental.fingerprint_snapshot(snapshot(vm()))
+    return incremental.reusable_results([str(script)], {str(script): result}, fingerprints, fingerprints)
+
+
+def test_unchanged_checks_with_a_recorded_verdict_are_reused(tmp_path):
+    [reused] = reuse(tmp_path, previous_result()).values()
+    assert reused["Final Status"] == "PASS"
+    assert reused["Reused"] is True
+
+
+def test_results_without_a_recorded_verdict_are_run_again(tmp_path):
+    assert reuse(tmp_path, previous_result(verdict=False)) == {}
+    assert reuse(tmp_path, {"Output": "Script timed out due to no output.", "Final Status": "SKIPPED"}) == {}
+
+
+def test_results_that_went_through_an_error_path_are_run_again(tmp_path):
+    failed = previous_result(status="FAIL", output="Failed to retrieve virtual machines for subscription Prod.")
+    assert reuse(tmp_path, failed) == {}
+    assert reuse(tmp_path, previous_result(status="FAIL", output="Unable to determine minTlsVersion")) == {}
@@ -0,0 +1,82 @@
+import networkgraph
+
+POLICY_PORTS = [22, 80, 443, 3389]
+
+
+def allow(port, priority=100, access="Allow"):
+    return {"name": f"{access}{port}", "properties": {
+        "priority": priority, "access": access, "direction": "Inbound", "protocol": "Tcp",
+        "sourceAddressPrefix": "Internet", "destinationPortRange": str(port),
+    }}
+
+
+def nsg(name, *rules):
+    return {"id": f"/nsgs/{name}", "properties": {"securityRules": list(rules)}}
+
+
+def graph(sku=None, subnet_nsg=None, nic_nsg=None, attached=True):
+    """One public IP on one NIC in one subnet, with optional NSGs on the subnet and the NIC."""
+    subnet = {"id": "/vnets/vnet/subnets/default", "properties": {}}
+    if subnet_nsg:
+        subnet["properties"]["networkSecurityGroup"] = {"id": subnet_nsg["id"]}
+    ip_configuration = {"id": "/nics/nic/ipConfigurations/ipconfig1", "properties": {
+        "privateIPAddress": "10.0.0.4", "subnet": {"id": subnet["id"]}, "publicIPAddress": {"id": "/publicIPs/ip"},
+    }}
+    nic = {"id": "/nics/nic", "properties": {"ipConfigurations": [ip_configuration]}}
+    if nic_nsg:
+        nic["properties"]["networkSecurityGroup"] = {"id": nic_nsg["id"]}
+    public_ip = {"id": "/publicIPs/ip", "properties": {"ipAddress": "203.0.113.10"}}
+    if attached:
+        public_ip["properties"]["ipConfiguration"] = {"id": ip_configuration["id"]}
+    else:
+        ip_configuration["properties"].pop("publicIPAddress")
+    if sku:
+        public_ip["sku"] = {"name": sku}
+    nsgs = [group for group in (subnet_nsg, nic_nsg) if group]
+    vnet = {"id": "/vnets/vnet", "properties": {"subnets": [subnet]}}
+    return networkgraph.NetworkGraph(nsgs, [nic], [vnet], [public_ip])
+
+
+def exposed_ports(network_graph):
+    [endpoint] = network_graph.endpoints
+    exposed = endpoint["exposedPorts"]
+    return None if exposed is None else sorted(exposed)
+
+
+def test_basic_sku_without_an_nsg_exposes_every_port():
+    assert exposed_ports(graph(sku="Basic")) == POLICY_PORTS
+
+
+def test_missing_sku_is_treated_as_basic():
+    assert exposed_ports(graph()) == POLICY_PORTS
+
+
+def test_standard_sku_without_an_nsg_stays_closed():
+    assert exposed_ports(graph(sku="Standard")) == []
+
+
+def test_a_single_nsg_decides_when_the_other_level_has_none():
+    assert exposed_ports(graph(sku="Standard", subnet_nsg=nsg("subnet-nsg", allow(22)))) == [22]
+    assert exposed_ports(graph(sku="Standard", nic_nsg=nsg("nic-nsg", allow(3389)))) == [3389]
+
+
+def test_both_nsgs_must_allow_a_port():
+    subnet_nsg = nsg("subnet-nsg", allow(22), allow(443))
+    nic_nsg = nsg("nic-nsg", allow(22, access="Deny"), allow(443, priority=200))
+    network_graph = graph(sku="Standard", subnet_nsg=subnet_nsg, nic_nsg=nic_nsg)
+    assert exposed_ports(network_graph) == [443]
+    [endpoint] = network_graph.endpoints
+    assert [rule["name"] for rule in endpoint["exposedPorts"][443]] == ["Allow443", "Allow443"]
+
+
+def test_an_unattached_public_ip_is_not_evaluated():
+    assert exposed_ports(graph(sku="Basic", attached=False)) is None
+
+
+def test_nsgs_are_attached_through_subnets_and_nics():
+    subnet_nsg, nic_nsg, orphan = nsg("subnet-nsg"), nsg("nic-nsg"), nsg("orphan-nsg")
+    network_graph = graph(subnet_nsg=subnet_nsg, nic_nsg=nic_nsg)
+    network_graph.nsgs[orphan["id"].lower()] = orphan
+    assert network_graph.is_attached(subnet_nsg)
+    assert network_graph.is_attached(nic_nsg)
+    assert not network_graph.is_attached(orphan)
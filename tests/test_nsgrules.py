@@ -0,0 +1,90 @@
+import nsgrules
+
+
+def rule(name, priority, access="Allow", ports="*", source="*", protocol="Tcp", direction="Inbound", **properties):
+    properties = dict({
+        "priority": priority,
+        "access": access,
+        "direction": direction,
+        "protocol": protocol,
+        "sourceAddressPrefix": source,
+    }, **properties)
+    if isinstance(ports, list):
+        properties["destinationPortRanges"] = ports
+    else:
+        properties["destinationPortRange"] = ports
+    return {"name": name, "properties": properties}
+
+
+def nsg(*rules):
+    return {"id": "/nsg", "properties": {"securityRules": list(rules)}}
+
+
+def names(findings):
+    return [(finding["name"], ports) for finding, ports in findings]
+
+
+def test_parse_port_ranges_reads_singles_ranges_and_lists():
+    assert nsgrules.parse_port_ranges(rule("r", 100, ports="*")) == [(0, 65535)]
+    assert nsgrules.parse_port_ranges(rule("r", 100, ports="3389")) == [(3389, 3389)]
+    assert nsgrules.parse_port_ranges(rule("r", 100, ports=["443", "20-22", "junk", "70000"])) == [(20, 22), (443, 443)]
+
+
+def test_a_neighbouring_port_is_not_a_match():
+    findings = nsgrules.analyze(nsg(rule("AllowRdpLookalike", 100, ports="33890")))
+    assert findings["7.1"] == []
+
+
+def test_port_range_lists_expose_every_port_they_cover():
+    findings = nsgrules.analyze(nsg(rule("AllowMany", 100, ports=["21-23", "80", "3000-4000"])))
+    assert names(findings["7.1"]) == [("AllowMany", [3389])]
+    assert names(findings["7.2"]) == [("AllowMany", [22])]
+    assert names(findings["7.4"]) == [("AllowMany", [80])]
+
+
+def test_a_higher_priority_deny_overrides_a_lower_priority_allow():
+    findings = nsgrules.analyze(nsg(
+        rule("DenyRdp", 100, access="Deny", ports="3389"),
+        rule("AllowAll", 200, ports="*"),
+    ))
+    assert findings["7.1"] == []
+    assert names(findings["7.2"]) == [("AllowAll", [22])]
+
+
+def test_a_lower_priority_deny_does_not_hide_an_allow():
+    findings = nsgrules.analyze(nsg(
+        rule("AllowSsh", 100, ports="22"),
+        rule("DenySsh", 200, access="Deny", ports="22"),
+    ))
+    assert names(findings["7.2"]) == [("AllowSsh", [22])]
+
+
+def test_a_deny_for_one_destination_does_not_override_an_allow_for_all():
+    findings = nsgrules.analyze(nsg(
+        rule("DenyOneHost", 100, access="Deny", ports="22", destinationAddressPrefix="10.0.0.4"),
+        rule("AllowSsh", 200, ports="22"),
+    ))
+    assert names(findings["7.2"]) == [("AllowSsh", [22])]
+
+
+def test_only_internet_sourced_inbound_rules_of_the_policy_protocol_count():
+    findings = nsgrules.analyze(nsg(
+        rule("FromVnet", 100, ports="22", source="VirtualNetwork"),
+        rule("Outbound", 110, ports="22", direction="Outbound"),
+        rule("Udp", 120, ports="22", protocol="Udp"),
+        rule("FromInternetTag", 130, ports="3389", source="Internet"),
+        rule("AnyProtocol", 140, ports="443", protocol="*", sourceAddressPrefixes=["0.0.0.0/0"], sourceAddressPrefix=None),
+    ))
+    assert findings["7.2"] == []
+    assert names(findings["7.1"]) == [("FromInternetTag", [3389])]
+    assert names(findings["7.4"]) == [("AnyProtocol", [443])]
+
+
+def test_effective_rules_pick_the_first_rule_that_matches_the_address():
+    rule_index = nsgrules.RuleIndex(nsg(
+        rule("DenyOtherSubnet", 100, access="Deny", ports="22", destinationAddressPrefix="10.1.0.0/16"),
+        rule("AllowSsh", 200, ports="22"),
+    ))
+    assert rule_index.effective_rules([22], address="10.1.0.4")[22]["name"] == "DenyOtherSubnet"
+    assert rule_index.effective_rules([22], address="10.0.0.4")[22]["name"] == "AllowSsh"
+    assert rule_index.effective_rules([3389], address="10.0.0.4")[3389] is None
@@ -0,0 +1,70 @@
+import os
+import sys
+import pytest
+import powershell
+
+FAKE_PWSH = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_pwsh.py")]
+
+
+@pytest.fixture
+def worker():
+    worker = powershell.PowerShellWorker(command=FAKE_PWSH)
+    yield worker
+    worker.close()
+
+
+def test_frame_request_keeps_only_the_last_command_output():
+    line = powershell.frame_request(7, ["Import-Module X", "Get-Thing"])
+    assert line.startswith("& { Import-Module X | Out-Null; Get-Thing }")
+    assert line.endswith(f"Write-Output '{powershell.SENTINEL_PREFIX}7{powershell.SENTINEL_SUFFIX}'\n")
+
+
+def test_run_returns_the_output_before_the_sentinel(worker):
+    assert worker.run(["Connect-Session", "Echo first\\nsecond"], timeout=5) == "first\nsecond"
+
+
+def test_requests_completing_out_of_order_get_their_own_output(worker):
+    slow = worker.submit(["Sleep 0.5 slow"])
+    fast = worker.submit(["Echo fast"])
+    assert fast.result(timeout=5) == "fast"
+    assert not slow.done()
+    assert slow.result(timeout=5) == "slow"
+
+
+def test_timeout_raises_and_leaves_the_worker_usable(worker):
+    with pytest.raises(powershell.PowerShellError, match="within 0.2 seconds"):
+        worker.run(["Hang"], timeout=0.2)
+    assert worker.run(["Echo still here"], timeout=5) == "still here"
+
+
+def test_process_exit_fails_pending_requests(worker):
+    pending = worker.submit(["Hang"])
+    worker.submit(["Exit"])
+    with pytest.raises(powershell.PowerShellError, match="exited"):
+        pending.result(timeout=5)
+    worker.process.wait(timeout=5)
+    with pytest.raises(powershell.PowerShellError, match="not running"):
+        worker.submit(["Echo too late"])
+
+
+def test_socket_round_trip_through_the_server(worker, tmp_path):
+    socket_path = str(tmp_path / "pwsh.sock")
+    server = powershell.PowerShellServer(worker, socket_path)
+    try:
+        assert powershell._request_over_socket(socket_path, ["Echo over the socket"], 5) == "over the socket"
+        with pytest.raises(powershell.PowerShellError, match="within 0.2 seconds"):
+            powershell._request_over_socket(socket_path, ["Hang"], 0.2)
+    finally:
+        server.close()
+    assert not os.path.exists(socket_path)
+
+
+def test_run_powershell_uses_the_socket_when_azurefy_serves_one(worker, tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "pwsh.sock")
+    server = powershell.PowerShellServer(worker, socket_path)
+    monkeypatch.setenv(powershell.SOCKET_ENV, socket_path)
+    monkeypatch.setattr(powershell, "_worker", None)
+    try:
+        assert powershell.run_powershell(["Echo shared"], timeout=5) == "shared"
+    finally:
+        server.close()
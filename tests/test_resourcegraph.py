@@ -0,0 +1,98 @@
+import json
+import pytest
+import inventory
+import resourcegraph
+
+
+class FakeTransport:
+    """Answers from a list of pages per subscription batch and records every request."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def __call__(self, body):
+        self.requests.append(body)
+        token = body["options"].get("$skipToken")
+        return self.pages[(body["subscriptions"][0], token)]
+
+
+def test_query_follows_skip_tokens_until_the_last_page():
+    transport = FakeTransport({
+        ("sub-1", None): {"data": [{"id": "a"}], "$skipToken": "page-2"},
+        ("sub-1", "page-2"): {"data": [{"id": "b"}], "$skipToken": "page-3"},
+        ("sub-1", "page-3"): {"data": [{"id": "c"}]},
+    })
+    rows = resourcegraph.query("resources", ["sub-1"], transport=transport)
+    assert [row["id"] for row in rows] == ["a", "b", "c"]
+    assert [request["options"].get("$skipToken") for request in transport.requests] == [None, "page-2", "page-3"]
+    assert all(request["options"]["$top"] == resourcegraph.PAGE_SIZE for request in transport.requests)
+
+
+def test_query_batches_subscriptions_per_request():
+    subscription_ids = [f"sub-{i:04}" for i in range(2 * resourcegraph.MAX_SUBSCRIPTIONS_PER_QUERY + 1)]
+    transport = FakeTransport({
+        (subscription_ids[start], None): {"data": [{"id": subscription_ids[start]}]}
+        for start in range(0, len(subscription_ids), resourcegraph.MAX_SUBSCRIPTIONS_PER_QUERY)
+    })
+    rows = resourcegraph.query("resources", subscription_ids, transport=transport)
+    assert [len(request["subscriptions"]) for request in transport.requests] == [1000, 1000, 1]
+    assert [subscription for request in transport.requests for subscription in request["subscriptions"]] == subscription_ids
+    assert [row["id"] for row in rows] == ["sub-0000", "sub-1000", "sub-2000"]
+
+
+def test_recorded_transport_replays_a_recording(tmp_path):
+    recording = str(tmp_path / "graph.json")
+    live = FakeTransport({
+        ("sub-1", None): {"data": [{"id": "a"}], "$skipToken": "next"},
+        ("sub-1", "next"): {"data": [{"id": "b"}]},
+    })
+    recorded = resourcegraph.query("resources", ["sub-1", "sub-2"], transport=resourcegraph.RecordingTransport(recording, live))
+
+    # Subscription order does not matter when matching a recorded request.
+    replay = resourcegraph.RecordedTransport(recording)
+    assert resourcegraph.query("resources", ["sub-2", "sub-1"], transport=replay) == recorded
+    with pytest.raises(resourcegraph.ResourceGraphError, match="No recorded response"):
+        resourcegraph.query("resources | take 1", ["sub-1"], transport=replay)
+
+
+def test_default_transport_replays_the_file_named_by_the_environment(tmp_path, monkeypatch):
+    recording = tmp_path / "graph.json"
+    recording.write_text(json.dumps({"exchanges": []}))
+    monkeypatch.setenv(resourcegraph.REPLAY_ENV, str(recording))
+    assert isinstance(resourcegraph.default_transport(), resourcegraph.RecordedTransport)
+    monkeypatch.delenv(resourcegraph.REPLAY_ENV)
+    assert resourcegraph.default_transport() is resourcegraph.arm_transport
+
+
+def test_inventory_falls_back_to_arm_when_resource_graph_fails(tmp_path, monkeypatch):
+    def fail(subscription_ids, resource_types, transport=None):
+        raise resourcegraph.ResourceGraphError("throttled")
+
+    def list_from_arm(collections, subscription_ids, max_workers):
+        return {name: {subscription_id: [{"id": f"{subscription_id}/{name}"}] for subscription_id in subscription_ids} for name in collections}
+
+    monkeypatch.setattr(inventory, "list_subscriptions", lambda: [
+        {"subscriptionId": "sub-1", "state": "Enabled"},
+        {"subscriptionId": "sub-2", "state": "Disabled"},
+    ])
+    monkeypatch.setattr(resourcegraph, "list_resources", fail)
+    monkeypatch.setattr(inventory, "_collect_from_arm", list_from_arm)
+
+    snapshot = inventory.collect(str(tmp_path / "inventory.json"), ["networkSecurityGroups"], backend="resourcegraph")
+    assert snapshot["resources"] == {"networkSecurityGroups": {"sub-1": [{"id": "sub-1/networkSecurityGroups"}]}}
+    assert snapshot["backend"] == "resourcegraph"
+
+
+def test_inventory_files_resource_graph_rows_by_collection_and_subscription(monkeypatch):
+    rows = [
+        {"id": "nsg", "type": "microsoft.network/networksecuritygroups", "subscriptionId": "sub-1"},
+        {"id": "ip", "type": "Microsoft.Network/publicIPAddresses", "subscriptionId": "sub-2"},
+        {"id": "other", "type": "microsoft.network/networksecuritygroups", "subscriptionId": "sub-3"},
+    ]
+    monkeypatch.setattr(resourcegraph, "list_resources", lambda subscription_ids, resource_types, transport=None: rows)
+    resources = inventory._collect_from_resource_graph(["networkSecurityGroups", "publicIPAddresses"], ["sub-1", "sub-2"])
+    assert resources == {
+        "networkSecurityGroups": {"sub-1": [rows[0]], "sub-2": []},
+        "publicIPAddresses": {"sub-1": [], "sub-2": [rows[1]]},
+    }
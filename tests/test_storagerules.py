@@ -0,0 +1,75 @@
+import pytest
+import inventory
+import storagerules
+
+
+def account(blob_service=None, **properties):
+    resource = {"id": "/storageAccounts/st", "name": "st", "properties": properties}
+    if blob_service is not None:
+        resource["blobService"] = blob_service
+    return resource
+
+
+@pytest.mark.parametrize("control, properties, status, text", [
+    ("4.1", {"supportsHttpsTrafficOnly": True}, "PASS", "Required"),
+    ("4.1", {}, "FAIL", "Not Required"),
+    ("4.2", {"encryption": {"requireInfrastructureEncryption": True}}, "PASS", "Enabled"),
+    ("4.2", {"encryption": {}}, "FAIL", "Not Enabled"),
+    ("4.6", {"publicNetworkAccess": "Disabled"}, "PASS", "Disabled"),
+    ("4.6", {}, "FAIL", "Unknown"),
+    ("4.7", {"networkAcls": {"defaultAction": "Deny"}}, "PASS", "Deny"),
+    ("4.7", {"networkAcls": {"defaultAction": "Allow"}}, "FAIL", "Allow"),
+    ("4.8", {"networkAcls": {"bypass": "Logging, AzureServices"}}, "PASS", "Allowed"),
+    ("4.8", {"networkAcls": {"bypass": "None"}}, "FAIL", "Bypass: None"),
+    ("4.9", {"privateEndpointConnections": [{"id": "pe"}]}, "PASS", "Private endpoints enabled"),
+    ("4.9", {"privateEndpointConnections": []}, "FAIL", "Private endpoints not used"),
+    ("4.11", {"encryption": {"keySource": "Microsoft.Keyvault"}}, "MANUAL", "Microsoft.Keyvault"),
+    ("4.15", {"minimumTlsVersion": "TLS1_2"}, "PASS", "TLS1_2"),
+    ("4.15", {"minimumTlsVersion": "TLS1_0"}, "FAIL", "TLS1_0"),
+    ("4.16", {"allowCrossTenantReplication": False}, "PASS", "Disabled"),
+    ("4.16", {"allowCrossTenantReplication": True}, "FAIL", "Enabled"),
+    ("4.17", {"allowBlobPublicAccess": False}, "PASS", "false"),
+    ("4.17", {}, "FAIL", "true"),
+])
+def test_rules(control, properties, status, text):
+    outcome = storagerules.RULES[control]["evaluate"](account(**properties))
+    assert outcome[0] == status
+    assert outcome[2] == text
+
+
+def test_failing_rules_carry_proof_and_passing_ones_do_not():
+    network_acls = {"defaultAction": "Allow", "bypass": "None"}
+    assert storagerules.default_network_action(account(networkAcls=network_acls))[4] == network_acls
+    assert storagerules.default_network_action(account(networkAcls={"defaultAction": "Deny"}))[4] is None
+
+
+@pytest.mark.parametrize("blob_service, status, text", [
+    ({"deleteRetentionPolicy": {"enabled": True, "days": 7}}, "PASS", "Enabled for 7 day(s)"),
+    ({"deleteRetentionPolicy": {"enabled": True}}, "FAIL", "Enabled but no retention days set"),
+    ({"deleteRetentionPolicy": {"enabled": False}}, "FAIL", "Disabled"),
+])
+def test_soft_delete_reads_the_blob_service(blob_service, status, text):
+    outcome = storagerules.soft_delete(account(blob_service=blob_service))
+    assert (outcome[0], outcome[2]) == (status, text)
+
+
+def test_soft_delete_fails_when_the_blob_service_cannot_be_read():
+    outcome = storagerules.soft_delete(account(blob_service=None))
+    assert (outcome[0], outcome[2]) == ("FAIL", "Unknown status")
+
+
+def test_the_blob_service_is_read_once_and_only_for_rules_that_need_it(monkeypatch):
+    reads = []
+
+    def read_blob_service(resource):
+        reads.append(resource["id"])
+        resource["blobService"] = {"deleteRetentionPolicy": {"enabled": True, "days": 7}}
+        return resource
+
+    monkeypatch.setattr(inventory, "read_blob_service", read_blob_service)
+    resource = account(supportsHttpsTrafficOnly=True)
+    assert storagerules.evaluate_account(resource, ["4.1"])["4.1"][0] == "PASS"
+    assert reads == []
+    assert storagerules.evaluate_account(resource, ["4.1", "4.10"])["4.10"][0] == "PASS"
+    assert storagerules.evaluate_account(resource, ["4.10"])["4.10"][0] == "PASS"
+    assert reads == [resource["id"]]